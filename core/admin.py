@@ -1,8 +1,54 @@
-from django.contrib import admin
-from .models import UserProfile, Problem
+from django.contrib import admin, messages
+from .models import UserProfile, Problem, Solution, RejudgeJob
+from .utils import rejudge
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'role')
 
-admin.site.register(Problem)
+
+def _queue_rejudge(modeladmin, request, solutions, description):
+    solutions = solutions.exclude(status__in=Solution.IN_PROGRESS_STATUSES)
+    if not solutions.exists():
+        modeladmin.message_user(request, "No judged solutions to rejudge.", messages.WARNING)
+        return
+    job = rejudge.create_job(solutions, description=description, user=request.user)
+    modeladmin.message_user(
+        request,
+        f"Rejudge job #{job.id} queued for {job.total} solution(s); an idle judge worker will run it.",
+        messages.SUCCESS,
+    )
+
+
+@admin.register(Problem)
+class ProblemAdmin(admin.ModelAdmin):
+    list_display = ('title', 'difficulty', 'checker', 'test_data_version', 'created_at')
+    search_fields = ('title',)
+    actions = ['rejudge_problems']
+
+    @admin.action(description="Rejudge all solutions to the selected problems")
+    def rejudge_problems(self, request, queryset):
+        titles = ', '.join(queryset.values_list('title', flat=True)[:3])
+        _queue_rejudge(self, request, Solution.objects.filter(problem__in=queryset), f"problems {titles}")
+
+
+@admin.register(Solution)
+class SolutionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'problem', 'language', 'verdict', 'is_cached', 'submitted_at')
+    list_filter = ('verdict', 'language', 'is_cached', 'submitted_at', 'problem', 'contestsubmission__contest')
+    date_hierarchy = 'submitted_at'
+    search_fields = ('user__username', 'problem__title')
+    list_select_related = ('user', 'problem')
+    actions = ['rejudge_solutions']
+
+    @admin.action(description="Rejudge the selected solutions")
+    def rejudge_solutions(self, request, queryset):
+        _queue_rejudge(self, request, queryset, f"{queryset.count()} selected solution(s)")
+
+
+@admin.register(RejudgeJob)
+class RejudgeJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'description', 'status', 'judged', 'total', 'progress', 'changed', 'created_by', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = [field.name for field in RejudgeJob._meta.fields]
+    exclude = ('solutions',)
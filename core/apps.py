@@ -6,6 +6,7 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals  # import signals here to register them
+        import core.checks  # registers the language toolchain check
 
 def ready(self):
     import core.signals
@@ -0,0 +1,18 @@
+from django.core.checks import Warning, register
+
+from .utils import languages
+
+
+@register()
+def check_language_toolchains(app_configs, **kwargs):
+    """Warn about languages whose compiler or interpreter is missing on this host"""
+    warnings = []
+    for key, toolchain in languages.probe().items():
+        if not toolchain['available']:
+            warnings.append(Warning(
+                languages.unavailable_message(toolchain),
+                hint=f"Install it, point settings.COMPILER_PATHS at it, or remove '{key}' "
+                     f"through settings.JUDGE_LANGUAGES.",
+                id='core.W001',
+            ))
+    return warnings
@@ -1,6 +1,9 @@
+import json
+
 from django import forms
 from django.contrib.auth.models import User
 from .models import UserProfile, Problem
+from .utils import languages, testdata
 
 
 # -------------------------------
@@ -8,13 +11,7 @@ from .models import UserProfile, Problem
 # -------------------------------
 class SubmitSolutionForm(forms.Form):
     language = forms.ChoiceField(
-        choices=[
-            ('python', 'Python 3'),
-            ('cpp', 'C++'),
-            ('java', 'Java'),
-            ('c', 'C'),
-            ('javascript', 'JavaScript'),
-        ],
+        choices=languages.choices,
         widget=forms.Select(attrs={'class': 'form-select'})
     )
     source_code = forms.CharField(
@@ -41,11 +38,17 @@ class ProblemForm(forms.ModelForm):
         required=False,
         help_text="Enter JSON array of input/output test cases."
     )
+    test_archive = forms.FileField(
+        required=False,
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.zip'}),
+        help_text="Or upload a ZIP of NN.in / NN.out files."
+    )
 
     class Meta:
         model = Problem
         fields = ['title', 'description', 'constraints', 'input_format', 'output_format',
-                  'sample_input', 'sample_output', 'difficulty', 'tags']
+                  'sample_input', 'sample_output', 'difficulty', 'tags',
+                  'checker', 'float_tolerance', 'checker_language', 'checker_source']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control'}),
             'description': forms.Textarea(attrs={'rows': 10, 'class': 'form-control'}),
@@ -56,18 +59,63 @@ class ProblemForm(forms.ModelForm):
             'sample_output': forms.Textarea(attrs={'rows': 4, 'class': 'form-control'}),
             'tags': forms.TextInput(attrs={'class': 'form-control'}),
             'difficulty': forms.Select(attrs={'class': 'form-select'}),
+            'checker': forms.Select(attrs={'class': 'form-select'}),
+            'float_tolerance': forms.NumberInput(attrs={'class': 'form-control', 'step': 'any'}),
+            'checker_language': forms.Select(attrs={'class': 'form-select'}),
+            'checker_source': forms.Textarea(attrs={'rows': 10, 'class': 'form-control font-monospace'}),
         }
 
+    def clean_test_cases(self):
+        """Parse the JSON array into (input, output) pairs"""
+        text = self.cleaned_data.get('test_cases')
+        if not text:
+            return []
+        try:
+            cases = json.loads(text)
+        except json.JSONDecodeError:
+            raise forms.ValidationError('Invalid JSON format.')
+        if not isinstance(cases, list) or not all(isinstance(case, dict) for case in cases):
+            raise forms.ValidationError('Expected a JSON array of {"input": ..., "output": ...} objects.')
+        for number, case in enumerate(cases, start=1):
+            for key in ('input', 'output'):
+                if not isinstance(case.get(key, ''), str):
+                    raise forms.ValidationError(f'Test case {number}: "{key}" must be a string.')
+        return [(case.get('input', ''), case.get('output', '')) for case in cases]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('checker') == 'custom':
+            if not cleaned_data.get('checker_language'):
+                self.add_error('checker_language', 'Choose the language of the custom checker.')
+            if not (cleaned_data.get('checker_source') or '').strip():
+                self.add_error('checker_source', 'Paste the source of the custom checker.')
+        tolerance = cleaned_data.get('float_tolerance')
+        if tolerance is not None and tolerance < 0:
+            self.add_error('float_tolerance', 'Tolerance cannot be negative.')
+
+        archive = cleaned_data.get('test_archive')
+        if archive and cleaned_data.get('test_cases'):
+            self.add_error('test_archive', 'Provide test cases as JSON or as a ZIP archive, not both.')
+        elif archive and not self.errors:
+            # Unpacked last, so a form that fails validation never copies the archive
+            try:
+                cleaned_data['test_archive'] = testdata.stage_archive(archive)
+            except testdata.TestDataError as e:
+                self.add_error('test_archive', str(e))
+        return cleaned_data
+
     def save(self, commit=True):
-        instance = super().save(commit=False)
-  
-        test_cases_input = self.cleaned_data.get('test_cases')
-        if test_cases_input:
-            instance.test_cases_json = test_cases_input
+        instance = super().save(commit=commit)
         if commit:
-            instance.save()
+            self.save_test_cases(instance)
         return instance
 
+    def save_test_cases(self, instance):
+        """Store the entered or uploaded test cases as a new version; call once instance is saved"""
+        test_cases = self.cleaned_data.get('test_archive') or self.cleaned_data.get('test_cases')
+        if test_cases:
+            testdata.save_test_cases(instance, test_cases)
+
 
 # -------------------------------
 # Form: UserProfileForm
@@ -152,11 +200,12 @@ class ContestForm(forms.ModelForm):
         model = Contest
         fields = [
             'title', 'description', 'contest_type', 'start_time', 'end_time',
-            'max_participants', 'is_public', 'registration_required', 'password'
+            'max_participants', 'is_public', 'registration_required', 'password', 'freeze_duration'
         ]
         widgets = {
             'description': forms.Textarea(attrs={'rows': 4}),
             'password': forms.PasswordInput(attrs={'placeholder': 'Leave empty for public contest'}),
+            'freeze_duration': forms.TextInput(attrs={'class': 'form-control', 'placeholder': '1:00:00'}),
         }
     
     def clean(self):
@@ -174,6 +223,10 @@ class ContestForm(forms.ModelForm):
             if timezone.is_naive(end_time):
                 cleaned_data['end_time'] = timezone.make_aware(end_time)
         
+        freeze_duration = cleaned_data.get('freeze_duration')
+        if freeze_duration is not None and freeze_duration.total_seconds() < 0:
+            self.add_error('freeze_duration', "Freeze duration cannot be negative")
+        
         return cleaned_data
     
     def clean_duration(self):
@@ -0,0 +1,156 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils import java_runtime, python_forkserver, workspace
+from core.utils.execution import compiled_submission, execute_code, run_program
+
+# Trivial solutions, so the measurement is dominated by judge overhead
+BENCH_PROGRAMS = {
+    'java': '''import java.util.*;
+public class Main {
+    public static void main(String[] args) {
+        Scanner sc = new Scanner(System.in);
+        long a = sc.nextLong(), b = sc.nextLong();
+        System.out.println(a + b);
+    }
+}
+// %(nonce)s
+''',
+    'cpp': '''#include <iostream>
+int main() { long long a, b; std::cin >> a >> b; std::cout << a + b << std::endl; }
+// %(nonce)s
+''',
+    'python': '''a, b = map(int, input().split())
+print(a + b)
+# %(nonce)s
+''',
+}
+
+# (label, CODE_EXECUTION overrides) pairs compared for each language
+STRATEGIES = {
+    'java': [
+        ('cold javac + cold JVM', {'JAVA_WARM': False}),
+        ('warm compile service + CDS', {'JAVA_WARM': True}),
+    ],
+    'cpp': [
+        ('default', {}),
+    ],
+    'python': [
+        ('fresh interpreter per test', {'PYTHON_FORKSERVER': False}),
+        ('fork server', {'PYTHON_FORKSERVER': True}),
+    ],
+}
+
+# Where submissions get their scratch directory, compared with --workspaces
+WORKSPACE_STRATEGIES = [
+    ('fresh directory in TEMP_DIR', {'WORKSPACE_ROOT': None, 'WORKSPACE_POOL': 0}),
+    ('fresh directory on tmpfs', {'WORKSPACE_POOL': 0}),
+    ('pooled tmpfs workspaces', {}),
+]
+
+
+class Command(BaseCommand):
+    help = "Measure compile time and per-test overhead of the judge for a language"
+
+    def add_arguments(self, parser):
+        parser.add_argument('language', choices=sorted(BENCH_PROGRAMS))
+        parser.add_argument('--tests', type=int, default=20, help='Test cases run per submission')
+        parser.add_argument('--rounds', type=int, default=3, help='Submissions compiled per strategy')
+        parser.add_argument(
+            '--workspaces', action='store_true',
+            help='Also compare workspace strategies over repeated Run clicks (one test per execute_code)'
+        )
+
+    def handle(self, *args, **options):
+        language = options['language']
+        original = dict(settings.CODE_EXECUTION)
+        rows = []
+        for label, overrides in STRATEGIES[language]:
+            settings.CODE_EXECUTION.update(overrides)
+            try:
+                # Pay the one-off warm-up before measuring, like runjudge does at startup
+                if language == 'java':
+                    java_runtime.shutdown()
+                    java_runtime.warm_up()
+                elif language == 'python':
+                    python_forkserver.shutdown()
+                    python_forkserver.warm_up()
+                rows.append((label, *self.measure(language, options['tests'], options['rounds'])))
+            finally:
+                settings.CODE_EXECUTION.clear()
+                settings.CODE_EXECUTION.update(original)
+                java_runtime.shutdown()
+                python_forkserver.shutdown()
+
+        self.stdout.write(f"\n{language}: {options['rounds']} submission(s) x {options['tests']} test(s)")
+        self.stdout.write(f"{'strategy':<34}{'compile ms':>12}{'per-test ms':>14}")
+        for label, compile_ms, per_test_ms in rows:
+            self.stdout.write(f"{label:<34}{compile_ms:>12.1f}{per_test_ms:>14.1f}")
+
+        if options['workspaces']:
+            self.compare_workspaces(language, options['tests'])
+
+    def compare_workspaces(self, language, runs):
+        original = dict(settings.CODE_EXECUTION)
+        # Compile once up front so every measured run is an artifact cache hit
+        code = BENCH_PROGRAMS[language] % {'nonce': uuid.uuid4().hex}
+        execute_code(language, code, "1 1\n", "2")
+
+        rows = []
+        for label, overrides in WORKSPACE_STRATEGIES:
+            settings.CODE_EXECUTION.update(overrides)
+            workspace.shutdown()
+            workspace.reset_stats()
+            try:
+                started = time.perf_counter()
+                for i in range(runs):
+                    result = execute_code(language, code, f"{i} {i}\n", str(2 * i))
+                    if result['verdict'] != 'AC':
+                        raise CommandError(f"Benchmark run failed: {result}")
+                elapsed = time.perf_counter() - started
+                stats = workspace.stats()
+            finally:
+                settings.CODE_EXECUTION.clear()
+                settings.CODE_EXECUTION.update(original)
+                workspace.shutdown()
+            acquired = max(stats['acquired'], 1)
+            rows.append((
+                label,
+                elapsed / runs * 1000,
+                stats['setup_seconds'] / acquired * 1000,
+                stats['teardown_seconds'] / acquired * 1000,
+                f"{stats['reused']}/{stats['acquired']}",
+            ))
+
+        self.stdout.write(f"\n{language}: {runs} Run click(s), workspace setup/teardown per run")
+        self.stdout.write(f"{'workspace':<34}{'per-run ms':>12}{'setup ms':>10}{'teardown ms':>13}{'reused':>9}")
+        for label, per_run_ms, setup_ms, teardown_ms, reused in rows:
+            self.stdout.write(f"{label:<34}{per_run_ms:>12.1f}{setup_ms:>10.3f}{teardown_ms:>13.3f}{reused:>9}")
+        baseline = rows[0][2] + rows[0][3]
+        pooled = rows[-1][2] + rows[-1][3]
+        self.stdout.write(f"Saved per run by pooled tmpfs workspaces: {baseline - pooled:.3f} ms")
+
+    def measure(self, language, tests, rounds):
+        """Average compile time and average wall time per test case, in ms"""
+        compile_total = 0.0
+        run_total = 0.0
+        for _ in range(rounds):
+            # A fresh nonce defeats the artifact cache so every round really compiles
+            code = BENCH_PROGRAMS[language] % {'nonce': uuid.uuid4().hex}
+            started = time.perf_counter()
+            with compiled_submission(language, code) as program:
+                compile_total += time.perf_counter() - started
+                if program['verdict'] != 'OK':
+                    raise CommandError(f"Benchmark program failed to compile: {program.get('error')}")
+
+                started = time.perf_counter()
+                for i in range(tests):
+                    result = run_program(program, f"{i} {i}\n", str(2 * i))
+                    if result['verdict'] != 'AC':
+                        raise CommandError(f"Benchmark run failed: {result}")
+                run_total += time.perf_counter() - started
+
+        return compile_total / rounds * 1000, run_total / (rounds * tests) * 1000
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.utils import testdata
+
+
+class Command(BaseCommand):
+    help = "Delete stored test files that no version of any problem uses any more"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=float, default=testdata.GC_GRACE_SECONDS / 3600,
+            help='Keep unreferenced files younger than this many hours (uploads may still be using them)'
+        )
+
+    def handle(self, *args, **options):
+        removed, freed = testdata.collect_garbage(options['grace'] * 3600)
+        self.stdout.write(f"Removed {removed} unreferenced file(s), {freed / 1024 / 1024:.1f} MB")
+
+        usage = testdata.usage()
+        logical, stored = usage['logical_bytes'], usage['stored_bytes']
+        ratio = logical / stored if stored else 0
+        self.stdout.write(
+            f"Test data: {logical / 1024 / 1024:.1f} MB in {usage['blobs']} file(s) stored as "
+            f"{stored / 1024 / 1024:.1f} MB ({ratio:.1f}x)"
+        )
@@ -0,0 +1,92 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.models import Contest, Problem, RejudgeJob, Solution
+from core.utils import rejudge
+
+
+def _parse_moment(value):
+    """A date (midnight) or datetime from the command line, in the current timezone"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Not a date or datetime: {value}")
+        moment = timezone.datetime(day.year, day.month, day.day)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = "Judge already judged solutions again, e.g. after fixing a problem's test data"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problem', help='UUID of the problem whose solutions to rejudge')
+        parser.add_argument('--contest', help='UUID of the contest whose submissions to rejudge')
+        parser.add_argument(
+            '--verdict', action='append', choices=[key for key, _ in Solution.VERDICT_CHOICES],
+            help='Only solutions with this verdict (repeatable)'
+        )
+        parser.add_argument('--since', help='Only solutions submitted at or after this date/datetime')
+        parser.add_argument('--until', help='Only solutions submitted before this date/datetime')
+        parser.add_argument('--job', type=int, help='Run an existing pending or failed rejudge job instead')
+        parser.add_argument('--workers', type=int, default=2, help='Solutions judged concurrently')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the matching solutions')
+
+    def handle(self, *args, **options):
+        if options['job']:
+            try:
+                job = RejudgeJob.objects.get(id=options['job'])
+            except RejudgeJob.DoesNotExist:
+                raise CommandError(f"No rejudge job #{options['job']}")
+            if job.status in (RejudgeJob.STATUS_RUNNING, RejudgeJob.STATUS_DONE):
+                raise CommandError(f"Rejudge job #{job.id} is already {job.status}")
+        else:
+            job = self.create_job(options)
+            if job is None:
+                return
+
+        self.stdout.write(f"Rejudging {job.total} solution(s) as job #{job.id}")
+        job = rejudge.run_job(
+            job,
+            workers=max(1, options['workers']),
+            progress=lambda job: self.stdout.write(f"  {job.judged}/{job.total} ({job.progress}%)"),
+        )
+        if job.status != RejudgeJob.STATUS_DONE:
+            raise CommandError(f"Rejudge job #{job.id} failed: {job.error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Rejudged {job.judged} solution(s); {job.changed} verdict(s) changed"
+        ))
+
+    def create_job(self, options):
+        filters = {}
+        description = []
+        try:
+            if options['problem']:
+                filters['problem'] = Problem.objects.get(uuid=options['problem'])
+                description.append(f"problem {filters['problem'].title}")
+            if options['contest']:
+                filters['contest'] = Contest.objects.get(uuid=options['contest'])
+                description.append(f"contest {filters['contest'].title}")
+        except (Problem.DoesNotExist, Contest.DoesNotExist, ValidationError):
+            raise CommandError("No such problem or contest")
+        if options['verdict']:
+            filters['verdicts'] = options['verdict']
+            description.append('/'.join(options['verdict']))
+        if options['since']:
+            filters['since'] = _parse_moment(options['since'])
+            description.append(f"since {options['since']}")
+        if options['until']:
+            filters['until'] = _parse_moment(options['until'])
+            description.append(f"until {options['until']}")
+        if not filters:
+            raise CommandError("Give at least one of --problem, --contest, --verdict, --since or --until")
+
+        solutions = rejudge.select_solutions(**filters)
+        if options['dry_run']:
+            self.stdout.write(f"{solutions.count()} solution(s) would be rejudged")
+            return None
+        return rejudge.create_job(solutions, description=', '.join(description))
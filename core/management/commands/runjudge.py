@@ -0,0 +1,129 @@
+import os
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.utils import events, java_runtime, languages, python_forkserver, rejudge, user_stats
+from core.utils.judge_queue import claim_next_task, judge_task, release_task, requeue_stale_tasks
+
+# Seconds between looks for tasks and rejudge jobs left behind by dead workers
+REQUEUE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Run a pool of judge workers that drain the submission queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of submissions judged concurrently')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.once = options['once']
+        self.poll_interval = options['poll_interval']
+
+        # Resolve every toolchain once, before any submission needs it
+        self.stdout.write("Language toolchains:")
+        for line in languages.report():
+            self.stdout.write(line)
+
+        if java_runtime.warm_up():
+            self.stdout.write("Java compile service and CDS archive ready")
+        if python_forkserver.warm_up():
+            self.stdout.write("Python fork server ready")
+
+        self.next_requeue = 0
+        self.requeue_stale()
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            threading.Thread(target=self.worker_loop, args=(f"{prefix}:{i}",), daemon=True)
+            for i in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(self.style.SUCCESS(f"Judge started with {len(threads)} worker(s)"))
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after the submissions in progress...")
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+    def worker_loop(self, worker_name):
+        try:
+            while not self.stop.is_set():
+                try:
+                    busy = self.work_once(worker_name)
+                except Exception as e:
+                    # One failure must not cost the worker; the connection may be the broken part
+                    self.stderr.write(f"[{worker_name}] Error: {e}")
+                    connection.close()
+                    busy = False
+                if not busy:
+                    if self.once:
+                        break
+                    self.stop.wait(self.poll_interval)
+        finally:
+            # Each thread owns its own database connection
+            connection.close()
+
+    def work_once(self, worker_name):
+        """Judge one submission or run one rejudge job; returns False when there was nothing to do"""
+        task = claim_next_task(worker_name)
+        if task is None:
+            # New submissions always go first; rejudging only uses idle workers
+            job = rejudge.claim_next_job(worker_name)
+            if job is not None:
+                self.run_rejudge(worker_name, job)
+                return True
+            self.requeue_stale()
+            user_stats.finalize_ended_contests()
+            events.prune()
+            return False
+
+        self.stdout.write(f"[{worker_name}] Judging solution #{task.solution_id}")
+        started = time.monotonic()
+        try:
+            result = judge_task(task)
+        except Exception as e:
+            self.stderr.write(f"[{worker_name}] Solution #{task.solution_id} failed (attempt {task.attempts}): {e}")
+            connection.close()
+            release_task(task, e)
+            return True
+        self.stdout.write(
+            f"[{worker_name}] Solution #{task.solution_id}: {result.get('verdict')} "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return True
+
+    def requeue_stale(self):
+        """Hand out again what dead workers left claimed, at most once per REQUEUE_INTERVAL"""
+        if time.monotonic() < self.next_requeue:
+            return
+        self.next_requeue = time.monotonic() + REQUEUE_INTERVAL
+        requeued = requeue_stale_tasks()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale task(s)")
+        requeued = rejudge.requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale rejudge job(s)")
+
+    def run_rejudge(self, worker_name, job):
+        self.stdout.write(f"[{worker_name}] Rejudging {job.total} solution(s) for job #{job.id}")
+        job = rejudge.run_job(
+            job,
+            progress=lambda job: self.stdout.write(f"[{worker_name}] Rejudge #{job.id}: {job.judged}/{job.total}"),
+        )
+        self.stdout.write(
+            f"[{worker_name}] Rejudge #{job.id} {job.status}: {job.changed} verdict(s) changed"
+            + (f" ({job.error})" if job.error else "")
+        )
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def settle_legacy_statuses(apps, schema_editor):
+    """
+    Solutions judged before the queue existed kept the default 'Pending'
+    status next to their verdict; copy the verdict over, and queue the ones
+    that never got a verdict so a worker judges them.
+    """
+    Solution = apps.get_model('core', 'Solution')
+    JudgeTask = apps.get_model('core', 'JudgeTask')
+    Solution.objects.filter(verdict__isnull=False).exclude(verdict='').update(status=models.F('verdict'))
+    unjudged = Solution.objects.filter(status='Pending').filter(
+        models.Q(verdict__isnull=True) | models.Q(verdict='')
+    ).order_by('id')
+    JudgeTask.objects.bulk_create(
+        [JudgeTask(solution_id=solution_id) for solution_id in unjudged.values_list('id', flat=True)],
+        batch_size=1000,
+    )
+    unjudged.update(status='Queued')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_problem_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JudgeTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('first_failure', 'Stop at first failing test'), ('partial', 'Run all tests for partial score')], default='first_failure', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('solution', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='judge_task', to='core.solution')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(settle_legacy_statuses, migrations.RunPython.noop),
+    ]
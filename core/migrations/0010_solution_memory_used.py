@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_judgetask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solution',
+            name='memory_used',
+            field=models.PositiveIntegerField(blank=True, help_text='Peak resident memory over all test cases (KB)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='solution',
+            name='execution_time',
+            field=models.FloatField(blank=True, help_text='Peak CPU time over all test cases (seconds)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='solution',
+            name='verdict',
+            field=models.CharField(blank=True, choices=[('AC', 'Accepted'), ('WA', 'Wrong Answer'), ('TLE', 'Time Limit Exceeded'), ('CE', 'Compilation Error'), ('RE', 'Runtime Error'), ('MLE', 'Memory Limit Exceeded'), ('OLE', 'Output Limit Exceeded'), ('IE', 'Internal Error')], max_length=5, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_solution_memory_used'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='checker',
+            field=models.CharField(choices=[('exact', 'Exact match'), ('tokens', 'Token by token'), ('float', 'Numbers with tolerance'), ('custom', 'Custom checker program')], default='exact', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='checker_language',
+            field=models.CharField(blank=True, choices=[('cpp', 'C++'), ('python', 'Python')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='checker_source',
+            field=models.TextField(blank=True, help_text='testlib-style checker run as: checker <input> <output> <answer>'),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='float_tolerance',
+            field=models.FloatField(default=1e-06, help_text='Absolute or relative error accepted by the numbers checker'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_problem_checker'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='solution',
+            name='language',
+            field=models.CharField(choices=[('python', 'Python'), ('cpp', 'C++'), ('c', 'C'), ('java', 'Java'), ('javascript', 'JavaScript')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.1.6 on 2026-10-17 09:12
+
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The test data layout as of this migration, frozen here so it does not
+# follow later changes to core.utils.testdata:
+#
+#     MEDIA_ROOT/testdata/<problem uuid>/v<N>/
+#         manifest.json
+#         01.in  01.out
+#         ...
+
+
+def _problem_dir(problem_uuid):
+    return os.path.join(settings.MEDIA_ROOT, 'testdata', str(problem_uuid))
+
+
+def _version_dir(problem_uuid, version):
+    return os.path.join(_problem_dir(problem_uuid), f'v{version}')
+
+
+def _write_version(problem_uuid, version, cases):
+    """Write (input, output) text pairs as a version; raises FileExistsError if it exists"""
+    parent = _problem_dir(problem_uuid)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=parent)
+    try:
+        cases = list(cases)
+        width = max(2, len(str(len(cases))))
+        entries = []
+        for number, (input_data, output_data) in enumerate(cases, start=1):
+            entry = {'input': f'{number:0{width}d}.in', 'output': f'{number:0{width}d}.out'}
+            for kind, data in (('input', input_data), ('output', output_data)):
+                # Older problem forms accepted any JSON value here, e.g. a bare number
+                data = ('' if data is None else str(data)).encode('utf-8')
+                with open(os.path.join(staging, entry[kind]), 'wb') as f:
+                    f.write(data)
+                entry[f'{kind}_size'] = len(data)
+            entries.append(entry)
+
+        with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'cases': entries}, f, indent=1)
+
+        target = _version_dir(problem_uuid, version)
+        if os.path.exists(target):
+            raise FileExistsError(target)
+        os.rename(staging, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _read_version(problem_uuid, version):
+    """(input, output) text pairs of a version, or [] if it is missing"""
+    directory = _version_dir(problem_uuid, version)
+    try:
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return []
+    cases = []
+    for case in manifest['cases']:
+        texts = []
+        for kind in ('input', 'output'):
+            with open(os.path.join(directory, case[kind]), encoding='utf-8', errors='replace') as f:
+                texts.append(f.read())
+        cases.append(tuple(texts))
+    return cases
+
+
+def move_test_cases_to_store(apps, schema_editor):
+    Problem = apps.get_model('core', 'Problem')
+    for problem in Problem.objects.exclude(test_cases_json='').only('uuid', 'test_cases_json').iterator():
+        try:
+            cases = json.loads(problem.test_cases_json)
+        except json.JSONDecodeError:
+            print(f"\n  Skipping problem {problem.uuid}: test_cases_json is not valid JSON")
+            continue
+        if not isinstance(cases, list) or not all(isinstance(case, dict) for case in cases):
+            print(f"\n  Skipping problem {problem.uuid}: test_cases_json is not a list of test cases")
+            continue
+        if not cases:
+            continue
+        version = 1
+        while True:
+            try:
+                _write_version(
+                    problem.uuid, version,
+                    [(case.get('input', ''), case.get('output', '')) for case in cases]
+                )
+                break
+            except FileExistsError:
+                version += 1
+        Problem.objects.filter(pk=problem.pk).update(test_data_version=version)
+
+
+def move_test_cases_back(apps, schema_editor):
+    Problem = apps.get_model('core', 'Problem')
+    for problem in Problem.objects.filter(test_data_version__gt=0).iterator():
+        cases = [
+            {'input': input_text, 'output': output_text}
+            for input_text, output_text in _read_version(problem.uuid, problem.test_data_version)
+        ]
+        Problem.objects.filter(pk=problem.pk).update(test_cases_json=json.dumps(cases))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_solution_language_choices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='test_data_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(move_test_cases_to_store, move_test_cases_back),
+    ]
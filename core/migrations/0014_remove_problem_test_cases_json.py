@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-17 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_problem_test_data_version'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='problem',
+            name='test_cases_json',
+        ),
+    ]
@@ -0,0 +1,143 @@
+# Generated by Django 5.1.6 on 2026-10-17 11:40
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.db import migrations
+
+# Moves test data from plain NN.in / NN.out files next to each manifest
+# (0013) into gzip-compressed blobs addressed by their SHA-256:
+#
+#     MEDIA_ROOT/testdata/blobs/<sha256[:2]>/<sha256>.gz
+#     MEDIA_ROOT/testdata/<problem uuid>/v<N>/manifest.json
+#
+# Both layouts are frozen here so this does not follow later changes to
+# core.utils.testdata.
+
+COPY_CHUNK = 1024 * 1024
+
+
+def _root():
+    return os.path.join(settings.MEDIA_ROOT, 'testdata')
+
+
+def _blob_path(sha256):
+    return os.path.join(_root(), 'blobs', sha256[:2], f'{sha256}.gz')
+
+
+def _versions(problem_uuid):
+    """(version directory, manifest) of each version of a problem"""
+    parent = os.path.join(_root(), str(problem_uuid))
+    try:
+        names = os.listdir(parent)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.startswith('v') and name[1:].isdigit():
+            try:
+                with open(os.path.join(parent, name, 'manifest.json'), encoding='utf-8') as f:
+                    yield os.path.join(parent, name), json.load(f)
+            except FileNotFoundError:
+                continue
+
+
+def _store_blob(path):
+    """Compress a file into its blob; returns (sha256, size)"""
+    os.makedirs(os.path.join(_root(), 'blobs'), exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, incoming = tempfile.mkstemp(prefix='.incoming-', dir=os.path.join(_root(), 'blobs'))
+    try:
+        with open(path, 'rb') as source, os.fdopen(fd, 'wb') as raw, \
+                gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1, mtime=0) as f:
+            for chunk in iter(lambda: source.read(COPY_CHUNK), b''):
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        sha256 = digest.hexdigest()
+        target = _blob_path(sha256)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.rename(incoming, target)
+        return sha256, size
+    finally:
+        if os.path.exists(incoming):
+            os.unlink(incoming)
+
+
+def _replace_version(directory, write):
+    """Build a version's new contents with write(staging) and swap them in"""
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=os.path.dirname(directory))
+    old = directory + '.old'
+    try:
+        write(staging)
+        os.rename(directory, old)
+        os.rename(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        if os.path.isdir(old) and not os.path.exists(directory):
+            os.rename(old, directory)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def compress_test_data(apps, schema_editor):
+    Problem = apps.get_model('core', 'Problem')
+    for problem in Problem.objects.filter(test_data_version__gt=0).only('uuid').iterator():
+        for directory, manifest in list(_versions(problem.uuid)):
+            if not manifest['cases'] or 'input' not in manifest['cases'][0]:
+                continue
+
+            def write(staging, directory=directory, manifest=manifest):
+                cases = []
+                for case in manifest['cases']:
+                    entry = {}
+                    for kind in ('input', 'output'):
+                        entry[f'{kind}_sha256'], entry[f'{kind}_size'] = _store_blob(
+                            os.path.join(directory, case[kind])
+                        )
+                    cases.append(entry)
+                with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+                    json.dump({'version': manifest['version'], 'cases': cases}, f, indent=1)
+
+            _replace_version(directory, write)
+
+
+def decompress_test_data(apps, schema_editor):
+    Problem = apps.get_model('core', 'Problem')
+    for problem in Problem.objects.filter(test_data_version__gt=0).only('uuid').iterator():
+        for directory, manifest in list(_versions(problem.uuid)):
+            if not manifest['cases'] or 'input_sha256' not in manifest['cases'][0]:
+                continue
+
+            def write(staging, manifest=manifest):
+                width = max(2, len(str(len(manifest['cases']))))
+                cases = []
+                for number, case in enumerate(manifest['cases'], start=1):
+                    entry = {'input': f'{number:0{width}d}.in', 'output': f'{number:0{width}d}.out'}
+                    for kind in ('input', 'output'):
+                        with gzip.open(_blob_path(case[f'{kind}_sha256']), 'rb') as source, \
+                                open(os.path.join(staging, entry[kind]), 'wb') as target:
+                            shutil.copyfileobj(source, target, COPY_CHUNK)
+                        entry[f'{kind}_size'] = case[f'{kind}_size']
+                    cases.append(entry)
+                with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+                    json.dump({'version': manifest['version'], 'cases': cases}, f, indent=1)
+
+            _replace_version(directory, write)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_remove_problem_test_cases_json'),
+    ]
+
+    operations = [
+        migrations.RunPython(compress_test_data, decompress_test_data),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_compress_test_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestCaseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('test_data_version', models.PositiveIntegerField()),
+                ('test_number', models.PositiveIntegerField()),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('total_time', models.FloatField(default=0.0, help_text='CPU seconds summed over all runs')),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_case_stats', to='core.problem')),
+            ],
+            options={
+                'unique_together': {('problem', 'test_data_version', 'test_number')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_testcasestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solution',
+            name='is_cached',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='VerdictCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('test_data_version', models.PositiveIntegerField()),
+                ('language', models.CharField(max_length=10)),
+                ('toolchain', models.CharField(max_length=64)),
+                ('source_hash', models.CharField(max_length=64)),
+                ('mode', models.CharField(choices=[('first_failure', 'Stop at first failing test'), ('partial', 'Run all tests for partial score')], max_length=20)),
+                ('verdict', models.CharField(choices=[('AC', 'Accepted'), ('WA', 'Wrong Answer'), ('TLE', 'Time Limit Exceeded'), ('CE', 'Compilation Error'), ('RE', 'Runtime Error'), ('MLE', 'Memory Limit Exceeded'), ('OLE', 'Output Limit Exceeded'), ('IE', 'Internal Error')], max_length=5)),
+                ('score', models.FloatField(default=0.0)),
+                ('output', models.TextField(blank=True)),
+                ('error', models.TextField(blank=True)),
+                ('failed_test', models.PositiveIntegerField(blank=True, null=True)),
+                ('execution_time', models.FloatField(blank=True, null=True)),
+                ('memory_used', models.PositiveIntegerField(blank=True, null=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='verdict_cache', to='core.problem')),
+                ('solution', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.solution')),
+            ],
+            options={
+                'unique_together': {('problem', 'test_data_version', 'language', 'toolchain', 'source_hash', 'mode')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_rejudgejob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solution',
+            index=models.Index(fields=['user', 'verdict', 'problem'], name='core_soluti_user_id_fe9703_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def build_scoreboards(apps, schema_editor):
+    ContestSubmission = apps.get_model('core', 'ContestSubmission')
+    ScoreboardEntry = apps.get_model('core', 'ScoreboardEntry')
+    ScoreboardRow = apps.get_model('core', 'ScoreboardRow')
+
+    pairs = ContestSubmission.objects.values('contest_id', 'participant_id', 'problem_id').annotate(
+        attempts=Count('id'), best=Max('points_awarded')
+    )
+    rows = {}
+    entries = []
+    for pair in pairs.iterator():
+        best = pair['best'] or 0
+        entries.append(ScoreboardEntry(
+            contest_id=pair['contest_id'],
+            participant_id=pair['participant_id'],
+            problem_id=pair['problem_id'],
+            attempts=pair['attempts'],
+            best_points=best,
+        ))
+        row = rows.setdefault(pair['participant_id'], ScoreboardRow(
+            contest_id=pair['contest_id'], participant_id=pair['participant_id']
+        ))
+        row.total_points += best
+        row.solved += best > 0
+        row.submissions += pair['attempts']
+    ScoreboardEntry.objects.bulk_create(entries, batch_size=1000)
+    ScoreboardRow.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_solution_solved_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('best_points', models.PositiveIntegerField(default=0)),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scoreboard_entries', to='core.contest')),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scoreboard_entries', to='core.contestparticipant')),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.problem')),
+            ],
+            options={
+                'unique_together': {('participant', 'problem')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ScoreboardRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_points', models.PositiveIntegerField(default=0)),
+                ('solved', models.PositiveIntegerField(default=0)),
+                ('submissions', models.PositiveIntegerField(default=0)),
+                ('contest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scoreboard_rows', to='core.contest')),
+                ('participant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='scoreboard_row', to='core.contestparticipant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['contest', '-total_points', 'submissions'], name='core_scoreb_contest_86ccf8_idx')],
+            },
+        ),
+        migrations.RunPython(build_scoreboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_scoreboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='freeze_duration',
+            field=models.DurationField(blank=True, help_text='Freeze public standings this long before the end (e.g., 1:00:00); staff still see live standings', null=True),
+        ),
+        migrations.AddField(
+            model_name='contest',
+            name='scoreboard_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
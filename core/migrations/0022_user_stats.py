@@ -0,0 +1,109 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def finalize_ended_contests(apps, schema_editor):
+    Contest = apps.get_model('core', 'Contest')
+    ContestParticipant = apps.get_model('core', 'ContestParticipant')
+    ContestSubmission = apps.get_model('core', 'ContestSubmission')
+
+    now = timezone.now()
+    for contest in Contest.objects.filter(end_time__lt=now):
+        # Left to the judge workers while submissions are still being judged
+        if ContestSubmission.objects.filter(
+            contest=contest, solution__status__in=['Pending', 'Queued', 'Compiling', 'Running']
+        ).exists():
+            continue
+        participants = list(ContestParticipant.objects.filter(contest=contest).select_related('scoreboard_row').order_by(
+            Coalesce('scoreboard_row__total_points', 0).desc(),
+            Coalesce('scoreboard_row__submissions', 0),
+            'id',
+        ))
+        for rank, participant in enumerate(participants, start=1):
+            row = getattr(participant, 'scoreboard_row', None)
+            participant.final_rank = rank
+            participant.final_points = row.total_points if row else 0
+        ContestParticipant.objects.bulk_update(participants, ['final_rank', 'final_points'], batch_size=500)
+        contest.finalized_at = now
+        contest.save(update_fields=['finalized_at'])
+
+
+def build_user_stats(apps, schema_editor):
+    Solution = apps.get_model('core', 'Solution')
+    ContestParticipant = apps.get_model('core', 'ContestParticipant')
+    UserStats = apps.get_model('core', 'UserStats')
+
+    stats = {}
+
+    def get(user_id):
+        return stats.setdefault(user_id, UserStats(user_id=user_id))
+
+    for row in Solution.objects.values('user_id').annotate(count=Count('id')).order_by():
+        get(row['user_id']).total_submissions = row['count']
+    for row in Solution.objects.filter(verdict='AC').values('user_id', 'problem__difficulty').annotate(
+        count=Count('problem', distinct=True)
+    ).order_by():
+        user_stats = get(row['user_id'])
+        user_stats.problems_solved += row['count']
+        if row['problem__difficulty'] in ('easy', 'medium', 'hard'):
+            setattr(user_stats, f"{row['problem__difficulty']}_solved", row['count'])
+    for row in ContestParticipant.objects.values('user_id').annotate(
+        count=Count('id'),
+        points=Coalesce(Sum('final_points'), 0),
+        top_3=Count('id', filter=Q(final_rank__lte=3, final_points__gt=0)),
+    ).order_by():
+        user_stats = get(row['user_id'])
+        user_stats.contests_participated = row['count']
+        user_stats.contest_points = row['points']
+        user_stats.top_3_finishes = row['top_3']
+    UserStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_scoreboard_snapshots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='finalized_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='contestparticipant',
+            name='final_points',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='contestparticipant',
+            name='final_rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_submissions', models.PositiveIntegerField(default=0)),
+                ('problems_solved', models.PositiveIntegerField(default=0)),
+                ('easy_solved', models.PositiveIntegerField(default=0)),
+                ('medium_solved', models.PositiveIntegerField(default=0)),
+                ('hard_solved', models.PositiveIntegerField(default=0)),
+                ('contests_participated', models.PositiveIntegerField(default=0)),
+                ('contest_points', models.PositiveIntegerField(default=0)),
+                ('top_3_finishes', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(finalize_ended_contests, migrations.RunPython.noop),
+        migrations.RunPython(build_user_stats, migrations.RunPython.noop),
+    ]
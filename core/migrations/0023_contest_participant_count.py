@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_participants(apps, schema_editor):
+    Contest = apps.get_model('core', 'Contest')
+    ContestParticipant = apps.get_model('core', 'ContestParticipant')
+
+    counts = ContestParticipant.objects.filter(contest=OuterRef('pk')).values('contest').annotate(
+        count=Count('id')
+    ).values('count')
+    Contest.objects.update(participant_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_user_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_participants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_contest_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='judgetask',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
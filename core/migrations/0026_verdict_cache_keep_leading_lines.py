@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-17 08:52
+
+from django.db import migrations
+
+
+def clear_verdict_cache(apps, schema_editor):
+    # Entries were keyed by sources with leading blank lines stripped, so one
+    # could answer a submission whose compiler messages have other line numbers
+    VerdictCache = apps.get_model('core', 'VerdictCache')
+    VerdictCache.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_judgetask_attempts'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_verdict_cache, migrations.RunPython.noop),
+    ]
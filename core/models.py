@@ -17,12 +17,39 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} ({self.role})"
 
+class UserStats(models.Model):
+    """Profile statistics, kept up to date as solutions are judged and contests finish (core.utils.user_stats)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='stats')
+    total_submissions = models.PositiveIntegerField(default=0)
+    problems_solved = models.PositiveIntegerField(default=0)
+    easy_solved = models.PositiveIntegerField(default=0)
+    medium_solved = models.PositiveIntegerField(default=0)
+    hard_solved = models.PositiveIntegerField(default=0)
+    contests_participated = models.PositiveIntegerField(default=0)
+    # Over finalized contests only
+    contest_points = models.PositiveIntegerField(default=0)
+    top_3_finishes = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats of {self.user.username}"
+
 class Problem(models.Model):
     DIFFICULTY_CHOICES = [
         ('easy', 'Easy'),
         ('medium', 'Medium'),
         ('hard', 'Hard'),
     ]
+    CHECKER_CHOICES = [
+        ('exact', 'Exact match'),
+        ('tokens', 'Token by token'),
+        ('float', 'Numbers with tolerance'),
+        ('custom', 'Custom checker program'),
+    ]
+    CHECKER_LANGUAGE_CHOICES = [
+        ('cpp', 'C++'),
+        ('python', 'Python'),
+    ]
     uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     title = models.CharField(max_length=255)
     difficulty = models.CharField(max_length=50, choices=DIFFICULTY_CHOICES, default='easy')
@@ -33,7 +60,16 @@ class Problem(models.Model):
     sample_input = models.TextField(blank=True)
     sample_output = models.TextField(blank=True)
     tags = models.CharField(max_length=255, blank=True, null=True)  
-    test_cases_json = models.TextField(blank=True) 
+    # Current version of the test data under MEDIA_ROOT/testdata (see core.utils.testdata); 0 if none
+    test_data_version = models.PositiveIntegerField(default=0)
+    checker = models.CharField(max_length=10, choices=CHECKER_CHOICES, default='exact')
+    float_tolerance = models.FloatField(
+        default=1e-6, help_text="Absolute or relative error accepted by the numbers checker"
+    )
+    checker_language = models.CharField(max_length=10, choices=CHECKER_LANGUAGE_CHOICES, blank=True)
+    checker_source = models.TextField(
+        blank=True, help_text="testlib-style checker run as: checker <input> <output> <answer>"
+    )
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(default=timezone.now)
 
@@ -47,15 +83,28 @@ class Solution(models.Model):
         ('WA', 'Wrong Answer'),
         ('TLE', 'Time Limit Exceeded'),
         ('CE', 'Compilation Error'),
-        ('RE', 'Runtime Error')
+        ('RE', 'Runtime Error'),
+        ('MLE', 'Memory Limit Exceeded'),
+        ('OLE', 'Output Limit Exceeded'),
+        ('IE', 'Internal Error'),
     ]
 
+    # Keys of core.utils.languages.DEFAULT_LANGUAGES
     LANGUAGE_CHOICES = [
         ('python', 'Python'),
         ('cpp', 'C++'),
-        ('java', 'Java')
+        ('c', 'C'),
+        ('java', 'Java'),
+        ('javascript', 'JavaScript'),
     ]
 
+    # Judging lifecycle stored in `status`; once judged it holds the verdict
+    STATUS_PENDING = 'Pending'
+    STATUS_QUEUED = 'Queued'
+    STATUS_COMPILING = 'Compiling'
+    STATUS_RUNNING = 'Running'
+    IN_PROGRESS_STATUSES = [STATUS_PENDING, STATUS_QUEUED, STATUS_COMPILING, STATUS_RUNNING]
+
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='solutions')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     code = models.TextField()
@@ -64,13 +113,132 @@ class Solution(models.Model):
     output = models.TextField(blank=True, null=True)
     error = models.TextField(blank=True, null=True)
     verdict = models.CharField(max_length=5, choices=VERDICT_CHOICES, blank=True, null=True)
-    execution_time = models.FloatField(null=True, blank=True)
+    execution_time = models.FloatField(null=True, blank=True, help_text="Peak CPU time over all test cases (seconds)")
+    memory_used = models.PositiveIntegerField(null=True, blank=True, help_text="Peak resident memory over all test cases (KB)")
     status = models.CharField(max_length=50, default='Pending')
+    # The verdict was copied from an identical earlier submission instead of being judged
+    is_cached = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # "Which problems has this user solved" lookups
+            models.Index(fields=['user', 'verdict', 'problem']),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s {self.language} solution for {self.problem.title}"
 
+    @property
+    def is_judged(self):
+        return self.status not in self.IN_PROGRESS_STATUSES
+
+
+class JudgeTask(models.Model):
+    """A solution waiting in (or being processed from) the DB-backed judge queue"""
+    MODE_CHOICES = [
+        ('first_failure', 'Stop at first failing test'),
+        ('partial', 'Run all tests for partial score'),
+    ]
+
+    solution = models.OneToOneField(Solution, on_delete=models.CASCADE, related_name='judge_task')
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default='first_failure')
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    worker = models.CharField(max_length=100, blank=True)
+    # Times the task was handed to a worker
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Judge task for solution #{self.solution_id} ({self.worker or 'unclaimed'})"
+
+
+class RejudgeJob(models.Model):
+    """A batch of already judged solutions to evaluate again, e.g. after a test data fix"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    description = models.CharField(max_length=255, blank=True)
+    solutions = models.ManyToManyField(Solution, related_name='rejudge_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    total = models.PositiveIntegerField(default=0)
+    judged = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0, help_text="Solutions whose verdict changed")
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Touched after every batch, so a job whose worker died can be spotted
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"Rejudge #{self.id}: {self.description or f'{self.total} solutions'} ({self.status})"
+
+    @property
+    def progress(self):
+        """Percentage of the solutions judged so far"""
+        return int(100 * self.judged / self.total) if self.total else 100
+
+
+class VerdictCache(models.Model):
+    """The judged result of a submission, reused for identical resubmissions"""
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='verdict_cache')
+    test_data_version = models.PositiveIntegerField()
+    language = models.CharField(max_length=10)
+    # Hash of the toolchain versions and flags, limits and checker the verdict was judged with
+    toolchain = models.CharField(max_length=64)
+    # SHA-256 of the source with line endings and surrounding blank space normalized
+    source_hash = models.CharField(max_length=64)
+    mode = models.CharField(max_length=20, choices=JudgeTask.MODE_CHOICES)
+    verdict = models.CharField(max_length=5, choices=Solution.VERDICT_CHOICES)
+    score = models.FloatField(default=0.0)
+    output = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    failed_test = models.PositiveIntegerField(null=True, blank=True)
+    execution_time = models.FloatField(null=True, blank=True)
+    memory_used = models.PositiveIntegerField(null=True, blank=True)
+    solution = models.ForeignKey(Solution, on_delete=models.SET_NULL, null=True, related_name='+')
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['problem', 'test_data_version', 'language', 'toolchain', 'source_hash', 'mode']
+
+    def __str__(self):
+        return f"{self.problem.title} {self.language} {self.source_hash[:12]}: {self.verdict}"
+
+
+class TestCaseStats(models.Model):
+    """How often one test case of a problem's current test data rejects submissions, and its cost"""
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='test_case_stats')
+    test_data_version = models.PositiveIntegerField()
+    # Canonical 1-based position of the case in the test data
+    test_number = models.PositiveIntegerField()
+    runs = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    total_time = models.FloatField(default=0.0, help_text="CPU seconds summed over all runs")
+
+    class Meta:
+        unique_together = ['problem', 'test_data_version', 'test_number']
+
+    def __str__(self):
+        return f"{self.problem.title} test {self.test_number}: {self.failures}/{self.runs} failed"
+
 
 
 import uuid
@@ -115,6 +283,17 @@ class Contest(models.Model):
     is_public = models.BooleanField(default=True)
     registration_required = models.BooleanField(default=True)
     password = models.CharField(max_length=50, blank=True, help_text="Leave empty for public contest")
+    freeze_duration = models.DurationField(
+        null=True,
+        blank=True,
+        help_text="Freeze public standings this long before the end (e.g., 1:00:00); staff still see live standings"
+    )
+    # Bumped whenever the materialized standings change (core.utils.scoreboard)
+    scoreboard_version = models.PositiveIntegerField(default=0, editable=False)
+    # Kept in step with ContestParticipant rows by core.signals
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set once final ranks are stored on the participants; cleared when standings change again
+    finalized_at = models.DateTimeField(null=True, blank=True, editable=False)
     
     
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_contests')
@@ -153,33 +332,6 @@ class Contest(models.Model):
     def is_upcoming(self):
         return self.status == 'upcoming'
     
-    @property
-    def time_remaining(self):
-        if self.is_running:
-            return self.end_time - timezone.now()
-        return None
-    
-    @property
-    def time_until_start(self):
-        if self.is_upcoming:
-            return self.start_time - timezone.now()
-        return None
-    
-    @property
-    def status(self):
-        """Get current contest status with proper timezone handling"""
-        now = timezone.now()
-        print(f"[DEBUG] Current time: {now}")
-        print(f"[DEBUG] Contest start: {self.start_time}")
-        print(f"[DEBUG] Contest end: {self.end_time}")
-        
-        if now < self.start_time:
-            return 'upcoming'
-        elif now <= self.end_time:
-            return 'running'
-        else:
-            return 'ended'
-    
     @property
     def time_remaining(self):
         """Get time remaining in contest"""
@@ -196,6 +348,24 @@ class Contest(models.Model):
             return until_start if until_start.total_seconds() > 0 else None
         return None
 
+    @property
+    def freeze_time(self):
+        """When public standings stop updating, or None if they never freeze"""
+        if not self.freeze_duration:
+            return None
+        return max(self.end_time - self.freeze_duration, self.start_time)
+
+    @property
+    def is_scoreboard_frozen(self):
+        freeze_time = self.freeze_time
+        return freeze_time is not None and freeze_time <= timezone.now() <= self.end_time
+
+    def is_visible_to(self, user):
+        """Public contests are open to everyone; private or password-protected ones to staff, the creator and participants"""
+        if self.is_public and not self.password:
+            return True
+        return user.is_staff or self.created_by_id == user.id or self.participants.filter(id=user.id).exists()
+
 class ContestProblem(models.Model):
     contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='contest_problems')
     problem = models.ForeignKey('Problem', on_delete=models.CASCADE)
@@ -214,6 +384,9 @@ class ContestParticipant(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     registered_at = models.DateTimeField(auto_now_add=True)
     start_time = models.DateTimeField(null=True, blank=True)
+    # Filled in when the contest is finalized
+    final_rank = models.PositiveIntegerField(null=True, blank=True)
+    final_points = models.PositiveIntegerField(default=0)
     
     class Meta:
         unique_together = ['contest', 'user']
@@ -237,6 +410,56 @@ class ContestSubmission(models.Model):
     def __str__(self):
         return f"{self.participant.user.username} - {self.problem.title}"
 
+class ScoreboardEntry(models.Model):
+    """A participant's attempts and best score on one contest problem, kept up to date for standings"""
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='scoreboard_entries')
+    participant = models.ForeignKey(ContestParticipant, on_delete=models.CASCADE, related_name='scoreboard_entries')
+    problem = models.ForeignKey('Problem', on_delete=models.CASCADE)
+    attempts = models.PositiveIntegerField(default=0)
+    best_points = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['participant', 'problem']
+
+    def __str__(self):
+        return f"{self.participant.user.username} - {self.problem.title}: {self.best_points}"
+
+
+class ScoreboardRow(models.Model):
+    """A participant's totals over all problems of a contest, in standings order"""
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='scoreboard_rows')
+    participant = models.OneToOneField(ContestParticipant, on_delete=models.CASCADE, related_name='scoreboard_row')
+    total_points = models.PositiveIntegerField(default=0)
+    solved = models.PositiveIntegerField(default=0)
+    submissions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['contest', '-total_points', 'submissions'])]
+
+    def __str__(self):
+        return f"{self.participant.user.username} in {self.contest.title}: {self.total_points}"
+
+class ContestEvent(models.Model):
+    """Something subscribers of a contest's event stream are told about (core.utils.events)"""
+    KIND_VERDICT = 'verdict'
+    KIND_ANNOUNCEMENT = 'announcement'
+    KIND_STANDINGS = 'standings'
+    KIND_CHOICES = [
+        (KIND_VERDICT, 'Verdict'),
+        (KIND_ANNOUNCEMENT, 'Announcement'),
+        (KIND_STANDINGS, 'Standings changed'),
+    ]
+
+    contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    # Only this user is told, or everyone when empty
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.contest_id} {self.kind} #{self.id}"
+
 class ContestAnnouncement(models.Model):
     contest = models.ForeignKey(Contest, on_delete=models.CASCADE, related_name='announcements')
     title = models.CharField(max_length=200)
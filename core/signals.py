@@ -1,9 +1,58 @@
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from .models import UserProfile
+from .models import Contest, ContestAnnouncement, ContestParticipant, Problem, Solution, UserProfile
+from .utils import contest_list, events, testdata, user_stats
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created and not hasattr(instance, 'userprofile'):
         UserProfile.objects.create(user=instance, role='participant')
+
+
+@receiver(post_delete, sender=Problem)
+def delete_test_data(sender, instance, **kwargs):
+    testdata.delete(instance.uuid)
+
+
+@receiver(post_save, sender=Solution)
+def count_submission(sender, instance, created, **kwargs):
+    if created:
+        user_stats.record_submission(instance)
+
+
+@receiver(post_delete, sender=Solution)
+def uncount_submission(sender, instance, **kwargs):
+    user_stats.forget_submission(instance)
+
+
+@receiver(post_save, sender=ContestParticipant)
+def count_participation(sender, instance, created, **kwargs):
+    if created:
+        Contest.objects.filter(id=instance.contest_id).update(participant_count=F('participant_count') + 1)
+        user_stats.record_participation(instance)
+
+
+@receiver(post_delete, sender=ContestParticipant)
+def uncount_participation(sender, instance, **kwargs):
+    Contest.objects.filter(id=instance.contest_id).update(participant_count=F('participant_count') - 1)
+    user_stats.forget_participation(instance)
+
+
+@receiver(post_save, sender=Contest)
+@receiver(post_delete, sender=Contest)
+def refresh_contest_list(sender, instance, **kwargs):
+    contest_list.invalidate()
+
+
+@receiver(post_save, sender=ContestAnnouncement)
+def push_announcement(sender, instance, created, **kwargs):
+    events.announcement_changed(instance, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=ContestAnnouncement)
+def push_announcement_removal(sender, instance, origin=None, **kwargs):
+    # Not when the whole contest is being deleted
+    if isinstance(origin, ContestAnnouncement):
+        events.announcement_changed(instance, 'deleted')
@@ -1,3 +1,462 @@
-from django.test import TestCase
+import io
+import shutil
+import signal
+import sys
+import tempfile
+import unittest
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import (
+    Contest, ContestParticipant, ContestProblem, ContestSubmission, Problem, RejudgeJob, Solution, TestCaseStats
+)
+from .utils import checkers, languages, rejudge, sandbox, scoreboard, test_stats, testdata, verdict_cache
+from .utils.judge_queue import STALE_TASK_TIMEOUT
+from .utils.comparator import FloatComparator, StreamComparator, TokenComparator
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_zip(files):
+    """An in-memory ZIP archive of {name: content}"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class RunOrderTests(TestCase):
+    def setUp(self):
+        self.problem = Problem.objects.create(title='Sum', description='Add numbers', test_data_version=1)
+
+    def add_stats(self, test_number, runs, failures, total_time, version=1):
+        TestCaseStats.objects.create(
+            problem=self.problem, test_data_version=version, test_number=test_number,
+            runs=runs, failures=failures, total_time=total_time,
+        )
+
+    def test_stored_order_without_stats(self):
+        self.assertEqual(test_stats.run_order(self.problem, 4), [0, 1, 2, 3])
+
+    def test_most_failing_case_first(self):
+        self.add_stats(1, runs=10, failures=0, total_time=1.0)
+        self.add_stats(2, runs=10, failures=8, total_time=1.0)
+        self.add_stats(3, runs=10, failures=3, total_time=1.0)
+        self.assertEqual(test_stats.run_order(self.problem, 3), [1, 2, 0])
+
+    def test_ties_keep_stored_order(self):
+        for number in (1, 2, 3):
+            self.add_stats(number, runs=4, failures=1, total_time=0.4)
+        self.assertEqual(test_stats.run_order(self.problem, 3), [0, 1, 2])
+
+    def test_cheaper_case_first_at_equal_failure_rate(self):
+        self.add_stats(1, runs=10, failures=5, total_time=20.0)
+        self.add_stats(2, runs=10, failures=5, total_time=1.0)
+        self.assertEqual(test_stats.run_order(self.problem, 2), [1, 0])
+
+    def test_smoothing_outweighs_a_single_failure(self):
+        # One failure in one run is weaker evidence than 90 failures in 100 runs
+        self.add_stats(1, runs=1, failures=1, total_time=0.1)
+        self.add_stats(2, runs=100, failures=90, total_time=10.0)
+        self.assertEqual(test_stats.run_order(self.problem, 2), [1, 0])
+
+    def test_unseen_case_gets_prior_and_average_time(self):
+        self.add_stats(1, runs=100, failures=0, total_time=100.0)
+        self.add_stats(2, runs=100, failures=1, total_time=100.0)
+        self.assertEqual(test_stats.run_order(self.problem, 3), [2, 1, 0])
+
+    def test_other_versions_are_ignored(self):
+        self.add_stats(3, runs=10, failures=10, total_time=1.0, version=0)
+        self.assertEqual(test_stats.run_order(self.problem, 3), [0, 1, 2])
+
+
+class VerdictCacheKeyTests(TestCase):
+    def test_normalize_source(self):
+        self.assertEqual(
+            verdict_cache.normalize_source('\r\n\n  \r\nint main() {\r\n    return 0;\r}\n\n  '),
+            '\n\n  \nint main() {\n    return 0;\n}',
+        )
+
+    def test_source_hash_ignores_layout_noise_only(self):
+        code = 'print(input())\n'
+        self.assertEqual(verdict_cache.source_hash(code), verdict_cache.source_hash(code.replace('\n', '\r\n') + '   '))
+        self.assertNotEqual(verdict_cache.source_hash(code), verdict_cache.source_hash('\n' + code))
+        self.assertNotEqual(verdict_cache.source_hash(code), verdict_cache.source_hash('print( input())\n'))
+
+    def test_fingerprint_follows_the_checker(self):
+        problem = Problem(title='Sum', description='Add numbers')
+        base = verdict_cache.fingerprint(problem, 'python')
+        self.assertEqual(verdict_cache.fingerprint(problem, 'python'), base)
+
+        problem.checker = 'float'
+        self.assertNotEqual(verdict_cache.fingerprint(problem, 'python'), base)
+        with_float = verdict_cache.fingerprint(problem, 'python')
+        problem.float_tolerance = problem.float_tolerance * 10
+        self.assertNotEqual(verdict_cache.fingerprint(problem, 'python'), with_float)
+
+        problem.checker = 'custom'
+        problem.checker_source = 'import sys'
+        with_source = verdict_cache.fingerprint(problem, 'python')
+        problem.checker_source = 'import sys\nsys.exit(1)'
+        self.assertNotEqual(verdict_cache.fingerprint(problem, 'python'), with_source)
+
+    def test_fingerprint_depends_on_language(self):
+        problem = Problem(title='Sum', description='Add numbers')
+        self.assertNotEqual(verdict_cache.fingerprint(problem, 'python'), verdict_cache.fingerprint(problem, 'cpp'))
+
+
+class LimitVerdictTests(SimpleTestCase):
+    limits = {'time': 2, 'memory': 64, 'output': 1, 'processes': 1,
+              'limit_address_space': True, 'limit_processes': True}
+
+    def verdict(self, returncode=0, cpu_time=0.1, memory_kb=1024, stderr='', output_size=0):
+        result = sandbox.limit_verdict(returncode, cpu_time, memory_kb, stderr, output_size, self.limits)
+        return result and result[0]
+
+    def test_clean_run(self):
+        self.assertIsNone(self.verdict())
+        self.assertIsNone(self.verdict(returncode=1, stderr='Traceback: ZeroDivisionError'))
+
+    def test_time_limit(self):
+        self.assertEqual(self.verdict(returncode=-signal.SIGXCPU, cpu_time=2.0), 'TLE')
+        self.assertEqual(self.verdict(returncode=-signal.SIGKILL, cpu_time=2.1), 'TLE')
+        self.assertIsNone(self.verdict(returncode=-signal.SIGKILL, cpu_time=0.5))
+
+    def test_output_limit(self):
+        self.assertEqual(self.verdict(returncode=-signal.SIGXFSZ), 'OLE')
+        self.assertEqual(self.verdict(output_size=1024 * 1024 + 1), 'OLE')
+        self.assertEqual(self.verdict(returncode=1, stderr='OSError: [Errno 27] File too large'), 'OLE')
+
+    def test_memory_limit(self):
+        self.assertEqual(self.verdict(memory_kb=64 * 1024 + 1), 'MLE')
+        self.assertEqual(self.verdict(returncode=-signal.SIGSEGV, memory_kb=60 * 1024), 'MLE')
+        self.assertEqual(self.verdict(returncode=1, stderr='MemoryError'), 'MLE')
+        self.assertIsNone(self.verdict(memory_kb=60 * 1024))
+
+
+class ComparatorTests(SimpleTestCase):
+    def judge(self, comparator, chunks):
+        for chunk in chunks:
+            if not comparator.feed(chunk):
+                break
+        verdict = comparator.finish()
+        comparator.close()
+        return verdict
+
+    def test_exact_ignores_line_endings_and_trailing_whitespace(self):
+        self.assertEqual(self.judge(StreamComparator('1 2\n3\n'), [b'1 2  \r\n3\r\n\n\n']), 'AC')
+
+    def test_exact_across_chunk_boundaries(self):
+        output = b'hello world\r\n42 \n'
+        self.assertEqual(self.judge(StreamComparator('hello world\n42'), [bytes([b]) for b in output]), 'AC')
+
+    def test_exact_mismatch(self):
+        comparator = StreamComparator('1 2\n')
+        self.assertFalse(comparator.feed(b'1 3\n'))
+        self.assertEqual(comparator.finish(), 'WA')
+        self.assertEqual(self.judge(StreamComparator('1 2\n3\n'), [b'1 2\n']), 'WA')
+        self.assertEqual(self.judge(StreamComparator('1 2\n'), [b'1 2\n3\n']), 'WA')
+        self.assertEqual(self.judge(StreamComparator('1 2\n'), [b'1  2\n']), 'WA')
+
+    def test_tokens(self):
+        self.assertEqual(self.judge(TokenComparator('1 2\n3\n'), [b'1\n2   3']), 'AC')
+        comparator = TokenComparator('1 2 3')
+        self.assertEqual(self.judge(comparator, [b'1 2']), 'WA')
+        self.assertEqual(comparator.message, 'Output has fewer tokens than expected')
+        comparator = TokenComparator('1 2')
+        self.assertEqual(self.judge(comparator, [b'1 2 3']), 'WA')
+        self.assertEqual(comparator.message, 'Output has more tokens than expected')
+
+    def test_float_tolerance(self):
+        self.assertEqual(self.judge(FloatComparator('0.333333 1000000', 1e-6), [b'0.3333334 1000000.5']), 'AC')
+        comparator = FloatComparator('0.5', 1e-6)
+        self.assertEqual(self.judge(comparator, [b'0.501']), 'WA')
+        self.assertIn('Expected 0.5, got 0.501', comparator.message)
+        self.assertEqual(self.judge(FloatComparator('yes', 1e-6), [b'no']), 'WA')
+
+    def test_make_comparator(self):
+        self.assertIsInstance(checkers.make_comparator(None, '', '1'), StreamComparator)
+        self.assertIs(type(checkers.make_comparator({'type': 'tokens', 'tolerance': 0}, '', '1')), TokenComparator)
+        self.assertIsInstance(checkers.make_comparator({'type': 'float', 'tolerance': 1e-6}, '', '1'), FloatComparator)
+
+
+# Exits with the code the contestant's output names, after echoing a comment
+EXIT_CODE_CHECKER = """
+import sys
+print('checker says', open(sys.argv[2]).read().strip())
+sys.exit(int(open(sys.argv[2]).read()))
+"""
+
+
+class CheckerExitCodeTests(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.program = {'language': 'python', 'run_cmd': [sys.executable, f'{self.temp_dir}/checker.py']}
+        with open(self.program['run_cmd'][1], 'w') as f:
+            f.write(EXIT_CODE_CHECKER)
+
+    def judge(self, exit_code):
+        comparator = checkers.make_comparator({'type': 'custom', 'program': self.program}, '1 2\n', '3\n')
+        try:
+            comparator.feed(str(exit_code).encode())
+            return comparator.finish(), comparator.message
+        finally:
+            comparator.close()
+
+    def test_accepted(self):
+        self.assertEqual(self.judge(checkers.CHECKER_ACCEPTED), ('AC', 'checker says 0'))
+
+    def test_wrong_answer(self):
+        self.assertEqual(self.judge(checkers.CHECKER_WRONG_ANSWER), ('WA', 'checker says 1'))
+
+    def test_presentation_error(self):
+        self.assertEqual(
+            self.judge(checkers.CHECKER_PRESENTATION_ERROR), ('WA', 'Presentation error: checker says 2')
+        )
+
+    def test_checker_failure(self):
+        self.assertEqual(self.judge(3), ('IE', 'Checker failed with exit code 3: checker says 3'))
+
+    def test_custom_checker_is_compiled(self):
+        with self.settings(CODE_EXECUTION=dict(settings.CODE_EXECUTION, TEMP_DIR=self.temp_dir)):
+            problem = Problem(checker='custom', checker_language='python', checker_source=EXIT_CODE_CHECKER)
+            checker = checkers.load_checker(problem)
+        self.assertEqual(checker['type'], 'custom')
+        self.assertIn('program', checker)
+
+    def test_missing_toolchain_is_not_remembered(self):
+        toolchain = dict(languages.get('python'), available=False, missing=[])
+        with self.settings(CODE_EXECUTION=dict(settings.CODE_EXECUTION, TEMP_DIR=self.temp_dir)):
+            with mock.patch.object(languages, 'get', return_value=toolchain):
+                self.assertEqual(checkers.compile_checker('python', EXIT_CODE_CHECKER)['verdict'], 'CE')
+            self.assertEqual(checkers.compile_checker('python', EXIT_CODE_CHECKER)['verdict'], 'OK')
+
+    @unittest.skipUnless(shutil.which('g++'), 'g++ is not installed')
+    def test_compile_error_is_remembered(self):
+        with self.settings(CODE_EXECUTION=dict(settings.CODE_EXECUTION, TEMP_DIR=self.temp_dir)):
+            program = checkers.compile_checker('cpp', 'int main( {')
+            self.assertEqual(program['verdict'], 'CE')
+            checkers._compiled.clear()
+            with mock.patch('core.utils.execution.compile_code') as compile_code:
+                self.assertEqual(checkers.compile_checker('cpp', 'int main( {'), program)
+            compile_code.assert_not_called()
+
+
+class StageArchiveTests(SimpleTestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def read_cases(self, staged):
+        return [
+            tuple(
+                testdata.read_text(testdata.Blob(case[f'{kind}_sha256'], case[f'{kind}_size']))
+                for kind in ('input', 'output')
+            )
+            for case in staged.cases
+        ]
+
+    def test_cases_in_numeric_order(self):
+        staged = testdata.stage_archive(make_zip({
+            'tests/10.in': '10', 'tests/10.out': '100',
+            'tests/2.in': '2', 'tests/2.out': '4',
+            '__MACOSX/tests/._2.in': 'resource fork',
+            'tests/.DS_Store': '',
+        }))
+        self.addCleanup(staged.discard)
+        self.assertEqual(self.read_cases(staged), [('2', '4'), ('10', '100')])
+
+    def assertRejected(self, archive, message):
+        with self.assertRaisesMessage(testdata.TestDataError, message):
+            testdata.stage_archive(archive)
+
+    def test_not_a_zip(self):
+        self.assertRejected(io.BytesIO(b'01.in 1\n01.out 1\n'), 'not a valid ZIP archive')
+
+    def test_unexpected_file(self):
+        self.assertRejected(make_zip({'01.in': '1', '01.out': '1', 'solution.cpp': ''}), "Unexpected file 'solution.cpp'")
+
+    def test_missing_output(self):
+        self.assertRejected(make_zip({'01.in': '1', '01.out': '1', '02.in': '2'}), 'Test case 2 has no .out file')
+
+    def test_duplicate_case(self):
+        self.assertRejected(make_zip({'01.in': '1', '01.out': '1', 'extra/01.in': '1'}), 'Test case 01 appears more than once')
+
+    def test_no_cases(self):
+        self.assertRejected(make_zip({'.gitkeep': ''}), 'contains no test cases')
+
+    def test_too_large(self):
+        with self.settings(CODE_EXECUTION=dict(settings.CODE_EXECUTION, TESTDATA_MAX_SIZE=0)):
+            self.assertRejected(make_zip({'01.in': '1', '01.out': '1'}), 'Test data exceeds 0 MB')
+
+
+@override_settings(CACHES=LOCMEM_CACHE, SCOREBOARD={'SNAPSHOT_INTERVAL': 0, 'SNAPSHOT_HISTORY': 10})
+class ScoreboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.admin = User.objects.create_user('admin', password='pw', is_staff=True)
+        self.contest = Contest.objects.create(
+            title='Round 1', description='First round', created_by=self.admin,
+            start_time=now - timedelta(hours=2), end_time=now + timedelta(hours=1),
+        )
+        self.problems = [Problem.objects.create(title=f'P{i}', description='Solve it') for i in range(2)]
+        for order, problem in enumerate(self.problems, start=1):
+            ContestProblem.objects.create(contest=self.contest, problem=problem, order=order)
+        self.participants = [
+            ContestParticipant.objects.create(contest=self.contest, user=User.objects.create_user(f'user{i}', password='pw'))
+            for i in range(3)
+        ]
+        self.url = f'/api/contest/{self.contest.uuid}/standings/'
+
+    def submit(self, participant, problem, points, when=None):
+        solution = Solution.objects.create(
+            user=participant.user, problem=problem, code='print(1)', language='python',
+            verdict='AC' if points == 100 else 'WA', status='AC' if points == 100 else 'WA',
+        )
+        submission = ContestSubmission.objects.create(
+            contest=self.contest, participant=participant, problem=problem, solution=solution,
+            points_awarded=points, score=points, verdict=solution.verdict,
+        )
+        if when is not None:
+            ContestSubmission.objects.filter(id=submission.id).update(submitted_at=when)
+        scoreboard.refresh_submission(submission)
+        self.contest.refresh_from_db()
+
+    def points(self, snapshot):
+        return {row['participant']['user']['username']: row['total_points'] for row in snapshot['rows']}
+
+    def test_changes_since(self):
+        self.submit(self.participants[0], self.problems[0], 100)
+        first = scoreboard.snapshot(self.contest)
+        self.assertEqual(scoreboard.changes_since(first, first['version']), ([], []))
+        self.assertIsNone(scoreboard.changes_since(first, 'unknown'))
+
+        self.submit(self.participants[1], self.problems[1], 50)
+        second = scoreboard.snapshot(self.contest)
+        self.assertNotEqual(second['version'], first['version'])
+        rows, removed = scoreboard.changes_since(second, first['version'])
+        self.assertEqual([row['participant']['user']['username'] for row in rows], ['user1'])
+        self.assertEqual(removed, [])
+
+    def test_etag(self):
+        client = self.client
+        client.force_login(self.participants[0].user)
+        self.submit(self.participants[0], self.problems[0], 100)
+
+        response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"scoreboard-'))
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag.removeprefix('W/')).status_code, 304)
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=f'"other", {etag}').status_code, 304)
+
+        self.submit(self.participants[1], self.problems[0], 100)
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_since_returns_only_changed_rows(self):
+        client = self.client
+        client.force_login(self.participants[0].user)
+        self.submit(self.participants[0], self.problems[0], 100)
+        version = client.get(self.url).json()['version']
+
+        self.submit(self.participants[2], self.problems[1], 100)
+        data = client.get(self.url, {'since': version}).json()
+        self.assertFalse(data['full'])
+        changed = [row['participant']['user']['username'] for row in data['rows']]
+        # user1 is only in the diff because user2 overtook them
+        self.assertEqual(sorted(changed), ['user1', 'user2'])
+        self.assertTrue(client.get(self.url, {'since': 'unknown'}).json()['full'])
+
+    def test_freeze_cut_off(self):
+        now = timezone.now()
+        self.contest.freeze_duration = timedelta(hours=4)
+        self.contest.save()
+        # end - freeze_duration is before the start, so the freeze starts with the contest
+        self.assertEqual(self.contest.freeze_time, self.contest.start_time)
+
+        self.contest.freeze_duration = timedelta(minutes=90)
+        self.contest.save()
+        self.assertEqual(self.contest.freeze_time, self.contest.end_time - timedelta(minutes=90))
+        self.assertTrue(self.contest.is_scoreboard_frozen)
+
+        self.submit(self.participants[0], self.problems[0], 100, when=now - timedelta(hours=1))
+        self.submit(self.participants[1], self.problems[0], 100, when=now - timedelta(minutes=10))
+
+        public = scoreboard.snapshot(self.contest)
+        self.assertTrue(public['frozen'])
+        self.assertEqual(self.points(public)['user0'], 100)
+        self.assertEqual(self.points(public)['user1'], 0)
+
+        live = scoreboard.snapshot(self.contest, live=True)
+        self.assertFalse(live['frozen'])
+        self.assertEqual(self.points(live)['user1'], 100)
+
+        frozen_version = public['version']
+        self.submit(self.participants[2], self.problems[1], 100)
+        self.assertEqual(scoreboard.snapshot(self.contest)['version'], frozen_version)
+
+    def test_outsider_is_forbidden(self):
+        self.contest.password = 'secret'
+        self.contest.save()
+        self.client.force_login(User.objects.create_user('outsider', password='pw'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+# Rejudging judges in worker threads, which need to see committed rows
+class RejudgeJobTests(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create_user('solver', password='pw')
+        problem = Problem.objects.create(title='Sum', description='Add numbers')
+        for i in range(3):
+            Solution.objects.create(
+                user=user, problem=problem, code=f'print({i})', language='python', verdict='WA', status='WA'
+            )
+        self.clock = [timezone.now()]
+        clock_patch = mock.patch('django.utils.timezone.now', side_effect=lambda: self.clock[0])
+        clock_patch.start()
+        self.addCleanup(clock_patch.stop)
+
+    def test_running_job_is_not_reclaimed_while_making_progress(self):
+        requeued = []
+
+        def slow_judge(solution, mode, order):
+            # Each solution takes most of the stale window, the batch far longer than it
+            self.clock[0] += STALE_TASK_TIMEOUT * 0.6
+            requeued.append(rejudge.requeue_stale_jobs())
+            return {'verdict': 'AC', 'score': 100}
+
+        rejudge.create_job(Solution.objects.all())
+        job = rejudge.claim_next_job('worker-1')
+        with mock.patch.object(rejudge, '_judge', slow_judge), \
+                self.settings(CODE_EXECUTION=dict(settings.CODE_EXECUTION, VERDICT_CACHE=False)):
+            job = rejudge.run_job(job)
+
+        self.assertEqual(requeued, [0, 0, 0])
+        self.assertEqual((job.status, job.judged, job.changed), (RejudgeJob.STATUS_DONE, 3, 3))
+        self.assertEqual(set(Solution.objects.values_list('verdict', flat=True)), {'AC'})
+
+    def test_stalled_job_is_reclaimed(self):
+        rejudge.create_job(Solution.objects.all())
+        rejudge.claim_next_job('worker-1')
+        self.clock[0] += STALE_TASK_TIMEOUT * 0.5
+        self.assertEqual(rejudge.requeue_stale_jobs(), 0)
+        self.clock[0] += STALE_TASK_TIMEOUT
+        self.assertEqual(rejudge.requeue_stale_jobs(), 1)
+        self.assertIsNotNone(rejudge.claim_next_job('worker-2'))
@@ -36,4 +36,7 @@ urlpatterns = [
     
     # API Endpoints
     path('api/contest/<uuid:contest_uuid>/timer/', views.contest_timer_api, name='contest_timer_api'),  
+    path('api/contest/<uuid:contest_uuid>/standings/', views.contest_standings_api, name='contest_standings_api'),
+    path('api/contest/<uuid:contest_uuid>/events/', views.contest_events, name='contest_events'),
+    path('api/submission/<int:submission_id>/status/', views.submission_status_api, name='submission_status_api'),
 ]
\ No newline at end of file
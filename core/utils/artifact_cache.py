@@ -0,0 +1,161 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from functools import lru_cache
+
+from django.conf import settings
+
+# Files that belong to the cache bookkeeping rather than to the artifact
+META_FILE = 'meta.json'
+ERROR_FILE = 'compile_error.txt'
+LOCK_FILE = '.lock'
+
+
+def _cache_root():
+    """Directory holding one sub-directory per cached artifact"""
+    root = os.path.join(settings.CODE_EXECUTION['TEMP_DIR'], 'artifacts')
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def _max_bytes():
+    return settings.CODE_EXECUTION.get('ARTIFACT_CACHE_SIZE', 512) * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def compiler_version(compiler_path):
+    """First line of `<compiler> --version`, probed once per process"""
+    try:
+        proc = subprocess.run(
+            [compiler_path, '-version' if compiler_path.endswith('javac') else '--version'],
+            capture_output=True, text=True, timeout=10
+        )
+        lines = (proc.stdout or proc.stderr).strip().splitlines()
+        return lines[0] if lines else compiler_path
+    except Exception:
+        return compiler_path
+
+
+def cache_key(language, compiler_path, flags, code):
+    """Content address of a compiled artifact"""
+    source_hash = hashlib.sha256(code.encode('utf-8')).hexdigest()
+    key_data = json.dumps([language, compiler_version(compiler_path), list(flags), source_hash])
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+
+def fetch(key, work_dir):
+    """
+    Materialize a cached artifact into work_dir.
+
+    Returns None on a miss, {'error': ...} for a cached compilation error and
+    {'files': [...]} when the compiled files were copied into work_dir.
+    """
+    entry = os.path.join(_cache_root(), key)
+    try:
+        names = os.listdir(entry)
+        if ERROR_FILE in names:
+            with open(os.path.join(entry, ERROR_FILE), encoding='utf-8') as f:
+                result = {'error': f.read()}
+        else:
+            files = [name for name in names if name != META_FILE]
+            for name in files:
+                # Copy rather than hard-link: the submission can write to its
+                # working directory and must not be able to poison the cache
+                shutil.copy2(os.path.join(entry, name), os.path.join(work_dir, name))
+            result = {'files': files}
+        # Bump the entry's mtime so eviction treats it as recently used
+        os.utime(entry)
+    except OSError:
+        # Missing entry, or evicted by another worker while we were reading it
+        return None
+
+    print(f"[DEBUG] Artifact cache hit: {key[:12]}")
+    return result
+
+
+def store(key, work_dir, files=(), error=None):
+    """
+    Publish the compiled files from work_dir (or the compilation error) under key.
+
+    The entry is assembled in a private directory and renamed into place, so
+    concurrent workers never observe a partially written artifact.
+    """
+    root = _cache_root()
+    try:
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=root)
+        size = 0
+        if error is not None:
+            with open(os.path.join(staging, ERROR_FILE), 'w', encoding='utf-8') as f:
+                f.write(error)
+            size += len(error)
+        for name in files:
+            dst = os.path.join(staging, name)
+            shutil.copy2(os.path.join(work_dir, name), dst)
+            size += os.path.getsize(dst)
+        with open(os.path.join(staging, META_FILE), 'w') as f:
+            json.dump({'size': size, 'created_at': time.time()}, f)
+
+        try:
+            os.rename(staging, os.path.join(root, key))
+        except OSError:
+            # Another worker published the same artifact first
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+    except OSError as e:
+        print(f"[DEBUG] Could not cache artifact {key[:12]}: {e}")
+        return
+
+    evict()
+
+
+def _entry_size(entry):
+    try:
+        with open(os.path.join(entry, META_FILE)) as f:
+            return json.load(f)['size']
+    except (OSError, ValueError, KeyError):
+        return sum(
+            os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry)
+        )
+
+
+def evict():
+    """Drop least recently used entries until the cache fits in ARTIFACT_CACHE_SIZE"""
+    root = _cache_root()
+    with open(os.path.join(root, LOCK_FILE), 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another worker is already evicting
+            return
+
+        entries = []
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if name.startswith('.staging-'):
+                # Left behind by a worker that died mid-store
+                try:
+                    if time.time() - os.path.getmtime(path) > 3600:
+                        shutil.rmtree(path, ignore_errors=True)
+                except OSError:
+                    pass
+                continue
+            if name.startswith('.'):
+                continue
+            try:
+                entries.append((os.path.getmtime(path), _entry_size(path), path))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        limit = _max_bytes()
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            print(f"[DEBUG] Evicted artifact {os.path.basename(path)[:12]}")
@@ -0,0 +1,190 @@
+"""
+Output checkers for problems whose answers are not unique.
+
+A problem uses either a built-in comparison ('exact', 'tokens', 'float') or
+a custom checker program written by the setter in C++ or Python. Custom
+checkers follow the testlib convention:
+
+    checker <input file> <output file> <answer file>
+
+exit code 0 means accepted, 1 wrong answer, 2 presentation error (judged as
+WA); anything else, or a crash, is an internal error. Whatever the checker
+prints becomes the message shown with the verdict.
+
+A checker is compiled once per source into TEMP_DIR/checkers/<hash>/ and
+shared by every judge process, so test cases only pay for running it.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+
+from django.conf import settings
+
+from . import sandbox, testdata, workspace
+from .comparator import FloatComparator, PREVIEW_BYTES, StreamComparator, TokenComparator
+
+CHECKER_ACCEPTED = 0
+CHECKER_WRONG_ANSWER = 1
+CHECKER_PRESENTATION_ERROR = 2
+
+# Characters of checker output kept as the verdict message
+CHECKER_MESSAGE_LIMIT = 1000
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def _checker_dir(language, source):
+    key = hashlib.sha256(f'{language}\0{source}'.encode('utf-8')).hexdigest()
+    return os.path.join(settings.CODE_EXECUTION['TEMP_DIR'], 'checkers', key)
+
+
+def compile_checker(language, source):
+    """
+    The compiled checker program for this source, building it on first use.
+
+    Returns a program dict like compile_code's, or a CE result. Both are
+    remembered on disk, so a broken checker is not recompiled per submission.
+    Failures of the judge itself, e.g. a missing toolchain, are not
+    remembered, so the next submission tries again.
+    """
+    from .execution import compile_code
+
+    directory = _checker_dir(language, source)
+    with _compiled_lock:
+        if directory in _compiled:
+            return _compiled[directory]
+
+    os.makedirs(directory, exist_ok=True)
+    marker = os.path.join(directory, 'program.json')
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not os.path.exists(marker):
+            program = compile_code(language, source, directory)
+            if program['verdict'] != 'OK' and not program.get('from_compiler'):
+                print(f"[DEBUG] Checker could not be compiled, will retry: {program.get('error')}")
+                return program
+            # Checkers always run as plain processes
+            program.pop('forkserver', None)
+            with open(marker + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(program, f)
+            os.rename(marker + '.tmp', marker)
+        with open(marker, encoding='utf-8') as f:
+            program = json.load(f)
+
+    with _compiled_lock:
+        _compiled[directory] = program
+    return program
+
+
+def load_checker(problem):
+    """
+    Checker settings for judging a problem, compiling a custom checker if needed.
+
+    Returns None for the default exact comparison, or a dict with 'type' and
+    either 'tolerance' or the compiled 'program'. A custom checker that does
+    not compile comes back with an 'error' instead.
+    """
+    checker_type = getattr(problem, 'checker', 'exact') or 'exact'
+    if checker_type == 'exact':
+        return None
+    if checker_type in ('tokens', 'float'):
+        return {'type': checker_type, 'tolerance': problem.float_tolerance}
+
+    if not problem.checker_source.strip():
+        return {'type': 'custom', 'error': 'Custom checker has no source'}
+    program = compile_checker(problem.checker_language, problem.checker_source)
+    if program['verdict'] != 'OK':
+        return {'type': 'custom', 'error': f"Checker failed to compile:\n{program.get('error', '')}"}
+    return {'type': 'custom', 'program': program}
+
+
+class CheckerComparator:
+    """Collects stdout into a file, then lets a custom checker judge it"""
+
+    def __init__(self, program, input_data, expected):
+        self.program = program
+        self.work_dir = workspace.acquire()
+        self.paths = [
+            self._as_file(input_data, 'input.txt'),
+            os.path.join(self.work_dir, 'output.txt'),
+            self._as_file(expected, 'answer.txt'),
+        ]
+        self.output = open(self.paths[1], 'wb')
+        self.message = ''
+        self.size = 0
+        self.preview = b''
+        self.expected_preview = testdata.read_text(expected, PREVIEW_BYTES)
+
+    def _as_file(self, data, name):
+        """Path of a file in the workspace holding data, decompressing stored test files"""
+        path = os.path.join(self.work_dir, name)
+        with testdata.open_data(data) as source, open(path, 'wb') as f:
+            shutil.copyfileobj(source, f, testdata.COPY_CHUNK)
+        return path
+
+    def feed(self, chunk):
+        self.output.write(chunk)
+        self.size += len(chunk)
+        if len(self.preview) < PREVIEW_BYTES:
+            self.preview += chunk[:PREVIEW_BYTES - len(self.preview)]
+        return True
+
+    def finish(self):
+        self.output.close()
+        return self._run_checker()
+
+    def close(self):
+        self.output.close()
+        if self.work_dir is not None:
+            workspace.release(self.work_dir)
+            self.work_dir = None
+
+    def _run_checker(self):
+        limits = sandbox.get_limits(self.program['language'])
+        try:
+            result = subprocess.run(
+                [*self.program['run_cmd'], *self.paths],
+                cwd=self.work_dir,
+                capture_output=True,
+                timeout=sandbox.wall_time_limit(limits),
+                preexec_fn=sandbox.make_preexec(limits),
+            )
+        except subprocess.TimeoutExpired:
+            self.message = 'Checker timed out'
+            return 'IE'
+
+        comment = (result.stdout + result.stderr).decode('utf-8', errors='replace').strip()
+        self.message = comment[:CHECKER_MESSAGE_LIMIT]
+        print(f"[DEBUG] Checker exited with {result.returncode}: {self.message}")
+        if result.returncode == CHECKER_ACCEPTED:
+            return 'AC'
+        if result.returncode == CHECKER_WRONG_ANSWER:
+            return 'WA'
+        if result.returncode == CHECKER_PRESENTATION_ERROR:
+            self.message = f"Presentation error: {self.message}"
+            return 'WA'
+        self.message = f"Checker failed with exit code {result.returncode}: {self.message}"
+        return 'IE'
+
+    def actual_output(self):
+        text = self.preview.decode('utf-8', errors='replace').strip()
+        return text + '...' if self.size > len(self.preview) else text
+
+    def expected_output(self):
+        return self.expected_preview.strip()
+
+
+def make_comparator(checker, input_data, expected_output):
+    """The comparator that judges one test case's stdout"""
+    if checker is None:
+        return StreamComparator(expected_output)
+    if checker['type'] == 'tokens':
+        return TokenComparator(expected_output)
+    if checker['type'] == 'float':
+        return FloatComparator(expected_output, checker['tolerance'])
+    return CheckerComparator(checker['program'], input_data, expected_output)
@@ -0,0 +1,272 @@
+"""
+Incremental comparison of a program's stdout against the expected output.
+
+The default (exact) comparison normalizes both sides the same way while
+they stream through:
+
+* "\\r\\n" and lone "\\r" count as "\\n";
+* trailing whitespace on every line is ignored;
+* leading and trailing whitespace of the whole output is ignored.
+
+Only whitespace that may turn out to be trailing is held back, so memory use
+is bounded by the longest run of whitespace rather than by the output size.
+
+TokenComparator and FloatComparator are the built-in checkers for problems
+where only the sequence of tokens, or numbers within a tolerance, matters.
+"""
+import io
+
+WHITESPACE = b' \t\n\r\x0b\x0c'
+LINE_SPACE = b' \t\x0b\x0c'
+
+# Bytes of normalized output kept for display on either side
+PREVIEW_BYTES = 64 * 1024
+
+# Bytes read from the expected output at a time
+READ_CHUNK = 64 * 1024
+
+
+class Normalizer:
+    """Turns raw output chunks into normalized bytes as they arrive"""
+
+    def __init__(self):
+        self.started = False
+        self.pending = b''
+
+    def feed(self, chunk):
+        data = self.pending + chunk
+        content = data.rstrip(WHITESPACE)
+        # Whitespace at the end may be trailing; decide once more output arrives
+        self.pending = data[len(content):]
+        if not self.started:
+            content = content.lstrip(WHITESPACE)
+            if not content:
+                return b''
+            self.started = True
+        # content ends with a non-whitespace byte, so no "\r\n" is split here
+        content = content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        if any(space + b'\n' in content for space in (b' ', b'\t', b'\x0b', b'\x0c')):
+            content = b'\n'.join([line.rstrip(LINE_SPACE) for line in content.split(b'\n')])
+        return content
+
+    def finish(self):
+        """Whatever is still pending is trailing whitespace"""
+        self.pending = b''
+        return b''
+
+
+class NormalizedReader:
+    """Reads normalized bytes from a binary file-like object"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.normalizer = Normalizer()
+        self.buffer = b''
+        self.eof = False
+
+    def read(self, size):
+        while len(self.buffer) < size and not self.eof:
+            chunk = self.raw.read(READ_CHUNK)
+            if chunk:
+                self.buffer += self.normalizer.feed(chunk)
+            else:
+                self.buffer += self.normalizer.finish()
+                self.eof = True
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def _preview(data, truncated):
+    text = data.decode('utf-8', errors='replace')
+    return text + '...' if truncated else text
+
+
+def _as_stream(expected):
+    """expected output given as str, bytes, a stored test file or a binary file-like object"""
+    if hasattr(expected, 'open'):
+        return expected.open()
+    if isinstance(expected, str):
+        expected = expected.encode('utf-8')
+    if isinstance(expected, bytes):
+        expected = io.BytesIO(expected)
+    return expected
+
+
+class StreamComparator:
+    """
+    Compares stdout fed in chunks against the expected output.
+
+    Comparators share one interface: feed() every stdout chunk until it
+    returns False, then call finish() for the verdict ('AC', 'WA' or 'IE')
+    with any explanation left in `message`. After the first mismatch
+    `failed` is set and further output is ignored, so the caller can stop
+    the program early.
+    """
+
+    def __init__(self, expected):
+        self.stream = _as_stream(expected)
+        self.expected = NormalizedReader(self.stream)
+        self.normalizer = Normalizer()
+        self.failed = False
+        self.message = ''
+        self.compared = 0
+        self.actual_preview = b''
+        self.expected_preview = b''
+
+    def _keep(self, actual, expected):
+        room = PREVIEW_BYTES - len(self.actual_preview)
+        if room > 0:
+            self.actual_preview += actual[:room]
+        room = PREVIEW_BYTES - len(self.expected_preview)
+        if room > 0:
+            self.expected_preview += expected[:room]
+
+    def _compare(self, actual):
+        if self.failed or not actual:
+            return
+        expected = self.expected.read(len(actual))
+        self._keep(actual, expected)
+        if actual != expected:
+            self.failed = True
+            # Show a little of what was expected beyond the mismatch
+            self._keep(b'', self.expected.read(max(PREVIEW_BYTES - len(self.expected_preview), 0)))
+        self.compared += len(actual)
+
+    def feed(self, chunk):
+        self._compare(self.normalizer.feed(chunk))
+        return not self.failed
+
+    def finish(self):
+        """Call at end of output; returns the verdict"""
+        self._compare(self.normalizer.finish())
+        if not self.failed:
+            rest = self.expected.read(1)
+            if rest:
+                self._keep(b'', rest + self.expected.read(PREVIEW_BYTES))
+                self.failed = True
+        return 'WA' if self.failed else 'AC'
+
+    def actual_output(self):
+        """Normalized actual output, cut off after PREVIEW_BYTES"""
+        return _preview(self.actual_preview, self.compared > len(self.actual_preview))
+
+    def expected_output(self):
+        """Normalized expected output that was compared, cut off after PREVIEW_BYTES"""
+        truncated = len(self.expected_preview) >= PREVIEW_BYTES and not self.expected.eof
+        return _preview(self.expected_preview, truncated)
+
+    def close(self):
+        """Release whatever the comparator holds; called once the test case is done"""
+        self.stream.close()
+
+
+class TokenReader:
+    """Reads whitespace-separated tokens from a binary file-like object"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.tokens = []
+        self.carry = b''
+        self.eof = False
+
+    def take(self, count):
+        while len(self.tokens) < count and not self.eof:
+            chunk = self.raw.read(READ_CHUNK)
+            if not chunk:
+                self.eof = True
+                if self.carry:
+                    self.tokens.append(self.carry)
+                break
+            data = self.carry + chunk
+            tokens = data.split()
+            # A token touching the end of the chunk may continue in the next one
+            self.carry = tokens.pop() if tokens and data[-1:] not in WHITESPACE else b''
+            self.tokens += tokens
+        taken, self.tokens = self.tokens[:count], self.tokens[count:]
+        return taken
+
+
+class TokenComparator(StreamComparator):
+    """Compares whitespace-separated tokens, ignoring how they are laid out"""
+
+    def __init__(self, expected):
+        self.stream = _as_stream(expected)
+        self.expected = TokenReader(self.stream)
+        self.carry = b''
+        self.failed = False
+        self.message = ''
+        self.compared = 0
+        self.actual_preview = b''
+        self.expected_preview = b''
+
+    def tokens_match(self, actual, expected):
+        return actual == expected
+
+    def _compare_tokens(self, actual):
+        if self.failed or not actual:
+            return
+        expected = self.expected.take(len(actual))
+        self._keep(b'', b' '.join(expected) + b' ')
+        if len(actual) != len(expected) or not self.tokens_match(actual, expected):
+            self.failed = True
+            if len(expected) < len(actual):
+                self.message = 'Output has more tokens than expected'
+
+    def feed(self, chunk):
+        if self.failed:
+            return False
+        # Show the program's own layout, not the re-joined tokens
+        self._keep(chunk, b'')
+        self.compared += len(chunk)
+        data = self.carry + chunk
+        tokens = data.split()
+        self.carry = tokens.pop() if tokens and data[-1:] not in WHITESPACE else b''
+        self._compare_tokens(tokens)
+        return not self.failed
+
+    def actual_output(self):
+        return _preview(self.actual_preview.strip(), self.compared > len(self.actual_preview))
+
+    def expected_output(self):
+        return _preview(self.expected_preview.strip(), not self.expected.eof)
+
+    def finish(self):
+        if self.carry:
+            self._compare_tokens([self.carry])
+            self.carry = b''
+        if not self.failed:
+            rest = self.expected.take(PREVIEW_BYTES // 8)
+            if rest:
+                self._keep(b'', b' '.join(rest))
+                self.failed = True
+                self.message = 'Output has fewer tokens than expected'
+        return 'WA' if self.failed else 'AC'
+
+
+class FloatComparator(TokenComparator):
+    """
+    Token comparison where numeric tokens only need to agree within an
+    absolute or relative error of `tolerance`.
+    """
+
+    def __init__(self, expected, tolerance):
+        super().__init__(expected)
+        self.tolerance = tolerance
+
+    def tokens_match(self, actual, expected):
+        if actual == expected:
+            return True
+        for got, want in zip(actual, expected):
+            if got == want:
+                continue
+            try:
+                got_value, want_value = float(got), float(want)
+            except ValueError:
+                return False
+            if not abs(got_value - want_value) <= self.tolerance * max(1.0, abs(want_value)):
+                self.message = (
+                    f"Expected {want.decode(errors='replace')}, got {got.decode(errors='replace')} "
+                    f"(tolerance {self.tolerance:g})"
+                )
+                return False
+        return True
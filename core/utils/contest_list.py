@@ -0,0 +1,54 @@
+"""
+Briefly cached pages of the contest list.
+
+Which contests match a status/type/search filter, and how many, is
+cached for CACHE_SECONDS as a list of ids per page; every request then
+loads just that page's contests by id. Saving or deleting a contest
+starts a new cache generation, so edits show up at once in every worker
+sharing the cache (settings.CACHES). A contest
+moving from upcoming to running to ended can take up to CACHE_SECONDS
+to move between status filters.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+
+from core.models import Contest
+
+CACHE_SECONDS = 30
+PAGE_SIZE = 10
+
+_GENERATION_KEY = 'contest_list:generation'
+
+
+def invalidate():
+    try:
+        cache.incr(_GENERATION_KEY)
+    except ValueError:
+        cache.set(_GENERATION_KEY, 1, None)
+
+
+def get_page(contests, filters, page_number):
+    """
+    The requested Page of the contests queryset; filters are the values it
+    was filtered by, which together with page_number make the cache key.
+    """
+    generation = cache.get_or_set(_GENERATION_KEY, 0, None)
+    digest = hashlib.sha1(repr((sorted(filters.items()), page_number)).encode('utf-8')).hexdigest()
+    key = f"contest_list:{generation}:{digest}"
+
+    cached = cache.get(key)
+    if cached is None:
+        paginator = Paginator(contests.values_list('id', flat=True), PAGE_SIZE)
+        page = paginator.get_page(page_number)
+        cached = {'ids': list(page.object_list), 'count': paginator.count, 'number': page.number}
+        cache.set(key, cached, CACHE_SECONDS)
+
+    paginator = Paginator(contests, PAGE_SIZE)
+    paginator.count = cached['count']
+    page = paginator.page(cached['number'])
+    by_id = Contest.objects.in_bulk(cached['ids'])
+    # Contests deleted since the ids were cached are skipped
+    page.object_list = [by_id[contest_id] for contest_id in cached['ids'] if contest_id in by_id]
+    return page
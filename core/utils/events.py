@@ -0,0 +1,257 @@
+"""
+Server-sent events for contest pages.
+
+Producers record what happened as ContestEvent rows, in the transaction
+that makes the change, so events from the judge processes reach every
+web server process:
+
+* publish_verdict() when a contest submission is judged (only its author
+  is told);
+* announcement_changed() when an announcement is created, edited or
+  deleted (signals);
+* standings_changed() when a contest's scoreboard changes.
+
+Every ASGI server process runs one Hub per event loop. While it has
+connections, it looks for new events of their contests every
+CONTEST_EVENTS['POLL_INTERVAL'] seconds with one query, encodes each event
+once and hands the same bytes to every connection allowed to see it. A
+busy contest therefore costs one query per interval per process, however
+many browsers listen. Standings changes within one poll are coalesced,
+and public listeners hear nothing of them while the scoreboard is frozen.
+
+A client that reconnects with Last-Event-ID is sent what it missed, as
+long as the events are younger than CONTEST_EVENTS['RETENTION'].
+"""
+import asyncio
+import json
+import time
+import weakref
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import ContestEvent, ContestSubmission
+
+# An event committed this long after a later-created one is still delivered
+COMMIT_GRACE = timedelta(seconds=5)
+
+# Seconds between deletions of expired events, per process
+PRUNE_INTERVAL = 600
+
+_next_prune = 0
+
+
+def _setting(name, default):
+    return getattr(settings, 'CONTEST_EVENTS', {}).get(name, default)
+
+
+def publish(contest_id, kind, payload=None, recipient_id=None):
+    ContestEvent.objects.create(contest_id=contest_id, kind=kind, payload=payload or {}, recipient_id=recipient_id)
+
+
+def publish_verdict(solution, points):
+    """Tell the author of a judged contest submission its verdict"""
+    for contest_id, problem_uuid in ContestSubmission.objects.filter(
+        solution=solution
+    ).values_list('contest_id', 'problem__uuid'):
+        publish(contest_id, ContestEvent.KIND_VERDICT, {
+            'solution': solution.id,
+            'problem': str(problem_uuid),
+            'verdict': solution.verdict,
+            'points': points,
+        }, recipient_id=solution.user_id)
+
+
+def standings_changed(contest_id):
+    publish(contest_id, ContestEvent.KIND_STANDINGS)
+
+
+def announcement_changed(announcement, action):
+    payload = {'id': announcement.id, 'action': action}
+    if action != 'deleted':
+        payload.update(
+            title=announcement.title,
+            content=announcement.content,
+            is_important=announcement.is_important,
+            created_at=announcement.created_at.isoformat(),
+        )
+    publish(announcement.contest_id, ContestEvent.KIND_ANNOUNCEMENT, payload)
+
+
+def prune():
+    """Delete events too old to be replayed; cheap to call often"""
+    global _next_prune
+    if time.monotonic() < _next_prune:
+        return 0
+    _next_prune = time.monotonic() + PRUNE_INTERVAL
+    cutoff = timezone.now() - timedelta(seconds=_setting('RETENTION', 3600))
+    deleted, _ = ContestEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def _encode(event):
+    data = json.dumps({'contest': event.contest_id, **event.payload})
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n".encode('utf-8')
+
+
+def _is_frozen(freeze_time, end_time):
+    return freeze_time is not None and freeze_time <= timezone.now() <= end_time
+
+
+class Connection:
+    """One listening client; the hub fills its queue with encoded events"""
+
+    def __init__(self, contest, user):
+        self.contest_id = contest.id
+        self.user_id = user.id
+        self.is_staff = user.is_staff
+        self.queue = asyncio.Queue(maxsize=_setting('QUEUE_SIZE', 256))
+        # Ids already sent while replaying after a reconnect
+        self.replayed = set()
+
+    def may_see(self, event, frozen):
+        if event.recipient_id is not None and event.recipient_id != self.user_id:
+            return False
+        if event.kind == ContestEvent.KIND_STANDINGS and frozen and not self.is_staff:
+            return False
+        return event.id not in self.replayed
+
+    def offer(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client this far behind reconnects and resumes from the database instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class Hub:
+    """Polls for new events and fans them out to this event loop's connections"""
+
+    def __init__(self):
+        self.connections = {}  # contest id -> set of Connection
+        self.contests = {}  # contest id -> (freeze_time, end_time)
+        self.task = None
+        self.seen = {}  # event id -> created_at, for events inside the grace window
+        self.since = None
+
+    def subscribe(self, contest, user):
+        conn = Connection(contest, user)
+        self.connections.setdefault(contest.id, set()).add(conn)
+        self.contests[contest.id] = (contest.freeze_time, contest.end_time)
+        if self.task is None:
+            self.since = timezone.now()
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        return conn
+
+    def unsubscribe(self, conn):
+        connections = self.connections.get(conn.contest_id)
+        if connections is None:
+            return
+        connections.discard(conn)
+        if not connections:
+            del self.connections[conn.contest_id]
+            del self.contests[conn.contest_id]
+
+    def _fetch(self, contest_ids):
+        polled_at = timezone.now()
+        try:
+            events = list(ContestEvent.objects.filter(
+                contest_id__in=contest_ids, created_at__gte=self.since - COMMIT_GRACE
+            ).order_by('id'))
+        except Exception as e:
+            print(f"[DEBUG] Polling contest events failed: {e}")
+            connection.close()
+            return []
+        self.since = polled_at
+        horizon = polled_at - 2 * COMMIT_GRACE
+        self.seen = {event_id: created for event_id, created in self.seen.items() if created >= horizon}
+        fresh = [event for event in events if event.id not in self.seen]
+        self.seen.update((event.id, event.created_at) for event in fresh)
+        return fresh
+
+    def _dispatch(self, events):
+        latest_standings = {}
+        for event in events:
+            if event.kind == ContestEvent.KIND_STANDINGS:
+                latest_standings[event.contest_id] = event
+            else:
+                self._send(event)
+        for event in latest_standings.values():
+            self._send(event)
+
+    def _send(self, event):
+        connections = self.connections.get(event.contest_id)
+        if not connections:
+            return
+        frozen = _is_frozen(*self.contests[event.contest_id])
+        message = _encode(event)
+        for conn in list(connections):
+            if conn.may_see(event, frozen):
+                conn.offer(message)
+
+    async def _run(self):
+        try:
+            while self.connections:
+                await asyncio.sleep(_setting('POLL_INTERVAL', 1))
+                if not self.connections:
+                    break
+                events = await sync_to_async(self._fetch)(list(self.connections))
+                self._dispatch(events)
+        finally:
+            self.task = None
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = Hub()
+    return hub
+
+
+def _missed(contest, user, last_event_id):
+    """Events after last_event_id the user may see, standings changes coalesced"""
+    events = list(ContestEvent.objects.filter(
+        Q(recipient__isnull=True) | Q(recipient_id=user.id),
+        contest=contest,
+        id__gt=last_event_id,
+    ).order_by('id')[:_setting('QUEUE_SIZE', 256)])
+    frozen = _is_frozen(contest.freeze_time, contest.end_time)
+    standings = [event for event in events if event.kind == ContestEvent.KIND_STANDINGS]
+    return [
+        event for event in events
+        if event.kind != ContestEvent.KIND_STANDINGS or (event is standings[-1] and not (frozen and not user.is_staff))
+    ]
+
+
+async def stream(contest, user, last_event_id=None):
+    """The encoded event stream of one connection; ends when the client is dropped"""
+    hub = get_hub()
+    conn = hub.subscribe(contest, user)
+    heartbeat = _setting('HEARTBEAT', 15)
+    try:
+        yield b"retry: 3000\n\n"
+        if last_event_id is not None:
+            for event in await sync_to_async(_missed)(contest, user, last_event_id):
+                conn.replayed.add(event.id)
+                yield _encode(event)
+        while True:
+            try:
+                message = await asyncio.wait_for(conn.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if message is None:
+                break
+            yield message
+    finally:
+        hub.unsubscribe(conn)
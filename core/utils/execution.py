@@ -1,168 +1,314 @@
+import errno
 import subprocess
-import tempfile
 import os
-import shutil
-import json
-
-def find_compiler(compiler_name):
-    """Find the full path of a compiler/interpreter"""
-    # Try using shutil.which first
-    path = shutil.which(compiler_name)
-    if path:
-        return path
-    
-    # Common locations to check
-    common_paths = [
-        f'/usr/bin/{compiler_name}',
-        f'/bin/{compiler_name}',
-        f'/usr/local/bin/{compiler_name}',
-        f'/opt/bin/{compiler_name}'
-    ]
-    
-    for path in common_paths:
-        if os.path.isfile(path) and os.access(path, os.X_OK):
-            return path
-    
-    return None
+import selectors
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 
-def execute_code(language, code, input_data, expected_output):
-    
-    try:
-        suffix_map = {
-            'python': '.py',
-            'cpp': '.cpp',
-            'java': '.java',
-            'javascript': '.js'  
-        }
+from django.conf import settings
 
-        if language not in suffix_map:
+from . import artifact_cache, java_runtime, languages, python_forkserver, sandbox, testdata, workspace
+from .checkers import load_checker, make_comparator
+
+# How often a running test case checks whether it has been cancelled (seconds)
+CANCEL_POLL_INTERVAL = 0.05
+FIRST_SAMPLE_DELAY = 0.005
+
+# Bytes moved per read/write on a child's pipes
+PIPE_CHUNK = 64 * 1024
+
+# Bytes of stderr kept for the verdict and error message; the rest is drained and dropped
+STDERR_LIMIT = 64 * 1024
+
+def compile_code(language, code, work_dir):
+    """
+    Write the source into work_dir and compile it once.
+
+    Returns a program dict that run_program can execute against any number
+    of inputs, or a CE result if the source could not be compiled. A CE
+    with the compiler's own diagnostics has from_compiler set; any other
+    failure is the judge's, and may not happen again.
+    """
+    try:
+        toolchain = languages.get(language)
+        if toolchain is None:
             print(f"[DEBUG] Unsupported language: {language}")
             return {'verdict': 'CE', 'error': f'Unsupported language: {language}'}
+        if not toolchain['available']:
+            return {'verdict': 'CE', 'error': languages.unavailable_message(toolchain)}
 
-        suffix = suffix_map[language]
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            print(f"[DEBUG] Created temp directory: {temp_dir}")
-            
-            filename = 'main' + suffix
-            if language == 'java':
-                # Java needs the class name to match filename
-                filename = 'Main.java'
-            
-            filepath = os.path.join(temp_dir, filename)
-            
-            print(f"[DEBUG] Writing code to: {filepath}")
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(code)
-
-            # Prepare run command based on language
-            if language == 'python':
-                python_path = find_compiler('python3') or find_compiler('python')
-                if not python_path:
-                    return {'verdict': 'CE', 'error': 'Python interpreter not found'}
-                run_cmd = [python_path, filepath]
-
-            elif language == 'cpp':
-                # Find g++ compiler
-                gpp_path = find_compiler('g++')
-                if not gpp_path:
-                    return {'verdict': 'CE', 'error': 'g++ compiler not found. Please install: sudo apt install g++'}
-                
-                exe_path = os.path.join(temp_dir, 'main.exe' if os.name == 'nt' else 'main.out')
-                compile_cmd = [gpp_path, filepath, '-o', exe_path]
-                
-                print(f"[DEBUG] Compiling C++ with: {gpp_path}")
-                print(f"[DEBUG] Compile command: {' '.join(compile_cmd)}")
-                
-                compile_proc = subprocess.run(compile_cmd, capture_output=True, text=True, timeout=10)
-                
-                if compile_proc.returncode != 0:
-                    error_msg = compile_proc.stderr or "Compilation failed"
-                    print(f"[DEBUG] C++ compilation failed: {error_msg}")
-                    return {'verdict': 'CE', 'error': error_msg}
-                
-                run_cmd = [exe_path]
-
-            elif language == 'java':
-                # Find javac and java
-                javac_path = find_compiler('javac')
-                java_path = find_compiler('java')
-                
-                if not javac_path:
-                    return {'verdict': 'CE', 'error': 'javac compiler not found. Please install: sudo apt install default-jdk'}
-                if not java_path:
-                    return {'verdict': 'CE', 'error': 'java runtime not found. Please install: sudo apt install default-jdk'}
-                
-                # Compile Java
-                compile_cmd = [javac_path, filepath]
-                print(f"[DEBUG] Compiling Java with: {javac_path}")
-                print(f"[DEBUG] Compile command: {' '.join(compile_cmd)}")
-                
-                compile_proc = subprocess.run(compile_cmd, cwd=temp_dir, capture_output=True, text=True, timeout=10)
-                
-                if compile_proc.returncode != 0:
-                    error_msg = compile_proc.stderr or "Java compilation failed"
-                    print(f"[DEBUG] Java compilation failed: {error_msg}")
-                    return {'verdict': 'CE', 'error': error_msg}
-                
-                run_cmd = [java_path, '-cp', temp_dir, 'Main']
-
-            elif language == 'javascript':
-                node_path = find_compiler('node')
-                if not node_path:
-                    return {'verdict': 'CE', 'error': 'Node.js not found. Please install: sudo apt install nodejs'}
-                run_cmd = [node_path, filepath]
+        paths = toolchain['paths']
+        filepath = os.path.join(work_dir, toolchain['source'])
 
-            else:
-                return {'verdict': 'CE', 'error': f'Execution not implemented for {language}'}
-
-            print(f"[DEBUG] Running command: {' '.join(run_cmd)}")
-            
-            # Execute the code
-            process = subprocess.Popen(
-                run_cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=temp_dir
-            )
+        print(f"[DEBUG] Writing code to: {filepath}")
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(code)
+
+        if toolchain['compile']:
+            error_msg = _compile(toolchain, code, filepath, work_dir)
+            if error_msg is not None:
+                return {'verdict': 'CE', 'error': error_msg, 'from_compiler': True}
 
+        # Set when test cases are forked from the Python fork server instead of run_cmd
+        forkserver = None
+
+        if language == 'java':
+            run_cmd = java_runtime.run_command(paths['runtime'], paths['compiler'], work_dir)
+        else:
+            run_cmd = languages.command(toolchain, toolchain['run'], work_dir)
+
+        if language == 'python' and python_forkserver.enabled():
+            bytecode_path = os.path.join(work_dir, 'main.code')
             try:
-                out, err = process.communicate(input=input_data, timeout=5)
-                print(f"[DEBUG] Process completed with return code: {process.returncode}")
-                print(f"[DEBUG] stdout: '{out}'")
-                print(f"[DEBUG] stderr: '{err}'")
-                
-            except subprocess.TimeoutExpired:
-                print("[DEBUG] Process timed out")
-                process.kill()
-                return {'verdict': 'TLE', 'error': 'Time Limit Exceeded (5 seconds)'}
+                if python_forkserver.compile_bytecode(
+                    paths['interpreter'], filepath, bytecode_path, sandbox.get_limits('python')
+                ):
+                    forkserver = {'python': paths['interpreter'], 'script': filepath, 'bytecode': bytecode_path}
+            except Exception as e:
+                print(f"[DEBUG] Python fork server unavailable, using the interpreter: {e}")
+
+        return {
+            'verdict': 'OK',
+            'language': language,
+            'run_cmd': run_cmd,
+            'cwd': work_dir,
+            'forkserver': forkserver,
+        }
+
+    except FileNotFoundError as e:
+        error_msg = f"Required compiler/interpreter not found: {str(e)}"
+        print(f"[DEBUG] FileNotFoundError: {error_msg}")
+        return {'verdict': 'CE', 'error': error_msg}
+
+    except Exception as e:
+        error_msg = f"Execution error: {str(e)}"
+        print(f"[DEBUG] Exception: {error_msg}")
+        return {'verdict': 'RE', 'error': error_msg}
+
+
+def _compile(toolchain, code, filepath, work_dir):
+    """Compile into work_dir, reusing a cached artifact; returns the error message on failure"""
+    language = toolchain['key']
+    compiler_path = toolchain['paths']['compiler']
+    # The command template and flags both decide what gets built
+    key = artifact_cache.cache_key(language, compiler_path, [*toolchain['compile'], *toolchain['flags']], code)
+    cached = artifact_cache.fetch(key, work_dir)
+    if cached is not None:
+        return cached.get('error')
+
+    print(f"[DEBUG] Compiling {toolchain['name']} with: {compiler_path}")
+    if language == 'java':
+        # Through the warm compile service when enabled
+        returncode, diagnostics = java_runtime.compile_java(
+            compiler_path, toolchain['paths']['runtime'], filepath, work_dir, toolchain['flags'], timeout=10
+        )
+    else:
+        compile_cmd = languages.command(toolchain, toolchain['compile'], work_dir)
+        print(f"[DEBUG] Compile command: {' '.join(compile_cmd)}")
+        compile_proc = subprocess.run(compile_cmd, cwd=work_dir, capture_output=True, text=True, timeout=10)
+        returncode, diagnostics = compile_proc.returncode, compile_proc.stderr
+
+    if returncode != 0:
+        error_msg = diagnostics or f"{toolchain['name']} compilation failed"
+        print(f"[DEBUG] Compilation failed: {error_msg}")
+        artifact_cache.store(key, work_dir, error=error_msg)
+        return error_msg
+
+    artifact_cache.store(key, work_dir, languages.artifacts(toolchain, work_dir))
+    return None
+
+
+def _interrupted(process, deadline, cancel_event):
+    """Sample the process's memory; 'cancelled' or 'timeout' if it has to be stopped"""
+    process.sample_memory()
+    if cancel_event is not None and cancel_event.is_set():
+        return 'cancelled'
+    if time.monotonic() >= deadline:
+        return 'timeout'
+    return None
+
+
+def _communicate(process, source, deadline, cancel_event, comparator, output_limit):
+    """
+    Feed the binary stream source to a started process's stdin, a chunk at a
+    time as the pipe drains, while streaming its stdout into comparator and
+    keeping the start of its stderr.
+
+    Works on the raw pipe fds, so it serves both MeasuredPopen and fork
+    server children. Returns (stdout size in bytes, stderr bytes, outcome)
+    where outcome is None if the process exited on its own, or 'cancelled',
+    'timeout', 'mismatch' or 'output_limit' if it was killed early.
+    """
+    stdout_fd, stderr_fd = process.stdout.fileno(), process.stderr.fileno()
+    stderr = bytearray()
+    output_size = 0
+    pending = memoryview(source.read(PIPE_CHUNK))
+    outcome = None
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(stdout_fd, selectors.EVENT_READ)
+        selector.register(stderr_fd, selectors.EVENT_READ)
+        if pending:
+            os.set_blocking(process.stdin.fileno(), False)
+            selector.register(process.stdin.fileno(), selectors.EVENT_WRITE)
+        else:
+            process.stdin.close()
+
+        # The first check is early so even quick programs get a memory sample
+        next_check = time.monotonic() + FIRST_SAMPLE_DELAY
+        while outcome is None and selector.get_map():
+            for key, _ in selector.select(max(next_check - time.monotonic(), 0)):
+                if key.fd == stdout_fd:
+                    chunk = os.read(stdout_fd, PIPE_CHUNK)
+                    if not chunk:
+                        selector.unregister(stdout_fd)
+                        continue
+                    output_size += len(chunk)
+                    if output_size > output_limit:
+                        outcome = 'output_limit'
+                        break
+                    if not comparator.feed(chunk):
+                        outcome = 'mismatch'
+                        break
+                elif key.fd == stderr_fd:
+                    chunk = os.read(stderr_fd, PIPE_CHUNK)
+                    if not chunk:
+                        selector.unregister(stderr_fd)
+                    elif len(stderr) < STDERR_LIMIT:
+                        stderr += chunk[:STDERR_LIMIT - len(stderr)]
+                else:
+                    try:
+                        pending = pending[os.write(key.fd, pending):]
+                        if not pending:
+                            pending = memoryview(source.read(PIPE_CHUNK))
+                    except BrokenPipeError:
+                        # The program exited without reading all of its input
+                        pending = pending[:0]
+                    if not pending:
+                        selector.unregister(key.fd)
+                        process.stdin.close()
+
+            if outcome is None and time.monotonic() >= next_check:
+                next_check = time.monotonic() + CANCEL_POLL_INTERVAL
+                outcome = _interrupted(process, deadline, cancel_event)
+
+    # Output closed; the process may still be running
+    while outcome is None:
+        try:
+            process.wait(timeout=CANCEL_POLL_INTERVAL)
+            break
+        except subprocess.TimeoutExpired:
+            outcome = _interrupted(process, deadline, cancel_event)
+
+    if outcome:
+        process.kill()
+        process.wait()
+    for pipe in (process.stdin, process.stdout, process.stderr):
+        if pipe:
+            pipe.close()
+    return output_size, bytes(stderr), outcome
+
+
+def run_program(program, input_data, expected_output, cancel_event=None, checker=None):
+    """
+    Run a program returned by compile_code against a single test case.
+
+    input_data and expected_output are either strings or stored test files
+    (testdata.Blob), which are decompressed as they stream through.
+
+    The output is judged by the checker from checkers.load_checker, or by
+    exact comparison if there is none. If cancel_event gets set while the
+    program is running it is killed and a 'SKIPPED' result is returned.
+    """
+    comparator = None
+    source = None
+    try:
+        run_cmd = program['run_cmd']
+        limits = sandbox.get_limits(program['language'])
+        source = testdata.open_data(input_data)
+        comparator = make_comparator(checker, input_data, expected_output)
+
+        # Execute the code under CPU, memory, process and file size rlimits
+        try:
+            if program.get('forkserver'):
+                print(f"[DEBUG] Forking test case from the Python fork server: {program['forkserver']['script']}")
+                process = python_forkserver.spawn(program['forkserver'], program['cwd'], limits)
+            else:
+                print(f"[DEBUG] Running command: {' '.join(run_cmd)}")
+                process = sandbox.MeasuredPopen(
+                    run_cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    cwd=program['cwd'],
+                    preexec_fn=sandbox.make_preexec(limits)
+                )
+        except OSError as e:
+            if e.errno == errno.ENOMEM:
+                # The executable's static data alone does not fit in the address space limit
+                return {'verdict': 'MLE', 'error': f"Memory Limit Exceeded ({limits['memory']} MB)"}
+            raise
+
+        deadline = time.monotonic() + sandbox.wall_time_limit(limits)
+        output_limit = limits['output'] * 1024 * 1024
+        output_size, err, outcome = _communicate(process, source, deadline, cancel_event, comparator, output_limit)
+        err = err.decode('utf-8', errors='replace')
+
+        if outcome == 'cancelled':
+            print("[DEBUG] Test case cancelled")
+            return {'verdict': 'SKIPPED'}
+
+        cpu_time, memory_kb = sandbox.usage_of(process)
+        print(f"[DEBUG] Process finished with return code {process.returncode} ({outcome or 'exited'})")
+        print(f"[DEBUG] CPU time: {cpu_time:.3f}s, peak memory: {memory_kb} KB, stdout: {output_size} bytes")
+        usage = {'time': cpu_time, 'memory': memory_kb}
+
+        if outcome == 'timeout':
+            print("[DEBUG] Process timed out")
+            return {
+                'verdict': 'TLE',
+                'error': f"Time Limit Exceeded (wall time {sandbox.wall_time_limit(limits)}s)",
+                **usage
+            }
+        if outcome == 'output_limit':
+            print("[DEBUG] Output limit exceeded")
+            return {'verdict': 'OLE', 'error': f"Output Limit Exceeded ({limits['output']} MB)", **usage}
+
+        # A mismatch stops the program early, so only a finished run can hit the other limits
+        if outcome != 'mismatch':
+            limit_hit = sandbox.limit_verdict(process.returncode, cpu_time, memory_kb, err, output_size, limits)
+            if limit_hit:
+                verdict, error_msg = limit_hit
+                print(f"[DEBUG] {verdict}: {error_msg}")
+                return {'verdict': verdict, 'error': error_msg, **usage}
 
             # Check for runtime errors
             if process.returncode != 0 or err.strip():
                 error_msg = err.strip() or f"Process exited with code {process.returncode}"
                 print(f"[DEBUG] Runtime error: {error_msg}")
-                return {'verdict': 'RE', 'error': error_msg, 'output': out.strip()}
-
-            # Normalize output for comparison
-            actual_output = out.strip().replace('\r\n', '\n').replace('\r', '\n')
-            expected_clean = expected_output.strip().replace('\r\n', '\n').replace('\r', '\n')
-            
-            print(f"[DEBUG] Normalized actual output: '{actual_output}'")
-            print(f"[DEBUG] Normalized expected output: '{expected_clean}'")
-
-            # Compare outputs
-            if actual_output == expected_clean:
-                print("[DEBUG] Output matches - AC")
-                return {'verdict': 'AC', 'output': actual_output}
-            else:
-                print("[DEBUG] Output doesn't match - WA")
-                return {
-                    'verdict': 'WA', 
-                    'output': actual_output,
-                    'error': f"Expected: '{expected_clean}'\nGot: '{actual_output}'"
-                }
+                return {'verdict': 'RE', 'error': error_msg, 'output': comparator.actual_output(), **usage}
+
+        # Built-in checkers compared the output while it streamed in
+        verdict = comparator.finish()
+        actual_output = comparator.actual_output()
+        if verdict == 'AC':
+            print("[DEBUG] Output matches - AC")
+            return {'verdict': 'AC', 'output': actual_output, **usage}
+        if verdict == 'IE':
+            print(f"[DEBUG] Checker error: {comparator.message}")
+            return {'verdict': 'IE', 'output': actual_output, 'error': comparator.message, **usage}
+
+        print("[DEBUG] Output doesn't match - WA")
+        error_msg = f"Expected: '{comparator.expected_output()}'\nGot: '{actual_output}'"
+        if comparator.message:
+            error_msg += f"\n{comparator.message}"
+        return {'verdict': 'WA', 'output': actual_output, 'error': error_msg, **usage}
+
+    except testdata.TestDataError as e:
+        print(f"[DEBUG] Test data error: {e}")
+        return {'verdict': 'IE', 'error': str(e)}
 
     except FileNotFoundError as e:
         error_msg = f"Required compiler/interpreter not found: {str(e)}"
@@ -174,52 +320,182 @@ def execute_code(language, code, input_data, expected_output):
         print(f"[DEBUG] Exception: {error_msg}")
         return {'verdict': 'RE', 'error': error_msg}
 
+    finally:
+        if comparator is not None:
+            comparator.close()
+        if source is not None:
+            source.close()
+
+
+def _parallel_workers():
+    default = min(4, os.cpu_count() or 1)
+    return max(1, settings.CODE_EXECUTION.get('PARALLEL_TESTS', default))
+
+
+def run_test_cases(program, test_cases, stop_on_failure=False, max_workers=None, checker=None, order=None):
+    """
+    Run a compiled program against (input, expected_output) pairs, up to
+    max_workers at a time (CODE_EXECUTION['PARALLEL_TESTS'] by default).
+
+    Cases are started in order, a list of indices into test_cases (stored
+    order by default). Returns one result per test case in the original
+    order. With stop_on_failure (ICPC-style judging) every case after the
+    first failing one in run order is cancelled and comes back as None;
+    otherwise all cases are run.
+    """
+    if not test_cases:
+        return []
+    if order is None:
+        order = range(len(test_cases))
+
+    results = [None] * len(test_cases)
+    cancel_events = [threading.Event() for _ in order]
+    first_failure = len(order)
+
+    with ThreadPoolExecutor(max_workers=max_workers or _parallel_workers()) as pool:
+        futures = [
+            pool.submit(run_program, program, *test_cases[i], cancel_events[position], checker)
+            for position, i in enumerate(order)
+        ]
+        future_position = {future: position for position, future in enumerate(futures)}
+
+        for future in as_completed(futures):
+            position = future_position[future]
+            if future.cancelled():
+                continue
+            result = results[order[position]] = future.result()
+
+            if stop_on_failure and result['verdict'] not in ('AC', 'SKIPPED') and position < first_failure:
+                # Cases started earlier keep running - one of them may still fail first
+                first_failure = position
+                for later in range(position + 1, len(order)):
+                    cancel_events[later].set()
+                    futures[later].cancel()
+
+    if stop_on_failure:
+        for later in range(first_failure + 1, len(order)):
+            results[order[later]] = None
+    return results
+
+
+@contextmanager
+def compiled_submission(language, code):
+    """
+    Compile a submission once into a pooled workspace that lives for the
+    duration of the with block, so it can be run against every test case.
+    """
+    with workspace.workspace() as work_dir:
+        print(f"[DEBUG] Using workspace: {work_dir}")
+        yield compile_code(language, code, work_dir)
+
+
+def execute_code(language, code, input_data, expected_output, checker=None):
+    if checker and 'error' in checker:
+        return {'verdict': 'IE', 'error': checker['error']}
+    try:
+        with compiled_submission(language, code) as program:
+            if program['verdict'] != 'OK':
+                return program
+            return run_program(program, input_data, expected_output, checker=checker)
+
+    except Exception as e:
+        error_msg = f"Execution error: {str(e)}"
+        print(f"[DEBUG] Exception: {error_msg}")
+        return {'verdict': 'RE', 'error': error_msg}
+
 
-def evaluate_submission(language, code, problem):
+def evaluate_submission(language, code, problem, stop_on_failure=False, on_status=None, order=None):
+    """
+    Judge a submission against every test case of a problem.
+
+    By default all cases run and the score is the percentage passed. With
+    stop_on_failure judging stops at the first failing case, running the
+    cases in order (0-based indices, e.g. from test_stats.run_order) if
+    given. The verdict is that of the first failing case in run order,
+    reported as 'failed_test' (its 1-based stored number), and 'time'/'memory'
+    are the maxima over the cases that ran. Per-case results, None where a
+    case did not run, are returned as 'test_results'. 'output' previews the
+    program's output on the failing case, or on the last case run if all
+    passed.
+
+    Outputs are judged by the problem's checker. on_status, if given, is
+    called with 'Compiling' and 'Running' as judging progresses.
+    """
     try:
-        test_cases = json.loads(problem.test_cases_json or "[]")
-    except json.JSONDecodeError:
-        return {'verdict': 'IE', 'error': 'Invalid test case format', 'score': 0}
+        test_cases = testdata.test_cases(problem)
+    except FileNotFoundError as e:
+        return {'verdict': 'IE', 'error': str(e), 'score': 0}
 
     if not test_cases:
         return {'verdict': 'IE', 'error': 'No test cases found', 'score': 0}
 
-    all_passed = True
+    checker = load_checker(problem)
+    if checker and 'error' in checker:
+        return {'verdict': 'IE', 'error': checker['error'], 'score': 0}
+
     total_cases = len(test_cases)
+    if not stop_on_failure or order is None or sorted(order) != list(range(total_cases)):
+        order = list(range(total_cases))
     passed_cases = 0
+    first_failure = None
     last_output = ''
-    last_error = ''
+    max_time = 0.0
+    max_memory = 0
+
+    if on_status:
+        on_status('Compiling')
+
+    with compiled_submission(language, code) as program:
+        if program['verdict'] != 'OK':
+            return {'verdict': program['verdict'], 'score': 0, 'error': program.get('error', '')}
+
+        if on_status:
+            on_status('Running')
 
-    for i, case in enumerate(test_cases, start=1):
-        input_data = case.get("input", "")
-        expected_output = case.get("output", "")
-        result = execute_code(language, code, input_data, expected_output)
+        results = run_test_cases(
+            program,
+            test_cases,
+            stop_on_failure=stop_on_failure,
+            checker=checker,
+            order=order
+        )
 
+    for index in order:
+        result = results[index]
+        if result is None:
+            continue
+
+        i = index + 1
         print(f"[DEBUG] Test case {i}: Verdict: {result['verdict']}")
+        max_time = max(max_time, result.get('time', 0.0))
+        max_memory = max(max_memory, result.get('memory', 0))
+        last_output = result.get('output', '')
 
-        if result['verdict'] != 'AC':
-            all_passed = False
-            last_error = result.get('error', '')
-            last_output = result.get('output', '')
-        else:
+        if result['verdict'] == 'AC':
             passed_cases += 1
+        elif first_failure is None:
+            first_failure = (i, result)
+
+    summary = {
+        'score': int((passed_cases / total_cases) * 100),
+        'time': max_time,
+        'memory': max_memory,
+        'test_results': results,
+    }
+    if first_failure is None:
+        return {'verdict': 'AC', 'output': last_output, **summary}
+
+    failed_test, result = first_failure
+    return {
+        'verdict': result['verdict'],
+        'output': result.get('output', ''),
+        'error': result.get('error', ''),
+        'failed_test': failed_test,
+        **summary
+    }
+
 
-    if all_passed:
-        return {'verdict': 'AC', 'score': 100, 'output': last_output}
-    else:
-        partial_score = int((passed_cases / total_cases) * 100)
-        return {
-            'verdict': 'WA',
-            'score': partial_score,
-            'output': last_output,
-            'error': last_error
-        }
 if __name__ == "__main__":
     print("Checking available compilers/interpreters:")
-    compilers = ['g++', 'javac', 'java', 'node', 'python3', 'python']
-    for compiler in compilers:
-        path = find_compiler(compiler)
-        if path:
-            print(f"✓ {compiler}: {path}")
-        else:
-            print(f"✗ {compiler}: Not found")
\ No newline at end of file
+    for line in languages.report():
+        print(line)
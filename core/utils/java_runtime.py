@@ -0,0 +1,345 @@
+"""
+Warm JVM support for Java submissions.
+
+Two costs dominate Java judging: a cold `javac` per submission and a cold
+JVM start per test case. This module removes most of both:
+
+* long-lived compile services - JVMs running the in-process javax.tools
+  compiler, which stay JIT-warm between requests. A thread takes an idle
+  one from a per-process pool for each compilation, so worker threads
+  compile in parallel; each runs under the sandbox's rlimits;
+* a shared AppCDS archive of the JDK classes typical solutions load, mapped
+  by every test-case JVM instead of being parsed and verified again;
+* startup and heap flags derived from CODE_EXECUTION['MEMORY_LIMIT'].
+
+Everything falls back to plain `javac` / `java` if the warm path fails.
+"""
+import fcntl
+import hashlib
+import os
+import select
+import subprocess
+import threading
+import time
+
+from django.conf import settings
+
+from . import languages, sandbox
+from .artifact_cache import compiler_version
+
+# Heap of a compile service; javac needs more than a typical solution
+COMPILE_HEAP_MB = 256
+
+# CPU seconds a compile service may use over its lifetime before the
+# rlimit ends it; the next compilation then starts a fresh one
+COMPILE_SERVICE_CPU_SECONDS = 600
+
+# Non-heap JVM memory (metaspace, code cache, thread stacks, GC structures)
+# that counts towards peak RSS but not towards -Xmx
+JVM_OVERHEAD_MB = 48
+
+JVM_RUN_FLAGS = [
+    '-XX:+UseSerialGC',      # single-threaded GC: smallest footprint and startup
+    '-XX:-UsePerfData',      # skip the hsperfdata mmap on every start
+    '-Xshare:auto',          # use the CDS archive when valid, silently skip otherwise
+    '-Xlog:disable',         # JVM log output on stderr would be judged as RE
+    '-XX:-PrintWarnings',    # ...and so would VM warnings
+    '-Xss64m',               # deep recursion is common in solutions
+]
+
+COMPILE_SERVER_SOURCE = r'''
+import javax.tools.JavaCompiler;
+import javax.tools.ToolProvider;
+import java.io.*;
+import java.nio.charset.StandardCharsets;
+import java.util.*;
+
+/**
+ * Reads "<source file>\t<output dir>[\t<javac flag>...]" lines from stdin and
+ * answers each with "<exit status> <diagnostics length>\n<diagnostics>".
+ */
+public class CompileServer {
+    public static void main(String[] args) throws IOException {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        OutputStream out = new BufferedOutputStream(new FileOutputStream(FileDescriptor.out));
+        String line;
+        while ((line = in.readLine()) != null) {
+            String[] request = line.split("\t");
+            List<String> options = new ArrayList<>(Arrays.asList(
+                "-proc:none", "-encoding", "UTF-8", "-d", request[1]));
+            options.addAll(Arrays.asList(request).subList(2, request.length));
+            options.add(request[0]);
+
+            ByteArrayOutputStream diagnostics = new ByteArrayOutputStream();
+            int status = compiler.run(null, null, diagnostics, options.toArray(new String[0]));
+            byte[] message = diagnostics.toByteArray();
+            out.write((status + " " + message.length + "\n").getBytes(StandardCharsets.UTF_8));
+            out.write(message);
+            out.flush();
+        }
+    }
+}
+'''
+
+# Exercises the JDK classes typical solutions touch, so they end up in the CDS archive
+WARMUP_SOURCE = r'''
+import java.io.*;
+import java.util.*;
+import java.util.stream.*;
+
+public class Warmup {
+    public static void main(String[] args) throws IOException {
+        BufferedReader reader = new BufferedReader(new InputStreamReader(System.in));
+        StringTokenizer tokens = new StringTokenizer(reader.readLine());
+        Scanner scanner = new Scanner("1 2.5 word\n");
+        long total = scanner.nextInt() + Long.parseLong(tokens.nextToken());
+        double real = scanner.nextDouble() + Double.parseDouble("0.5");
+        List<Integer> list = new ArrayList<>(List.of(3, 1, 2));
+        Collections.sort(list);
+        Map<String, Integer> map = new HashMap<>();
+        map.put(scanner.next(), 1);
+        TreeMap<Integer, Integer> tree = new TreeMap<>(Map.of(1, 1));
+        Deque<Integer> deque = new ArrayDeque<>(list);
+        PriorityQueue<long[]> heap = new PriorityQueue<>((a, b) -> Long.compare(a[0], b[0]));
+        heap.add(new long[]{total});
+        int[] array = {5, 4, 3};
+        Arrays.sort(array);
+        Set<Integer> set = IntStream.range(0, 3).boxed().collect(Collectors.toCollection(HashSet::new));
+        StringBuilder sb = new StringBuilder();
+        sb.append(String.format("%d %.2f", total, real)).append(tree.size() + deque.size() + set.size());
+        PrintWriter out = new PrintWriter(new BufferedWriter(new OutputStreamWriter(System.out)));
+        out.println(sb + " " + Math.max(array[0], heap.poll()[0]) + map.size());
+        out.flush();
+        System.out.println(new java.math.BigInteger("1").add(java.math.BigInteger.ONE));
+    }
+}
+'''
+
+# Started compile services not in use by any thread
+_idle_services = []
+_services_lock = threading.Lock()
+_archive_paths = {}
+
+
+def enabled():
+    return settings.CODE_EXECUTION.get('JAVA_WARM', True)
+
+
+def _jvm_dir(java_path):
+    """Per-JDK directory for the compile server classes and the CDS archive"""
+    version_tag = hashlib.sha256(compiler_version(java_path).encode('utf-8')).hexdigest()[:12]
+    path = os.path.join(settings.CODE_EXECUTION['TEMP_DIR'], 'jvm', version_tag)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _build_once(directory, marker, build):
+    """Run build() once across worker processes; returns True if marker exists afterwards"""
+    if os.path.exists(os.path.join(directory, marker)):
+        return True
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not os.path.exists(os.path.join(directory, marker)):
+            try:
+                build()
+            except Exception as e:
+                print(f"[DEBUG] JVM warm-up step for {marker} failed: {e}")
+    return os.path.exists(os.path.join(directory, marker))
+
+
+def heap_flags():
+    """-Xmx/-Xms so that heap plus JVM overhead stays within MEMORY_LIMIT"""
+    memory_limit = settings.CODE_EXECUTION.get('MEMORY_LIMIT', 128)
+    heap = max(memory_limit - JVM_OVERHEAD_MB, 16)
+    return [f'-Xmx{heap}m', f'-Xms{min(heap, 32)}m']
+
+
+def cds_archive(java_path, javac_path):
+    """
+    Path of the shared AppCDS archive of JDK classes, building it on first use.
+
+    A class list is recorded from a warm-up program, stripped of the warm-up
+    class itself so the archive only holds JDK classes and stays valid for
+    any submission classpath. Returns None if the archive cannot be built.
+    """
+    if java_path in _archive_paths:
+        return _archive_paths[java_path]
+
+    directory = _jvm_dir(java_path)
+    archive = os.path.join(directory, 'jdk.jsa')
+
+    def build():
+        with open(os.path.join(directory, 'Warmup.java'), 'w', encoding='utf-8') as f:
+            f.write(WARMUP_SOURCE)
+        subprocess.run([javac_path, '-d', directory, 'Warmup.java'], cwd=directory, check=True,
+                       capture_output=True, timeout=60)
+        class_list = os.path.join(directory, 'classes.lst')
+        subprocess.run(
+            [java_path, '-Xshare:off', f'-XX:DumpLoadedClassList={class_list}', '-cp', directory, 'Warmup'],
+            input=b'1\n', check=True, capture_output=True, timeout=60
+        )
+        with open(class_list, encoding='utf-8') as f:
+            jdk_classes = [line for line in f if 'Warmup' not in line]
+        with open(class_list, 'w', encoding='utf-8') as f:
+            f.writelines(jdk_classes)
+        staging = archive + f'.{os.getpid()}'
+        subprocess.run(
+            [java_path, '-Xshare:dump', f'-XX:SharedClassListFile={class_list}',
+             f'-XX:SharedArchiveFile={staging}'],
+            check=True, capture_output=True, timeout=120
+        )
+        os.rename(staging, archive)
+
+    _archive_paths[java_path] = archive if _build_once(directory, 'jdk.jsa', build) else None
+    return _archive_paths[java_path]
+
+
+def run_command(java_path, javac_path, class_dir):
+    """Command line that runs Main from class_dir with the tuned JVM flags"""
+    if not enabled():
+        return [java_path, '-cp', class_dir, 'Main']
+
+    flags = list(JVM_RUN_FLAGS) + heap_flags()
+    archive = cds_archive(java_path, javac_path)
+    if archive:
+        flags.append(f'-XX:SharedArchiveFile={archive}')
+    return [java_path, *flags, '-cp', class_dir, 'Main']
+
+
+def compile_limits(timeout):
+    """Sandbox limits for one javac process, or for a compile service over its lifetime"""
+    return dict(sandbox.get_limits('java'), time=timeout)
+
+
+class CompileService:
+    """A JVM running CompileServer, used by one thread at a time"""
+
+    def __init__(self, java_path, javac_path):
+        directory = _jvm_dir(java_path)
+
+        def build():
+            with open(os.path.join(directory, 'CompileServer.java'), 'w', encoding='utf-8') as f:
+                f.write(COMPILE_SERVER_SOURCE)
+            subprocess.run([javac_path, '-d', directory, 'CompileServer.java'], cwd=directory,
+                           check=True, capture_output=True, timeout=60)
+
+        if not _build_once(directory, 'CompileServer.class', build):
+            raise RuntimeError('could not build the Java compile server')
+
+        self.java_path = java_path
+        self.process = subprocess.Popen(
+            [java_path, '-XX:+UseSerialGC', '-XX:-UsePerfData', '-Xshare:auto', f'-Xmx{COMPILE_HEAP_MB}m',
+             '-cp', directory, 'CompileServer'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            preexec_fn=sandbox.make_preexec(compile_limits(COMPILE_SERVICE_CPU_SECONDS)),
+        )
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def _read_exact(self, size, deadline):
+        fd = self.process.stdout.fileno()
+        chunks = []
+        while size > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError('Java compilation timed out')
+            chunk = os.read(fd, size)
+            if not chunk:
+                raise RuntimeError('Java compile server exited')
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def _read_line(self, deadline):
+        line = b''
+        while not line.endswith(b'\n'):
+            line += self._read_exact(1, deadline)
+        return line
+
+    def compile(self, source_path, out_dir, flags=(), timeout=10):
+        """Returns (exit status, diagnostics)"""
+        request = '\t'.join([source_path, out_dir, *flags]) + '\n'
+        deadline = time.monotonic() + timeout
+        self.process.stdin.write(request.encode('utf-8'))
+        self.process.stdin.flush()
+        status, length = self._read_line(deadline).split()
+        diagnostics = self._read_exact(int(length), deadline) if int(length) else b''
+        return int(status), diagnostics.decode('utf-8', errors='replace')
+
+    def stop(self):
+        self.process.kill()
+        self.process.wait()
+
+
+def _acquire_service(java_path, javac_path):
+    """An idle compile service for java_path, started if there is none"""
+    with _services_lock:
+        while _idle_services:
+            service = _idle_services.pop()
+            if service.alive() and service.java_path == java_path:
+                return service
+            service.stop()
+    return CompileService(java_path, javac_path)
+
+
+def _release_service(service):
+    with _services_lock:
+        _idle_services.append(service)
+
+
+def compile_java(javac_path, java_path, source_path, out_dir, flags=(), timeout=10):
+    """
+    Compile source_path into out_dir; returns (exit status, diagnostics).
+
+    Uses the warm compile service when enabled, falling back to a cold javac
+    process if the service cannot be started or misbehaves.
+    """
+    if enabled():
+        service = None
+        try:
+            service = _acquire_service(java_path, javac_path)
+            result = service.compile(source_path, out_dir, flags, timeout)
+            _release_service(service)
+            return result
+        except TimeoutError:
+            # A runaway compilation leaves the service mid-request; it is not reused
+            service.stop()
+            raise subprocess.TimeoutExpired([javac_path, source_path], timeout)
+        except Exception as e:
+            print(f"[DEBUG] Java compile service unavailable, using javac: {e}")
+            if service is not None:
+                service.stop()
+
+    compile_proc = subprocess.run(
+        [javac_path, *flags, '-d', out_dir, source_path],
+        cwd=out_dir, capture_output=True, text=True, timeout=timeout,
+        preexec_fn=sandbox.make_preexec(compile_limits(timeout)),
+    )
+    return compile_proc.returncode, compile_proc.stderr
+
+
+def warm_up():
+    """Start the compile service and build the CDS archive ahead of the first submission"""
+    toolchain = languages.get('java')
+    if not (enabled() and toolchain and toolchain['available']):
+        return False
+    java_path, javac_path = toolchain['paths']['runtime'], toolchain['paths']['compiler']
+    try:
+        _release_service(_acquire_service(java_path, javac_path))
+        return cds_archive(java_path, javac_path) is not None
+    except Exception as e:
+        print(f"[DEBUG] JVM warm-up failed: {e}")
+        return False
+
+
+def shutdown():
+    """Stop the idle compile services, so the next compilation starts a fresh one"""
+    with _services_lock:
+        services = list(_idle_services)
+        _idle_services.clear()
+    for service in services:
+        service.stop()
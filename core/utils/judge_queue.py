@@ -0,0 +1,186 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Solution, JudgeTask, ContestSubmission
+from . import events, scoreboard, test_stats, testdata, user_stats, verdict_cache
+from .execution import evaluate_submission
+
+# A claimed task whose worker has not finished within this window is
+# assumed to belong to a crashed worker and is handed out again
+STALE_TASK_TIMEOUT = timedelta(minutes=10)
+
+# A task whose judging raised this many times gets an IE verdict instead of another try
+MAX_TASK_ATTEMPTS = 3
+
+
+def enqueue_submission(solution, mode='first_failure'):
+    """
+    Hand a freshly created Pending solution over to the judge workers, or
+    give it the verdict of an identical earlier submission right away.
+    """
+    if verdict_cache.enabled():
+        result = verdict_cache.lookup(solution, mode)
+        if result is not None:
+            with transaction.atomic():
+                save_result(solution, result, cached=True)
+            return
+    with transaction.atomic():
+        JudgeTask.objects.create(solution=solution, mode=mode)
+        solution.status = Solution.STATUS_QUEUED
+        solution.save(update_fields=['status'])
+    print(f"[DEBUG] Queued solution #{solution.id} ({mode})")
+
+
+def claim_next_task(worker_name):
+    """
+    Atomically claim the oldest unclaimed task, or return None if the queue is empty.
+
+    The claim is a conditional UPDATE, so several workers (threads or
+    processes) can poll the same table without handing out a task twice.
+    """
+    candidate_ids = JudgeTask.objects.filter(
+        claimed_at__isnull=True
+    ).order_by('id').values_list('id', flat=True)[:10]
+
+    for task_id in candidate_ids:
+        claimed = JudgeTask.objects.filter(id=task_id, claimed_at__isnull=True).update(
+            claimed_at=timezone.now(),
+            worker=worker_name,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return JudgeTask.objects.select_related('solution__problem').get(id=task_id)
+    return None
+
+
+def requeue_stale_tasks():
+    """Release tasks claimed by workers that died before finishing them"""
+    cutoff = timezone.now() - STALE_TASK_TIMEOUT
+    stale = JudgeTask.objects.filter(claimed_at__lt=cutoff)
+    Solution.objects.filter(judge_task__in=stale).update(status=Solution.STATUS_QUEUED)
+    return stale.update(claimed_at=None, worker='')
+
+
+def release_task(task, error):
+    """
+    Put back a claimed task whose judging raised, or give its solution an
+    IE verdict once it has failed MAX_TASK_ATTEMPTS times.
+    """
+    if task.attempts < MAX_TASK_ATTEMPTS:
+        with transaction.atomic():
+            JudgeTask.objects.filter(id=task.id).update(claimed_at=None, worker='')
+            _set_status(task.solution, Solution.STATUS_QUEUED)
+        print(f"[DEBUG] Requeued solution #{task.solution_id} after attempt {task.attempts}: {error}")
+        return
+
+    result = {'verdict': 'IE', 'score': 0, 'error': f"Judge error: {error}"}
+    try:
+        with transaction.atomic():
+            # The failed attempt may have left changes on the instance that were rolled back
+            task.solution.refresh_from_db()
+            save_result(task.solution, result)
+            task.delete()
+    except Exception as e:
+        # Whatever broke save_result must not keep the submission in the queue
+        print(f"[DEBUG] Could not store the IE verdict of solution #{task.solution_id}: {e}")
+        with transaction.atomic():
+            Solution.objects.filter(id=task.solution_id).update(
+                verdict='IE', status='IE', output=result['error'], error=result['error']
+            )
+            JudgeTask.objects.filter(id=task.id).delete()
+    print(f"[DEBUG] Gave up on solution #{task.solution_id} after {task.attempts} attempts: {error}")
+
+
+def _set_status(solution, status):
+    solution.status = status
+    Solution.objects.filter(id=solution.id).update(status=status)
+
+
+def save_result(solution, result, cached=False):
+    """
+    Store a judging result on the solution and its contest submission, if
+    any, and update the contest scoreboard and the user's stats. Call
+    inside a transaction.
+    """
+    verdict = result.get('verdict', 'IE')
+    score = result.get('score', 0)
+    if verdict == 'AC':
+        output = "✅ All test cases passed."
+    elif result.get('failed_test'):
+        output = f"❌ Failed on test case {result['failed_test']}\n{result.get('output', '') or result.get('error', '')}"
+    else:
+        output = result.get('output', '') or result.get('error', '')
+
+    previous_verdict = solution.verdict
+    solution.verdict = verdict
+    solution.status = verdict
+    solution.output = output
+    solution.error = result.get('error', '')
+    solution.execution_time = result.get('time')
+    solution.memory_used = result.get('memory')
+    solution.is_cached = cached
+    solution.save(update_fields=[
+        'verdict', 'status', 'output', 'error', 'execution_time', 'memory_used', 'is_cached'
+    ])
+
+    ContestSubmission.objects.filter(solution=solution).update(
+        verdict=verdict,
+        score=score,
+        points_awarded=score,
+    )
+    scoreboard.refresh_solution(solution)
+    user_stats.record_verdict(solution, previous_verdict)
+    events.publish_verdict(solution, score)
+    print(f"[DEBUG] Solution #{solution.id} {'answered from cache' if cached else 'judged'}: {verdict} ({score})")
+
+
+def judge_task(task):
+    """Judge a claimed task and store the final verdict on its solution"""
+    solution = task.solution
+    problem = solution.problem
+    stop_on_failure = task.mode == 'first_failure'
+
+    # An identical submission may have been judged while this one waited
+    result = verdict_cache.lookup(solution, task.mode) if verdict_cache.enabled() else None
+    if result is not None:
+        with transaction.atomic():
+            save_result(solution, result, cached=True)
+            task.delete()
+        return result
+
+    try:
+        order = None
+        if stop_on_failure and test_stats.enabled():
+            order = test_stats.run_order(problem, testdata.case_count(problem))
+        result = evaluate_submission(
+            solution.language,
+            solution.code,
+            problem,
+            stop_on_failure=stop_on_failure,
+            on_status=lambda status: _set_status(solution, status),
+            order=order,
+        )
+    except Exception as e:
+        print(f"[DEBUG] Judging solution #{solution.id} failed: {e}")
+        result = {'verdict': 'IE', 'score': 0, 'error': f"Judge error: {str(e)}"}
+
+    if result.get('test_results'):
+        try:
+            test_stats.record(problem, result['test_results'])
+        except Exception as e:
+            # Statistics only affect ordering; never let them cost a verdict
+            print(f"[DEBUG] Could not record test statistics for solution #{solution.id}: {e}")
+
+    with transaction.atomic():
+        save_result(solution, result)
+        task.delete()
+
+    if verdict_cache.enabled():
+        try:
+            verdict_cache.store(solution, task.mode, result)
+        except Exception as e:
+            print(f"[DEBUG] Could not cache the verdict of solution #{solution.id}: {e}")
+    return result
@@ -0,0 +1,213 @@
+"""
+Registry of the languages submissions can be written in.
+
+Each language is described by configuration rather than code: the source
+file name, the tools it needs, compile and run command templates, compiler
+flags, the time limit multiplier and which sandbox limits apply. The
+defaults below can be overridden per language through settings.JUDGE_LANGUAGES
+(a key mapped to None disables that language), and tool paths through
+settings.COMPILER_PATHS.
+
+Toolchains are probed once per process with probe(), which resolves every
+tool to an absolute path and records its version. Judge workers probe at
+startup and report missing toolchains there, instead of every submission
+in that language failing with a CE verdict.
+
+Command templates may use {source}, {work_dir}, {flags} (expanded into
+separate arguments) and the name of any tool, e.g. {compiler}.
+"""
+import copy
+import fnmatch
+import os
+import shutil
+import threading
+
+from django.conf import settings
+
+from .artifact_cache import compiler_version
+
+DEFAULT_LANGUAGES = {
+    'python': {
+        'name': 'Python 3',
+        'source': 'main.py',
+        'tools': {'interpreter': ['python3', 'python']},
+        'compile': None,
+        'run': ['{interpreter}', '{source}'],
+        'flags': [],
+        'artifacts': [],
+        'time_multiplier': 1.0,
+        'limit_address_space': True,
+        'limit_processes': True,
+        'install_hint': 'sudo apt install python3',
+    },
+    'cpp': {
+        'name': 'C++',
+        'source': 'main.cpp',
+        'tools': {'compiler': ['g++']},
+        'compile': ['{compiler}', '{source}', '{flags}', '-o', '{work_dir}/main.out'],
+        'run': ['{work_dir}/main.out'],
+        'flags': [],
+        'artifacts': ['main.out'],
+        'time_multiplier': 1.0,
+        'limit_address_space': True,
+        'limit_processes': True,
+        'install_hint': 'sudo apt install g++',
+    },
+    'c': {
+        'name': 'C',
+        'source': 'main.c',
+        'tools': {'compiler': ['gcc']},
+        'compile': ['{compiler}', '{source}', '{flags}', '-o', '{work_dir}/main.out', '-lm'],
+        'run': ['{work_dir}/main.out'],
+        'flags': [],
+        'artifacts': ['main.out'],
+        'time_multiplier': 1.0,
+        'limit_address_space': True,
+        'limit_processes': True,
+        'install_hint': 'sudo apt install gcc',
+    },
+    'java': {
+        'name': 'Java',
+        # The public class must match the file name
+        'source': 'Main.java',
+        'tools': {'compiler': ['javac'], 'runtime': ['java']},
+        'compile': ['{compiler}', '{flags}', '-d', '{work_dir}', '{source}'],
+        'run': ['{runtime}', '-cp', '{work_dir}', 'Main'],
+        'flags': [],
+        # Nested and anonymous classes compile to their own Main$*.class files
+        'artifacts': ['*.class'],
+        'time_multiplier': 1.0,
+        # The JVM reserves huge address ranges and starts helper threads at boot
+        'limit_address_space': False,
+        'limit_processes': False,
+        'install_hint': 'sudo apt install default-jdk',
+    },
+    'javascript': {
+        'name': 'JavaScript',
+        'source': 'main.js',
+        'tools': {'interpreter': ['node', 'nodejs']},
+        'compile': None,
+        'run': ['{interpreter}', '{source}'],
+        'flags': [],
+        'artifacts': [],
+        'time_multiplier': 1.0,
+        'limit_address_space': False,
+        'limit_processes': False,
+        'install_hint': 'sudo apt install nodejs',
+    },
+}
+
+# settings.COMPILER_PATHS key -> (language, tool) it overrides
+COMPILER_PATH_KEYS = {
+    'CPP_COMPILER': ('cpp', 'compiler'),
+    'C_COMPILER': ('c', 'compiler'),
+    'JAVA_COMPILER': ('java', 'compiler'),
+    'JAVA_RUNTIME': ('java', 'runtime'),
+    'PYTHON_INTERPRETER': ('python', 'interpreter'),
+    'NODE_INTERPRETER': ('javascript', 'interpreter'),
+}
+
+_toolchains = None
+_probe_lock = threading.Lock()
+
+
+def configured():
+    """Language configuration with settings.JUDGE_LANGUAGES and COMPILER_PATHS applied"""
+    languages = copy.deepcopy(DEFAULT_LANGUAGES)
+    for key, overrides in getattr(settings, 'JUDGE_LANGUAGES', {}).items():
+        if overrides is None:
+            languages.pop(key, None)
+        else:
+            languages.setdefault(key, {}).update(overrides)
+    for setting, path in getattr(settings, 'COMPILER_PATHS', {}).items():
+        if setting in COMPILER_PATH_KEYS and path:
+            language, tool = COMPILER_PATH_KEYS[setting]
+            if language in languages:
+                languages[language]['tools'][tool] = [path]
+    return languages
+
+
+def choices():
+    """(key, name) pairs for language selectors, in configuration order"""
+    return [(key, config['name']) for key, config in configured().items()]
+
+
+def resolve_tool(candidates):
+    """First of the candidate names or paths that is an executable, as an absolute path"""
+    for candidate in candidates:
+        path = shutil.which(candidate)
+        if path:
+            return os.path.abspath(path)
+    return None
+
+
+def _probe_language(key, config):
+    paths = {tool: resolve_tool(candidates) for tool, candidates in config['tools'].items()}
+    missing = [tool for tool, path in paths.items() if path is None]
+    versions = {tool: compiler_version(path) for tool, path in paths.items() if path}
+    return {
+        **config,
+        'key': key,
+        'paths': paths,
+        'versions': versions,
+        'missing': missing,
+        'available': not missing,
+    }
+
+
+def probe(refresh=False):
+    """Resolve every configured toolchain once per process; returns {key: toolchain}"""
+    global _toolchains
+    with _probe_lock:
+        if _toolchains is None or refresh:
+            _toolchains = {key: _probe_language(key, config) for key, config in configured().items()}
+        return _toolchains
+
+
+def get(language):
+    """The probed toolchain for a language, or None if it is not configured"""
+    return probe().get(language)
+
+
+def unavailable_message(toolchain):
+    missing = ', '.join(
+        '/'.join(toolchain['tools'][tool]) for tool in toolchain['missing']
+    )
+    return f"{toolchain['name']} is not available on this judge (missing {missing}). " \
+           f"Please install: {toolchain['install_hint']}"
+
+
+def command(toolchain, template, work_dir):
+    """Expand a compile or run command template for a submission in work_dir"""
+    values = {
+        **toolchain['paths'],
+        'source': os.path.join(work_dir, toolchain['source']),
+        'work_dir': work_dir,
+    }
+    argv = []
+    for part in template:
+        if part == '{flags}':
+            argv.extend(toolchain['flags'])
+        else:
+            argv.append(part.format(**values))
+    return argv
+
+
+def artifacts(toolchain, work_dir):
+    """Files in work_dir produced by compiling, to be stored in the artifact cache"""
+    return sorted(
+        name for name in os.listdir(work_dir)
+        if any(fnmatch.fnmatch(name, pattern) for pattern in toolchain['artifacts'])
+    )
+
+
+def report():
+    """One line per language describing its toolchain, for startup logs"""
+    lines = []
+    for key, toolchain in probe().items():
+        if toolchain['available']:
+            version = next(iter(toolchain['versions'].values()), '')
+            lines.append(f"  {key:<11} {version}")
+        else:
+            lines.append(f"  {key:<11} MISSING: {unavailable_message(toolchain)}")
+    return lines
@@ -0,0 +1,217 @@
+"""
+Client side of the Python fork server (see python_forkserver_main.py).
+
+Each judge process keeps one server per interpreter. A submission is compiled
+to a code object once by a forked child, and every test case then runs in a
+fresh fork of the pre-initialized server instead of a newly started
+interpreter. Test cases get the same rlimits, stdin/stdout/stderr pipes and
+rusage accounting as a plain `python3 main.py`; unlike it, they share the
+server's string hash seed (see python_forkserver_main.py).
+
+Enabled with CODE_EXECUTION['PYTHON_FORKSERVER']; any failure to start the
+server or compile through it falls back to running the interpreter directly.
+"""
+import atexit
+import json
+import os
+import select
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import types
+
+from django.conf import settings
+
+from . import languages, sandbox
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python_forkserver_main.py')
+START_TIMEOUT = 10
+COMPILE_TIMEOUT = 10
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def enabled():
+    return settings.CODE_EXECUTION.get('PYTHON_FORKSERVER', False)
+
+
+class ForkedProcess(sandbox.MemorySampler):
+    """Popen-like handle on a submission process forked by the server"""
+    # Forked without exec from a server that never grows, so ru_maxrss is the child's own peak
+    parent_peak_kb = 0
+    rusage = None
+    returncode = None
+
+    def __init__(self, conn, stdin, stdout, stderr):
+        self.conn = conn
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self._buffer = b''
+        self.pid = self._read_message(START_TIMEOUT)['pid']
+
+    def _read_message(self, timeout):
+        """Next JSON line from the supervisor, or None if none arrived within timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while b'\n' not in self._buffer:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not select.select([self.conn], [], [], remaining)[0]:
+                return None
+            chunk = self.conn.recv(4096)
+            if not chunk:
+                raise RuntimeError('Python fork server closed the connection')
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return json.loads(line)
+
+    def _finish(self, message):
+        utime, stime, maxrss = message['rusage']
+        self.rusage = types.SimpleNamespace(ru_utime=utime, ru_stime=stime, ru_maxrss=maxrss)
+        self.returncode = message['returncode']
+        self.conn.close()
+
+    def poll(self):
+        if self.returncode is None:
+            message = self._read_message(0)
+            if message is not None:
+                self._finish(message)
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if self.returncode is None:
+            message = self._read_message(timeout)
+            if message is None:
+                raise subprocess.TimeoutExpired(SERVER_SCRIPT, timeout)
+            self._finish(message)
+        return self.returncode
+
+    def kill(self):
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+class ForkServer:
+    """A running python_forkserver_main.py listening on a private Unix socket"""
+
+    def __init__(self, python_path):
+        self.python_path = python_path
+        # Unix socket paths are limited to ~100 bytes, so stay out of TEMP_DIR
+        self.directory = tempfile.mkdtemp(prefix='oj-forkserver-')
+        self.socket_path = os.path.join(self.directory, 'server.sock')
+        self.process = subprocess.Popen(
+            [python_path, SERVER_SCRIPT, self.socket_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        ready = select.select([self.process.stdout], [], [], START_TIMEOUT)[0]
+        if not ready or self.process.stdout.readline().strip() != b'READY':
+            self.stop()
+            raise RuntimeError('Python fork server did not start')
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def spawn(self, request):
+        """Fork a child for request with fresh stdio pipes; returns a ForkedProcess"""
+        stdin_read, stdin_write = os.pipe()
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        pipes = (
+            open(stdin_write, 'wb', buffering=0),
+            open(stdout_read, 'rb', buffering=0),
+            open(stderr_read, 'rb', buffering=0),
+        )
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(self.socket_path)
+            socket.send_fds(conn, [json.dumps(request).encode()], [stdin_read, stdout_write, stderr_write])
+            return ForkedProcess(conn, *pipes)
+        except BaseException:
+            conn.close()
+            for pipe in pipes:
+                pipe.close()
+            raise
+        finally:
+            # The child holds its own copies now
+            for fd in (stdin_read, stdout_write, stderr_write):
+                os.close(fd)
+
+    def stop(self):
+        self.process.kill()
+        self.process.wait()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _get_server(python_path):
+    with _servers_lock:
+        server = _servers.get(python_path)
+        if server is None or not server.alive():
+            server = _servers[python_path] = ForkServer(python_path)
+        return server
+
+
+def compile_bytecode(python_path, source_path, target_path, limits):
+    """
+    Compile source_path into a marshalled code object at target_path.
+
+    Returns False if the source does not compile; the caller then runs it
+    through the interpreter, which reports the SyntaxError as usual.
+    """
+    process = _get_server(python_path).spawn({
+        'op': 'compile',
+        'source': source_path,
+        'target': target_path,
+        'cwd': os.path.dirname(source_path),
+        'rlimits': sandbox.rlimit_list(limits),
+    })
+    for pipe in (process.stdin, process.stdout, process.stderr):
+        pipe.close()
+    try:
+        return process.wait(COMPILE_TIMEOUT) == 0
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        return False
+
+
+def spawn(forkserver, cwd, limits):
+    """Start one test case of a program compiled with compile_bytecode"""
+    return _get_server(forkserver['python']).spawn({
+        'op': 'run',
+        'code': forkserver['bytecode'],
+        'script': forkserver['script'],
+        'cwd': cwd,
+        'rlimits': sandbox.rlimit_list(limits),
+    })
+
+
+def warm_up():
+    """Start the fork server ahead of the first submission"""
+    toolchain = languages.get('python')
+    if not (enabled() and toolchain and toolchain['available']):
+        return False
+    try:
+        _get_server(toolchain['paths']['interpreter'])
+        return True
+    except Exception as e:
+        print(f"[DEBUG] Python fork server failed to start: {e}")
+        return False
+
+
+def shutdown():
+    with _servers_lock:
+        for server in _servers.values():
+            server.stop()
+        _servers.clear()
+
+
+atexit.register(shutdown)
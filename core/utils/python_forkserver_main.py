@@ -0,0 +1,198 @@
+"""
+Fork server for Python submissions.
+
+Started once per judge process as `python3 python_forkserver_main.py <socket>`
+with the same interpreter that would otherwise run every test case. It
+imports the standard modules solutions commonly use, then listens on a Unix
+socket. Each request carries a JSON header and the child's stdin, stdout and
+stderr file descriptors (SCM_RIGHTS). For every request the server forks a
+supervisor, which forks the worker that compiles or runs the submission and
+reports its pid, exit status and rusage back over the connection.
+
+Workers are forked from a pristine server that never runs submission code,
+so each test case starts from the same state as a fresh interpreter, with
+one deliberate difference: the string hash seed is fixed when the server
+starts, so every worker of one server shares it, and the iteration order of
+sets of strings is the same for every submission it runs. A fresh
+`python3` would draw a new seed each time. The seed is still random per
+server (unless PYTHONHASHSEED is set for the judge), and solutions cannot
+rely on that order either way. This script must not import Django or
+anything from the judge.
+"""
+import builtins
+import io
+import json
+import marshal
+import os
+import resource
+import select
+import signal
+import socket
+import sys
+import traceback
+import types
+
+# Warm the interpreter with modules solutions commonly import
+import array
+import bisect
+import collections
+import decimal
+import fractions
+import functools
+import heapq
+import itertools
+import math
+import random
+import re
+import string
+import typing
+
+MAX_FDS = 3
+HEADER_SIZE = 65536
+
+
+def _exit_code(exc):
+    """Exit status the interpreter would use for an uncaught SystemExit"""
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+def _reset_stdio():
+    sys.stdin = io.TextIOWrapper(io.open(0, 'rb', closefd=False), encoding='utf-8', errors='strict')
+    sys.stdout = io.TextIOWrapper(io.open(1, 'wb', closefd=False), encoding='utf-8', errors='strict')
+    sys.stderr = io.TextIOWrapper(
+        io.open(2, 'wb', closefd=False), encoding='utf-8', errors='backslashreplace', line_buffering=True
+    )
+
+
+def _compile(request):
+    with open(request['source'], 'rb') as f:
+        source = f.read()
+    code = compile(source, request['source'], 'exec', dont_inherit=True)
+    with open(request['target'], 'wb') as f:
+        marshal.dump(code, f)
+    return 0
+
+
+def _run(request):
+    with open(request['code'], 'rb') as f:
+        code = marshal.load(f)
+
+    script = request['script']
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(script)
+    main = types.ModuleType('__main__')
+    main.__file__ = script
+    main.__builtins__ = builtins
+    sys.modules['__main__'] = main
+
+    # A fresh interpreter seeds random from the OS; the fork would share the server's state.
+    # The str hash seed cannot be reset after startup and stays the server's (see above).
+    random.seed()
+
+    try:
+        exec(code, main.__dict__)
+        status = 0
+    except SystemExit as e:
+        status = _exit_code(e)
+    except BaseException as e:
+        # Drop this frame so the traceback reads like the interpreter's own
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        status = 1
+
+    try:
+        sys.stdout.flush()
+    except Exception:
+        status = 120
+    return status
+
+
+def worker(request, fds):
+    """Runs in the grandchild: becomes the submission process"""
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+    os.closerange(3, os.sysconf('SC_OPEN_MAX') if hasattr(os, 'sysconf') else 1024)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    _reset_stdio()
+
+    status = 1
+    try:
+        os.chdir(request['cwd'])
+        for name, soft, hard in request['rlimits']:
+            resource.setrlimit(getattr(resource, name), (soft, hard))
+        status = _compile(request) if request['op'] == 'compile' else _run(request)
+    except SystemExit as e:
+        status = _exit_code(e)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(status)
+
+
+def supervise(conn, request, fds):
+    """Runs in the child: forks the worker, reports its pid, then its exit status"""
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        worker(request, fds)
+
+    for fd in fds:
+        os.close(fd)
+    conn.sendall(json.dumps({'pid': pid}).encode() + b'\n')
+    _, status, usage = os.wait4(pid, 0)
+    returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    conn.sendall(json.dumps({
+        'returncode': returncode,
+        'rusage': [usage.ru_utime, usage.ru_stime, usage.ru_maxrss],
+    }).encode() + b'\n')
+    conn.close()
+    os._exit(0)
+
+
+def serve(socket_path):
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(64)
+    # Supervisors are reaped automatically; each one reaps its own worker
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    print('READY', flush=True)
+    while True:
+        # stdin closes when the judge process that owns this server goes away
+        readable, _, _ = select.select([listener, sys.stdin], [], [])
+        if sys.stdin in readable and not sys.stdin.buffer.read1(1):
+            break
+        if listener not in readable:
+            continue
+
+        conn, _ = listener.accept()
+        try:
+            header, fds, _, _ = socket.recv_fds(conn, HEADER_SIZE, MAX_FDS)
+            request = json.loads(header)
+        except Exception:
+            conn.close()
+            continue
+
+        if os.fork() == 0:
+            listener.close()
+            supervise(conn, request, fds)
+
+        conn.close()
+        for fd in fds:
+            os.close(fd)
+
+    listener.close()
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1])
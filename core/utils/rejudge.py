@@ -0,0 +1,195 @@
+"""
+Bulk re-evaluation of already judged solutions.
+
+A RejudgeJob holds the solutions to judge again, chosen with
+select_solutions(). run_job() works through them problem by problem in
+batches of CODE_EXECUTION['REJUDGE_BATCH_SIZE'], so each problem's test
+data, checker and compiled artifacts stay warm while its solutions run, and
+an identical source submitted several times is only judged once per batch.
+
+New verdicts are held until the whole job has run and then written to the
+solutions and their contest submissions in one transaction, so scores and
+standings never show a half-rejudged state. A job that fails changes
+nothing.
+
+Jobs are run by the `rejudge` command directly, or picked up by idle
+runjudge workers when they are queued from the admin.
+"""
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import ContestSubmission, RejudgeJob, Solution
+from . import test_stats, testdata, verdict_cache
+from .execution import evaluate_submission
+from .judge_queue import STALE_TASK_TIMEOUT, save_result
+
+
+def _batch_size():
+    return max(1, settings.CODE_EXECUTION.get('REJUDGE_BATCH_SIZE', 50))
+
+
+def select_solutions(problem=None, contest=None, verdicts=None, since=None, until=None):
+    """Judged solutions matching every given filter"""
+    solutions = Solution.objects.exclude(status__in=Solution.IN_PROGRESS_STATUSES)
+    if problem is not None:
+        solutions = solutions.filter(problem=problem)
+    if contest is not None:
+        solutions = solutions.filter(contestsubmission__contest=contest)
+    if verdicts:
+        solutions = solutions.filter(verdict__in=verdicts)
+    if since is not None:
+        solutions = solutions.filter(submitted_at__gte=since)
+    if until is not None:
+        solutions = solutions.filter(submitted_at__lt=until)
+    return solutions.distinct()
+
+
+def create_job(solutions, description='', user=None):
+    """Queue the given solutions for rejudging; returns the pending RejudgeJob"""
+    ids = list(solutions.values_list('id', flat=True))
+    with transaction.atomic():
+        job = RejudgeJob.objects.create(description=description[:255], total=len(ids), created_by=user)
+        job.solutions.set(ids)
+    print(f"[DEBUG] Rejudge job #{job.id} created for {len(ids)} solution(s)")
+    return job
+
+
+def claim_next_job(worker_name):
+    """Atomically claim the oldest pending job, or return None"""
+    for job_id in RejudgeJob.objects.filter(status=RejudgeJob.STATUS_PENDING).order_by('id').values_list('id', flat=True)[:5]:
+        claimed = RejudgeJob.objects.filter(id=job_id, status=RejudgeJob.STATUS_PENDING).update(
+            status=RejudgeJob.STATUS_RUNNING,
+            worker=worker_name,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return RejudgeJob.objects.get(id=job_id)
+    return None
+
+
+def requeue_stale_jobs():
+    """Hand jobs whose worker stopped reporting progress out again"""
+    cutoff = timezone.now() - STALE_TASK_TIMEOUT
+    return RejudgeJob.objects.filter(status=RejudgeJob.STATUS_RUNNING, updated_at__lt=cutoff).update(
+        status=RejudgeJob.STATUS_PENDING, worker='', judged=0
+    )
+
+
+def _judge(solution, mode, order):
+    try:
+        return evaluate_submission(
+            solution.language,
+            solution.code,
+            solution.problem,
+            stop_on_failure=(mode == 'first_failure'),
+            order=order,
+        )
+    except Exception as e:
+        print(f"[DEBUG] Rejudging solution #{solution.id} failed: {e}")
+        return {'verdict': 'IE', 'score': 0, 'error': f"Judge error: {str(e)}"}
+
+
+def _run_batch(problem, batch, contest_ids, order, workers, on_judged):
+    """
+    Judge one problem's batch of solutions; returns {solution id: result}.
+    on_judged is called with the number of solutions each finished run covers.
+    """
+    groups = {}
+    for solution in batch:
+        # Contest submissions are judged for partial score, practice ones stop at the first failure
+        mode = 'partial' if solution.id in contest_ids else 'first_failure'
+        key = (solution.language, verdict_cache.source_hash(solution.code), mode)
+        groups.setdefault(key, []).append(solution)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            key: pool.submit(_judge, solutions[0], key[2], order if key[2] == 'first_failure' else None)
+            for key, solutions in groups.items()
+        }
+        keys = {future: key for key, future in futures.items()}
+        for future in as_completed(keys):
+            on_judged(len(groups[keys[future]]))
+
+    results = {}
+    for key, future in futures.items():
+        result = future.result()
+        test_results = result.pop('test_results', None)
+        if test_results:
+            test_stats.record(problem, test_results)
+        first = groups[key][0]
+        if verdict_cache.enabled():
+            verdict_cache.store(first, key[2], result, replace=True)
+        for solution in groups[key]:
+            results[solution.id] = result
+    return results
+
+
+def run_job(job, workers=1, progress=None):
+    """
+    Judge every solution of a claimed (or freshly created) job and apply the
+    new verdicts at the end. progress, if given, is called with the job
+    after every batch. Returns the job, whose status tells whether it failed.
+
+    The job's judged count and updated_at are saved after every solution,
+    so requeue_stale_jobs() leaves it alone while it is making progress.
+    """
+    if job.status != RejudgeJob.STATUS_RUNNING:
+        job.status = RejudgeJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+    job.judged = 0
+    job.save(update_fields=['status', 'started_at', 'judged', 'updated_at'])
+
+    def on_judged(count):
+        job.judged += count
+        job.updated_at = timezone.now()
+        RejudgeJob.objects.filter(id=job.id).update(judged=job.judged, updated_at=job.updated_at)
+
+    try:
+        solutions = job.solutions.select_related('problem').order_by('problem_id', 'id')
+        contest_ids = set(
+            ContestSubmission.objects.filter(solution__in=solutions).values_list('solution_id', flat=True)
+        )
+        results = {}
+        for _, problem_solutions in itertools.groupby(solutions.iterator(), key=lambda s: s.problem_id):
+            problem_solutions = list(problem_solutions)
+            problem = problem_solutions[0].problem
+            for solution in problem_solutions:
+                # Share one Problem instance so its test data and checker are looked up once
+                solution.problem = problem
+            order = None
+            if test_stats.enabled():
+                order = test_stats.run_order(problem, testdata.case_count(problem))
+
+            for start in range(0, len(problem_solutions), _batch_size()):
+                batch = problem_solutions[start:start + _batch_size()]
+                results.update(_run_batch(problem, batch, contest_ids, order, workers, on_judged))
+                if progress:
+                    progress(job)
+
+        changed = 0
+        with transaction.atomic():
+            for solution in job.solutions.select_for_update().order_by('id'):
+                # Skip solutions that went back into the queue while the job ran
+                if solution.id not in results or not solution.is_judged:
+                    continue
+                previous = solution.verdict
+                save_result(solution, results[solution.id])
+                changed += previous != solution.verdict
+            job.status = RejudgeJob.STATUS_DONE
+            job.changed = changed
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'changed', 'finished_at', 'updated_at'])
+    except Exception as e:
+        print(f"[DEBUG] Rejudge job #{job.id} failed: {e}")
+        job.status = RejudgeJob.STATUS_FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+        return job
+
+    print(f"[DEBUG] Rejudge job #{job.id} done: {job.judged} judged, {job.changed} changed")
+    return job
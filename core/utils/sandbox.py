@@ -0,0 +1,174 @@
+import math
+import os
+import resource
+import signal
+import subprocess
+
+from django.conf import settings
+
+from . import languages
+
+# Extra virtual address space on top of MEMORY_LIMIT for shared libraries and
+# allocator slack; the memory verdict itself is based on peak RSS
+ADDRESS_SPACE_HEADROOM_MB = 64
+
+# Wall-clock limit as a multiple of the CPU time limit, to catch programs
+# that sleep or block on input instead of burning CPU
+WALL_TIME_FACTOR = 2
+
+MEMORY_ERROR_MARKERS = (
+    'MemoryError',
+    'std::bad_alloc',
+    'OutOfMemoryError',
+    'JavaScript heap out of memory',
+)
+
+# Runtimes that ignore SIGXFSZ report RLIMIT_FSIZE as a failed write (EFBIG)
+OUTPUT_ERROR_MARKERS = (
+    'File too large',
+)
+
+
+def get_limits(language):
+    """
+    Resource limits for one run of a submission in the given language.
+
+    Runtimes that reserve huge virtual address ranges (JIT heaps, code
+    caches) or start helper threads at boot are configured in the language
+    registry without RLIMIT_AS / RLIMIT_NPROC, which would kill them before
+    user code runs; their memory is judged on peak RSS only.
+    """
+    conf = settings.CODE_EXECUTION
+    toolchain = languages.get(language) or {}
+    return {
+        'time': conf.get('TIME_LIMIT', 5) * toolchain.get('time_multiplier', 1.0),
+        'memory': conf.get('MEMORY_LIMIT', 128),
+        'output': conf.get('OUTPUT_LIMIT', 64),
+        'processes': conf.get('PROCESS_LIMIT', 1),
+        'limit_address_space': toolchain.get('limit_address_space', True),
+        'limit_processes': toolchain.get('limit_processes', True),
+    }
+
+
+def wall_time_limit(limits):
+    return limits['time'] * WALL_TIME_FACTOR
+
+
+def rlimit_list(limits):
+    """
+    The rlimits for one run as (RLIMIT_* name, soft, hard) triples.
+
+    Names rather than resource constants, so the list can also be sent to
+    the Python fork server.
+    """
+    cpu = math.ceil(limits['time'])
+    output_bytes = limits['output'] * 1024 * 1024
+    rlimits = [
+        # Soft limit sends SIGXCPU, the hard limit one second later SIGKILL
+        ('RLIMIT_CPU', cpu, cpu + 1),
+        ('RLIMIT_FSIZE', output_bytes, output_bytes),
+        ('RLIMIT_CORE', 0, 0),
+    ]
+    if limits['limit_address_space']:
+        address_space = (limits['memory'] + ADDRESS_SPACE_HEADROOM_MB) * 1024 * 1024
+        rlimits.append(('RLIMIT_AS', address_space, address_space))
+    if limits['limit_processes']:
+        rlimits.append(('RLIMIT_NPROC', limits['processes'], limits['processes']))
+    return rlimits
+
+
+def make_preexec(limits):
+    """
+    Build the preexec_fn that applies rlimits in the child before exec.
+
+    All values are computed up front so the function run between fork and
+    exec only makes setrlimit calls.
+    """
+    rlimits = [(getattr(resource, name), (soft, hard)) for name, soft, hard in rlimit_list(limits)]
+
+    def apply_limits():
+        for limit, value in rlimits:
+            resource.setrlimit(limit, value)
+
+    return apply_limits
+
+
+class MemorySampler:
+    """Tracks a running child's peak RSS from VmHWM samples"""
+    sampled_peak_kb = 0
+
+    def sample_memory(self):
+        try:
+            with open(f'/proc/{self.pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        self.sampled_peak_kb = max(self.sampled_peak_kb, int(line.split()[1]))
+                        break
+        except (OSError, ValueError):
+            # Already exited, or not on Linux
+            pass
+
+
+class MeasuredPopen(MemorySampler, subprocess.Popen):
+    """
+    Popen that keeps the child's rusage when it is reaped.
+
+    Linux carries ru_maxrss over from the forked parent into the exec'd
+    child, so a child's own peak RSS is only visible in rusage once it
+    exceeds the parent's. Below that the peak is taken from VmHWM samples
+    collected with sample_memory() while the child runs.
+    """
+    rusage = None
+
+    def __init__(self, *args, **kwargs):
+        self.parent_peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        super().__init__(*args, **kwargs)
+
+    def _try_wait(self, wait_flags):
+        try:
+            (pid, sts, rusage) = os.wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            # Mirrors Popen._try_wait: the child is gone and its status lost
+            return (self.pid, 0)
+        if pid == self.pid:
+            self.rusage = rusage
+        return (pid, sts)
+
+
+def usage_of(process):
+    """(cpu seconds, peak RSS in KB) of a reaped MeasuredPopen or fork server child"""
+    if process.rusage is None:
+        return 0.0, process.sampled_peak_kb
+    cpu_time = process.rusage.ru_utime + process.rusage.ru_stime
+    if process.rusage.ru_maxrss > process.parent_peak_kb:
+        return cpu_time, process.rusage.ru_maxrss
+    return cpu_time, process.sampled_peak_kb
+
+
+def limit_verdict(returncode, cpu_time, memory_kb, stderr, output_size, limits):
+    """
+    Map a finished run onto TLE / OLE / MLE, or return None if no limit was hit.
+
+    Returns a (verdict, message) tuple.
+    """
+    if returncode == -signal.SIGXCPU or (returncode == -signal.SIGKILL and cpu_time >= limits['time']):
+        return 'TLE', f"Time Limit Exceeded (CPU time limit {limits['time']}s)"
+
+    if (
+        returncode == -signal.SIGXFSZ
+        or output_size > limits['output'] * 1024 * 1024
+        or (returncode != 0 and any(marker in stderr for marker in OUTPUT_ERROR_MARKERS))
+    ):
+        return 'OLE', f"Output Limit Exceeded ({limits['output']} MB)"
+
+    memory_limit_kb = limits['memory'] * 1024
+    if memory_kb > memory_limit_kb:
+        return 'MLE', f"Memory Limit Exceeded ({memory_kb // 1024} MB > {limits['memory']} MB)"
+
+    # Allocation failures under RLIMIT_AS surface as crashes of the runtime
+    if returncode != 0 and (
+        memory_kb >= memory_limit_kb * 0.9 or any(marker in stderr for marker in MEMORY_ERROR_MARKERS)
+    ):
+        return 'MLE', f"Memory Limit Exceeded ({limits['memory']} MB)"
+
+    return None
@@ -0,0 +1,275 @@
+"""
+Materialized contest standings.
+
+ScoreboardEntry holds each participant's attempt count and best score per
+problem, and ScoreboardRow their totals. Both are recomputed for the one
+(participant, problem) pair a change touches, inside the transaction that
+makes the change:
+
+* refresh() when a ContestSubmission is created;
+* refresh_solution() when a submission gets its verdict, or a new one
+  after a rejudge.
+
+A contest's standings are then one ordered read of its rows plus one read
+of its entries, however many participants it has. Every refresh also bumps
+Contest.scoreboard_version and publishes a standings event to listening
+clients (core.utils.events).
+
+Viewers are served from snapshots of those standings kept in the default
+cache (snapshot()). A snapshot is never modified; it is rebuilt when the
+scoreboard version moved on and the snapshot is at least
+SCOREBOARD['SNAPSHOT_INTERVAL'] seconds old, so a contest costs a handful
+of queries per interval however many viewers poll it. Its version is a
+digest of its content, and the per-row digests of the last
+SCOREBOARD['SNAPSHOT_HISTORY'] versions are kept so clients can fetch only
+the rows that changed (changes_since()).
+
+While a contest's scoreboard is frozen, the public snapshot counts only
+submissions made before the freeze; staff get the live one.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Contest, ContestParticipant, ContestSubmission, ScoreboardEntry, ScoreboardRow
+from . import events
+
+# Seconds a snapshot may stay in the cache without being read
+SNAPSHOT_TIMEOUT = 600
+
+
+def _setting(name, default):
+    return getattr(settings, 'SCOREBOARD', {}).get(name, default)
+
+
+def refresh(contest_id, participant_id, problem_id):
+    """Recompute one participant's entry for one problem and their totals"""
+    with transaction.atomic():
+        # Serializes refreshes of the same participant's row
+        ContestParticipant.objects.select_for_update().filter(id=participant_id).first()
+
+        entry = ContestSubmission.objects.filter(
+            participant_id=participant_id, problem_id=problem_id
+        ).aggregate(attempts=Count('id'), best=Coalesce(Max('points_awarded'), 0))
+        ScoreboardEntry.objects.update_or_create(
+            participant_id=participant_id,
+            problem_id=problem_id,
+            defaults={'contest_id': contest_id, 'attempts': entry['attempts'], 'best_points': entry['best']},
+        )
+
+        totals = ScoreboardEntry.objects.filter(participant_id=participant_id).aggregate(
+            total=Coalesce(Sum('best_points'), 0),
+            solved=Count('id', filter=Q(best_points__gt=0)),
+            submissions=Coalesce(Sum('attempts'), 0),
+        )
+        ScoreboardRow.objects.update_or_create(
+            participant_id=participant_id,
+            defaults={
+                'contest_id': contest_id,
+                'total_points': totals['total'],
+                'solved': totals['solved'],
+                'submissions': totals['submissions'],
+            },
+        )
+        # A finalized contest whose standings changed (a rejudge) gets finalized again
+        Contest.objects.filter(id=contest_id).update(scoreboard_version=F('scoreboard_version') + 1, finalized_at=None)
+        events.standings_changed(contest_id)
+
+
+def refresh_submission(submission):
+    refresh(submission.contest_id, submission.participant_id, submission.problem_id)
+
+
+def refresh_solution(solution):
+    """Refresh the standings of every contest the solution was submitted to"""
+    for contest_id, participant_id, problem_id in ContestSubmission.objects.filter(
+        solution=solution
+    ).values_list('contest_id', 'participant_id', 'problem_id'):
+        refresh(contest_id, participant_id, problem_id)
+
+
+def _row(rank, participant, total_points, solved, submissions, cells):
+    user = participant.user
+    return {
+        'rank': rank,
+        'participant': {
+            'id': participant.id,
+            'user': {'username': user.username, 'first_name': user.first_name, 'last_name': user.last_name},
+        },
+        'total_points': total_points,
+        'solved_problems': solved,
+        'submissions_count': submissions,
+        'problem_scores': cells,
+    }
+
+
+def _live_standings(contest):
+    participants = ContestParticipant.objects.filter(contest=contest).select_related(
+        'user', 'scoreboard_row'
+    ).order_by(
+        Coalesce('scoreboard_row__total_points', 0).desc(),
+        Coalesce('scoreboard_row__submissions', 0),
+        'id',
+    )
+    cells = {}
+    for participant_id, problem_uuid, attempts, best_points in ScoreboardEntry.objects.filter(
+        contest=contest
+    ).values_list('participant_id', 'problem__uuid', 'attempts', 'best_points'):
+        cells.setdefault(participant_id, {})[str(problem_uuid)] = {'points': best_points, 'submissions': attempts}
+
+    result = []
+    for rank, participant in enumerate(participants, start=1):
+        row = getattr(participant, 'scoreboard_row', None)
+        result.append(_row(
+            rank,
+            participant,
+            row.total_points if row else 0,
+            row.solved if row else 0,
+            row.submissions if row else 0,
+            cells.get(participant.id, {}),
+        ))
+    return result
+
+
+def _standings_until(contest, until):
+    """Standings counting only the submissions made before until"""
+    cells = {}
+    for participant_id, problem_uuid, attempts, best_points in ContestSubmission.objects.filter(
+        contest=contest, submitted_at__lt=until
+    ).values_list('participant_id', 'problem__uuid').annotate(
+        attempts=Count('id'), best=Coalesce(Max('points_awarded'), 0)
+    ).order_by():
+        cells.setdefault(participant_id, {})[str(problem_uuid)] = {'points': best_points, 'submissions': attempts}
+
+    totals = []
+    for participant in ContestParticipant.objects.filter(contest=contest).select_related('user'):
+        scores = cells.get(participant.id, {}).values()
+        totals.append((
+            participant,
+            sum(cell['points'] for cell in scores),
+            sum(1 for cell in scores if cell['points'] > 0),
+            sum(cell['submissions'] for cell in scores),
+        ))
+    totals.sort(key=lambda item: (-item[1], item[3], item[0].id))
+    return [
+        _row(rank, participant, total_points, solved, submissions, cells.get(participant.id, {}))
+        for rank, (participant, total_points, solved, submissions) in enumerate(totals, start=1)
+    ]
+
+
+def standings(contest, until=None):
+    """
+    Participants in rank order with their totals and {problem uuid: cell}
+    scores, in the shape the standings template expects. With until, only
+    submissions made before that moment count.
+    """
+    if until is None:
+        return _live_standings(contest)
+    return _standings_until(contest, until)
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _build(contest, frozen):
+    freeze_time = contest.freeze_time if frozen else None
+    rows = standings(contest, until=freeze_time)
+    problems = [
+        {
+            'order': contest_problem.order,
+            'points': contest_problem.points,
+            'problem': {'uuid': str(contest_problem.problem.uuid), 'title': contest_problem.problem.title},
+        }
+        for contest_problem in contest.contest_problems.select_related('problem')
+    ]
+    digests = {row['participant']['id']: _digest(row) for row in rows}
+    return {
+        'contest': str(contest.uuid),
+        'audience': 'frozen' if frozen else 'live',
+        'version': _digest([problems, sorted(digests.items())]),
+        'generated_at': timezone.now().isoformat(),
+        'frozen': frozen,
+        'freeze_time': freeze_time.isoformat() if freeze_time else None,
+        'problems': problems,
+        'rows': rows,
+        'digests': digests,
+        'history': [],
+        # Scoreboard version the snapshot was built from, and when
+        'source': contest.scoreboard_version,
+        'built': time.time(),
+    }
+
+
+def _key(contest, audience):
+    return f"scoreboard:{contest.id}:{audience}"
+
+
+def snapshot(contest, live=False):
+    """
+    The current standings snapshot of a contest: the frozen public one while
+    its scoreboard is frozen, unless live is given (staff), else the live one.
+    """
+    frozen = not live and contest.is_scoreboard_frozen
+    key = _key(contest, 'frozen' if frozen else 'live')
+    current = cache.get(key)
+    interval = _setting('SNAPSHOT_INTERVAL', 5)
+    locked = False
+    if current is not None:
+        if current['source'] == contest.scoreboard_version or time.time() - current['built'] < interval:
+            return current
+        # Someone else is already rebuilding it; the old snapshot will do meanwhile
+        locked = cache.add(key + ':lock', True, timeout=max(interval, 1))
+        if not locked:
+            return current
+
+    try:
+        fresh = _build(contest, frozen)
+        if current is not None:
+            if fresh['version'] == current['version']:
+                fresh['history'] = current['history']
+            else:
+                fresh['history'] = (
+                    [(current['version'], current['digests'])] + current['history']
+                )[:_setting('SNAPSHOT_HISTORY', 10)]
+        cache.set(key, fresh, SNAPSHOT_TIMEOUT)
+        print(f"[DEBUG] Scoreboard snapshot {fresh['version']} built for contest {contest.id} ({fresh['audience']})")
+    finally:
+        # A cold cache is built without the lock, so must not release another builder's
+        if locked:
+            cache.delete(key + ':lock')
+    return fresh
+
+
+def invalidate(contest):
+    """Drop a contest's snapshots, e.g. after its problems or freeze settings changed"""
+    cache.delete_many([_key(contest, 'live'), _key(contest, 'frozen')])
+
+
+def etag(snapshot):
+    return f'W/"scoreboard-{snapshot["contest"]}-{snapshot["audience"]}-{snapshot["version"]}"'
+
+
+def changes_since(snapshot, version):
+    """
+    (changed rows, ids of participants no longer listed) relative to an
+    earlier version of the snapshot, or None if that version is not known.
+    """
+    if version == snapshot['version']:
+        return [], []
+    for old_version, old_digests in snapshot['history']:
+        if old_version == version:
+            rows = [
+                row for row in snapshot['rows']
+                if old_digests.get(row['participant']['id']) != snapshot['digests'][row['participant']['id']]
+            ]
+            removed = [participant_id for participant_id in old_digests if participant_id not in snapshot['digests']]
+            return rows, removed
+    return None
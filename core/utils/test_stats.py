@@ -0,0 +1,83 @@
+"""
+Per-test failure statistics used to order test cases in first-failure mode.
+
+Every judged submission adds its per-case verdicts and CPU times to the
+problem's TestCaseStats. A submission judged in first-failure mode is then
+run against the cases most likely to reject it per second of CPU first, so
+a wrong solution is usually stopped after one or two cases. Verdicts are
+still reported with the canonical test numbers.
+
+Statistics belong to one version of the test data; a new version starts
+from scratch in stored order.
+"""
+from django.conf import settings
+from django.db.models import F
+
+from core.models import TestCaseStats
+
+# Verdicts that say nothing about the submission
+IGNORED_VERDICTS = ('IE', 'SKIPPED')
+
+
+def enabled():
+    return settings.CODE_EXECUTION.get('ORDER_TESTS_BY_STATS', True)
+
+
+def run_order(problem, count):
+    """
+    0-based indices of the problem's count test cases in the order to run
+    them: highest failure rate per CPU second first, stored order on ties.
+    """
+    stats = {
+        number - 1: (runs, failures, total_time)
+        for number, runs, failures, total_time in TestCaseStats.objects.filter(
+            problem=problem, test_data_version=problem.test_data_version, runs__gt=0
+        ).values_list('test_number', 'runs', 'failures', 'total_time')
+    }
+    if not stats:
+        return list(range(count))
+
+    known_times = [total_time / runs for runs, _, total_time in stats.values()]
+    default_time = sum(known_times) / len(known_times)
+
+    def priority(index):
+        runs, failures, total_time = stats.get(index, (0, 0, 0.0))
+        # Laplace smoothing keeps rarely run cases from jumping to either end
+        failure_rate = (failures + 1) / (runs + 2)
+        average_time = total_time / runs if runs else default_time
+        return -failure_rate / max(average_time, 0.001)
+
+    return sorted(range(count), key=priority)
+
+
+def record(problem, results):
+    """Add one submission's per-case results (None for cases not run) to the statistics"""
+    version = problem.test_data_version
+    ran = [
+        (number, result) for number, result in enumerate(results, start=1)
+        if result is not None and result['verdict'] not in IGNORED_VERDICTS
+    ]
+    if not ran:
+        return
+
+    existing = set(TestCaseStats.objects.filter(
+        problem=problem, test_data_version=version
+    ).values_list('test_number', flat=True))
+    missing = [number for number, _ in ran if number not in existing]
+    if missing:
+        TestCaseStats.objects.bulk_create(
+            [TestCaseStats(problem=problem, test_data_version=version, test_number=n) for n in missing],
+            ignore_conflicts=True,
+        )
+        # First submission on this version; earlier versions' numbers no longer apply
+        TestCaseStats.objects.filter(problem=problem).exclude(test_data_version=version).delete()
+
+    # Each update is atomic on its own, so concurrent judges never lose counts
+    for number, result in ran:
+        TestCaseStats.objects.filter(
+            problem=problem, test_data_version=version, test_number=number
+        ).update(
+            runs=F('runs') + 1,
+            failures=F('failures') + int(result['verdict'] != 'AC'),
+            total_time=F('total_time') + result.get('time', 0.0),
+        )
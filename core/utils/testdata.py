@@ -0,0 +1,531 @@
+"""
+File-backed store for problem test data.
+
+Test files are stored once, gzip-compressed and addressed by the SHA-256 of
+their content, so a file shared by several cases, versions or problems
+takes its space only once:
+
+    MEDIA_ROOT/testdata/blobs/<sha256[:2]>/<sha256>.gz
+
+Every version of a problem's test data is a manifest listing the checksum
+and size of each case's input and expected output:
+
+    MEDIA_ROOT/testdata/<problem uuid>/v<N>/manifest.json
+
+Test data comes from the JSON pasted into the problem form or from an
+uploaded ZIP archive of NN.in / NN.out files (stage_archive). Blobs that no
+manifest references any more are removed by collect_garbage() (the
+gctestdata command).
+
+Problem.test_data_version names the current version (0 means none). A
+version is never modified once written: new test data is assembled in a
+staging directory and renamed into place as the next version, so a judge
+that is still reading the previous version is not disturbed.
+
+Judging passes test files around as Blob objects. run_program decompresses
+an input chunk by chunk into the child's stdin pipe while it runs, and the
+comparator reads the expected output the same way, so neither is ever fully
+decompressed or loaded into a Python string. Each blob is checked against
+its checksum the first time a process opens it.
+
+Loaded manifests are kept in a per-process LRU cache keyed by (problem uuid,
+version). Editing test data creates a new version, so a cached entry never
+goes stale; the cache is bounded by CODE_EXECUTION['TESTDATA_CACHE_SIZE'].
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+
+MANIFEST_FILE = 'manifest.json'
+
+# Names of the files in an uploaded archive
+CASE_FILE = re.compile(r'^(\d+)\.(in|out)$')
+
+# Bytes copied at a time when streaming test data to disk
+COPY_CHUNK = 1024 * 1024
+
+BLOB_DIR = 'blobs'
+
+# Numeric test data compresses almost as well at level 1 as at 6, several times faster
+COMPRESS_LEVEL = 1
+
+# Unreferenced blobs younger than this may belong to an upload still in progress
+GC_GRACE_SECONDS = 24 * 60 * 60
+
+# Versions kept besides the current one, for submissions judged while it changed
+KEEP_OLD_VERSIONS = 1
+
+# Approximate bytes a cached test case costs
+CACHED_CASE_BYTES = 400
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_bytes = 0
+_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+# Checksums of the blobs this process has verified
+_verified = set()
+_verified_lock = threading.Lock()
+
+
+def root():
+    return os.path.join(settings.MEDIA_ROOT, 'testdata')
+
+
+def problem_dir(problem_uuid):
+    return os.path.join(root(), str(problem_uuid))
+
+
+def version_dir(problem_uuid, version):
+    return os.path.join(problem_dir(problem_uuid), f'v{version}')
+
+
+def blob_root():
+    return os.path.join(root(), BLOB_DIR)
+
+
+def blob_path(sha256):
+    return os.path.join(blob_root(), sha256[:2], f'{sha256}.gz')
+
+
+class TestDataError(ValueError):
+    """Test data that cannot be stored or read, with a message for the problem setter"""
+
+
+class Blob:
+    """One stored test file, addressed by the SHA-256 of its content"""
+    __slots__ = ('sha256', 'size')
+
+    def __init__(self, sha256, size):
+        self.sha256 = sha256
+        self.size = size
+
+    def __repr__(self):
+        return f'Blob({self.sha256[:12]}, {self.size} bytes)'
+
+    @property
+    def path(self):
+        return blob_path(self.sha256)
+
+    def _verify(self):
+        digest = hashlib.sha256()
+        size = 0
+        with gzip.open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(COPY_CHUNK)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest() == self.sha256 and size == self.size
+
+    def open(self):
+        """
+        A binary stream of the decompressed content. The first open in a
+        process checks the whole blob against its checksum; raises
+        TestDataError if it is missing or corrupt.
+        """
+        try:
+            if self.sha256 not in _verified:
+                if not self._verify():
+                    raise TestDataError(f"Test data file {self.sha256[:12]} is corrupt (checksum mismatch)")
+                with _verified_lock:
+                    _verified.add(self.sha256)
+            return gzip.open(self.path, 'rb')
+        except (OSError, EOFError, zlib.error) as e:
+            raise TestDataError(f"Test data file {self.sha256[:12]} cannot be read: {e}")
+
+
+def open_data(data):
+    """Binary stream of test data given as str, bytes or a Blob"""
+    if isinstance(data, Blob):
+        return data.open()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return io.BytesIO(data)
+
+
+def _max_size():
+    return settings.CODE_EXECUTION.get('TESTDATA_MAX_SIZE', 1024) * 1024 * 1024
+
+
+def _chunks(data):
+    """Bytes of test data given as str, bytes or a binary file-like object, in chunks"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if isinstance(data, bytes):
+        yield data
+        return
+    while True:
+        chunk = data.read(COPY_CHUNK)
+        if not chunk:
+            return
+        yield chunk
+
+
+class StagedVersion:
+    """
+    A version of test data being assembled in a staging directory.
+
+    Each added file is streamed into a compressed blob, with its size and
+    checksum computed on the way; a file whose blob already exists is not
+    stored again. publish() then moves the manifest into place in one rename.
+    """
+
+    def __init__(self):
+        os.makedirs(blob_root(), exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix='.staging-', dir=root())
+        self.cases = []
+        self.total_size = 0
+
+    def _store(self, data):
+        digest = hashlib.sha256()
+        size = 0
+        fd, incoming = tempfile.mkstemp(prefix='.incoming-', dir=blob_root())
+        try:
+            with os.fdopen(fd, 'wb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=COMPRESS_LEVEL, mtime=0) as f:
+                for chunk in _chunks(data):
+                    size += len(chunk)
+                    self.total_size += len(chunk)
+                    if self.total_size > _max_size():
+                        raise TestDataError(
+                            f"Test data exceeds {settings.CODE_EXECUTION.get('TESTDATA_MAX_SIZE', 1024)} MB"
+                        )
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            sha256 = digest.hexdigest()
+            target = blob_path(sha256)
+            if os.path.exists(target):
+                # Already stored; refresh it so garbage collection leaves it alone
+                os.utime(target)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.rename(incoming, target)
+            return sha256, size
+        finally:
+            if os.path.exists(incoming):
+                os.unlink(incoming)
+
+    def add_case(self, input_data, output_data):
+        entry = {}
+        for kind, data in (('input', input_data), ('output', output_data)):
+            entry[f'{kind}_sha256'], entry[f'{kind}_size'] = self._store(data)
+        self.cases.append(entry)
+
+    def publish(self, problem_uuid, version):
+        """
+        Make the staged cases version `version` of a problem's test data and
+        return its manifest. Raises FileExistsError if that version exists.
+        """
+        manifest = {'version': version, 'cases': self.cases}
+        with open(os.path.join(self.path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+
+        target = version_dir(problem_uuid, version)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            raise FileExistsError(target)
+        os.rename(self.path, target)
+        return manifest
+
+    def discard(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def write_version(problem_uuid, version, cases):
+    """
+    Write (input, expected output) pairs as version `version` of a problem's
+    test data; the data may be str or bytes. Returns the manifest.
+
+    Raises FileExistsError if that version already exists.
+    """
+    staged = StagedVersion()
+    try:
+        for input_data, output_data in cases:
+            staged.add_case(input_data, output_data)
+        return staged.publish(problem_uuid, version)
+    finally:
+        staged.discard()
+
+
+def stage_archive(fileobj):
+    """
+    Stream a ZIP of NN.in / NN.out pairs into a StagedVersion, ordered by NN.
+
+    The archive is read entry by entry from fileobj (an uploaded file, which
+    Django spools to disk once it is large), so it is never held in memory.
+    Raises TestDataError if the archive is malformed.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except (zipfile.BadZipFile, OSError):
+        raise TestDataError('The file is not a valid ZIP archive.')
+
+    with archive:
+        pairs = {}
+        for info in archive.infolist():
+            name = info.filename.rsplit('/', 1)[-1]
+            if info.is_dir() or info.filename.startswith('__MACOSX/') or name.startswith('.'):
+                continue
+            match = CASE_FILE.match(name)
+            if not match:
+                raise TestDataError(f"Unexpected file '{info.filename}': expected only NN.in / NN.out pairs.")
+            if info.flag_bits & 0x1:
+                raise TestDataError(f"'{info.filename}' is encrypted.")
+            kind = 'input' if match.group(2) == 'in' else 'output'
+            pair = pairs.setdefault(int(match.group(1)), {})
+            if kind in pair:
+                raise TestDataError(f"Test case {match.group(1)} appears more than once.")
+            pair[kind] = info
+
+        if not pairs:
+            raise TestDataError('The archive contains no test cases.')
+        for number, pair in sorted(pairs.items()):
+            if len(pair) != 2:
+                missing = 'out' if 'input' in pair else 'in'
+                raise TestDataError(f"Test case {number} has no .{missing} file.")
+        # Reject early on the declared sizes; the actual bytes are counted while copying
+        if sum(info.file_size for pair in pairs.values() for info in pair.values()) > _max_size():
+            raise TestDataError(
+                f"Test data exceeds {settings.CODE_EXECUTION.get('TESTDATA_MAX_SIZE', 1024)} MB"
+            )
+
+        staged = StagedVersion()
+        try:
+            for number, pair in sorted(pairs.items()):
+                with archive.open(pair['input']) as input_file, archive.open(pair['output']) as output_file:
+                    staged.add_case(input_file, output_file)
+        except (zipfile.BadZipFile, NotImplementedError, zlib.error, EOFError) as e:
+            staged.discard()
+            raise TestDataError(f"Could not read test case {number} from the archive: {e}")
+        except BaseException:
+            staged.discard()
+            raise
+        return staged
+
+
+def save_test_cases(problem, cases):
+    """
+    Store cases, a StagedVersion or (input, output) pairs, as the next
+    version of the problem's test data and make it current. The problem must
+    already be saved.
+    """
+    staged = cases if isinstance(cases, StagedVersion) else None
+    if staged is None:
+        staged = StagedVersion()
+        for input_data, output_data in cases:
+            staged.add_case(input_data, output_data)
+
+    version = problem.test_data_version + 1
+    try:
+        while True:
+            try:
+                staged.publish(problem.uuid, version)
+                break
+            except FileExistsError:
+                # Left behind by an earlier attempt that never got recorded
+                version += 1
+    finally:
+        staged.discard()
+
+    problem.test_data_version = version
+    problem.save(update_fields=['test_data_version'])
+    forget(problem.uuid)
+    prune(problem)
+    return version
+
+
+def prune(problem):
+    """
+    Delete versions older than the current one minus KEEP_OLD_VERSIONS; their
+    blobs go once collect_garbage() finds them unreferenced.
+    """
+    try:
+        names = os.listdir(problem_dir(problem.uuid))
+    except FileNotFoundError:
+        return
+    oldest_kept = problem.test_data_version - KEEP_OLD_VERSIONS
+    for name in names:
+        if name.startswith('v') and name[1:].isdigit() and int(name[1:]) < oldest_kept:
+            shutil.rmtree(os.path.join(problem_dir(problem.uuid), name), ignore_errors=True)
+
+
+def load_manifest(problem_uuid, version):
+    """The manifest of one version, or None if that version does not exist"""
+    try:
+        with open(os.path.join(version_dir(problem_uuid, version), MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _cache_limit():
+    return settings.CODE_EXECUTION.get('TESTDATA_CACHE_SIZE', 16) * 1024 * 1024
+
+
+def _cache_put(key, cases):
+    global _cache_bytes
+    size = len(cases) * CACHED_CASE_BYTES
+    limit = _cache_limit()
+    if size > limit:
+        return
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = (cases, size)
+        _cache_bytes += size
+        while _cache_bytes > limit:
+            _, (_, evicted_size) = _cache.popitem(last=False)
+            _cache_bytes -= evicted_size
+            _cache_stats['evictions'] += 1
+
+
+def forget(problem_uuid):
+    """Drop every cached version of a problem's test data"""
+    global _cache_bytes
+    problem_uuid = str(problem_uuid)
+    with _cache_lock:
+        for key in [key for key in _cache if key[0] == problem_uuid]:
+            _cache_bytes -= _cache.pop(key)[1]
+
+
+def cache_stats():
+    with _cache_lock:
+        return dict(_cache_stats, entries=len(_cache), bytes=_cache_bytes)
+
+
+def test_cases(problem):
+    """
+    (input, expected output) Blob pairs of the problem's current test data,
+    in order, as a tuple. Empty if the problem has none; raises
+    FileNotFoundError if its current version is missing from disk.
+    """
+    if not problem.test_data_version:
+        return ()
+    key = (str(problem.uuid), problem.test_data_version)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return entry[0]
+        _cache_stats['misses'] += 1
+
+    manifest = load_manifest(problem.uuid, problem.test_data_version)
+    if manifest is None:
+        raise FileNotFoundError(
+            f"Test data v{problem.test_data_version} of problem {problem.uuid} is missing"
+        )
+    cases = tuple(
+        (Blob(case['input_sha256'], case['input_size']), Blob(case['output_sha256'], case['output_size']))
+        for case in manifest['cases']
+    )
+    _cache_put(key, cases)
+    return cases
+
+
+def first_case(problem):
+    """The first (input, expected output) pair, or None if there is no test data"""
+    cases = test_cases(problem)
+    return cases[0] if cases else None
+
+
+def case_count(problem):
+    try:
+        return len(test_cases(problem))
+    except FileNotFoundError:
+        return 0
+
+
+def read_text(data, limit=None):
+    """Text of test data given as str or a Blob, cut off after limit characters"""
+    if isinstance(data, Blob):
+        with io.TextIOWrapper(data.open(), encoding='utf-8', errors='replace') as f:
+            return f.read(-1 if limit is None else limit)
+    return data if limit is None else data[:limit]
+
+
+def delete(problem_uuid):
+    """Remove every version of a problem's test data; collect_garbage() frees the blobs"""
+    forget(problem_uuid)
+    shutil.rmtree(problem_dir(problem_uuid), ignore_errors=True)
+
+
+def _manifests():
+    for name in os.listdir(root()):
+        if name == BLOB_DIR or name.startswith('.'):
+            continue
+        try:
+            versions = os.listdir(os.path.join(root(), name))
+        except NotADirectoryError:
+            continue
+        for version in versions:
+            try:
+                with open(os.path.join(root(), name, version, MANIFEST_FILE), encoding='utf-8') as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                continue
+
+
+def collect_garbage(grace=GC_GRACE_SECONDS):
+    """
+    Delete blobs no manifest references and staging leftovers older than
+    grace seconds. Returns (blobs removed, bytes freed).
+    """
+    if not os.path.isdir(blob_root()):
+        return 0, 0
+    referenced = set()
+    for manifest in _manifests():
+        for case in manifest['cases']:
+            referenced.add(case['input_sha256'])
+            referenced.add(case['output_sha256'])
+
+    cutoff = time.time() - grace
+    removed = freed = 0
+    for directory, _, files in os.walk(blob_root()):
+        for name in files:
+            path = os.path.join(directory, name)
+            sha256 = name[:-len('.gz')] if name.endswith('.gz') else None
+            try:
+                stat = os.stat(path)
+                if sha256 not in referenced and stat.st_mtime < cutoff:
+                    os.unlink(path)
+                    removed += 1
+                    freed += stat.st_size
+            except FileNotFoundError:
+                continue
+    for name in os.listdir(root()):
+        path = os.path.join(root(), name)
+        if name.startswith('.staging-') and os.stat(path).st_mtime < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+    return removed, freed
+
+
+def usage():
+    """Logical size of all stored versions against the compressed, deduplicated size on disk"""
+    logical = 0
+    for manifest in _manifests():
+        logical += sum(case['input_size'] + case['output_size'] for case in manifest['cases'])
+    stored = 0
+    blobs = 0
+    for directory, _, files in os.walk(blob_root()):
+        for name in files:
+            if name.endswith('.gz'):
+                blobs += 1
+                stored += os.path.getsize(os.path.join(directory, name))
+    return {'logical_bytes': logical, 'stored_bytes': stored, 'blobs': blobs}
+
@@ -0,0 +1,214 @@
+"""
+Per-user statistics for the profile page.
+
+UserStats is updated by small increments as things happen, each under a
+lock on the user's row:
+
+* record_submission() when a solution is created (signal);
+* record_verdict() when a solution is judged and its verdict flips to or
+  from AC, counting a problem as solved while any accepted solution of it
+  remains;
+* record_participation() when a user joins a contest (signal);
+* forget_submission() and forget_participation() when those are deleted.
+
+Contest points and top-3 finishes come from final ranks, which
+finalize_contest() stores on the participants once a contest has ended
+and all its submissions are judged. A changed scoreboard clears
+Contest.finalized_at, so an ended contest that is rejudged is finalized
+again by the next idle judge worker.
+
+A user without a stats row gets one built from scratch by rebuild().
+"""
+import time
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Contest, ContestParticipant, ContestSubmission, Solution, UserStats
+from . import scoreboard
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Seconds between looks for ended contests to finalize, per process
+FINALIZE_INTERVAL = 60
+
+_next_finalize_check = 0
+
+
+def _contest_totals(user_ids):
+    """{user id: (contest points, top-3 finishes)} over finalized contests"""
+    totals = ContestParticipant.objects.filter(user_id__in=user_ids).values('user_id').annotate(
+        points=Coalesce(Sum('final_points'), 0),
+        top_3=Count('id', filter=Q(final_rank__lte=3, final_points__gt=0)),
+    ).order_by()
+    return {row['user_id']: (row['points'], row['top_3']) for row in totals}
+
+
+def _compute(stats):
+    """Fill in every counter of stats from the user's solutions and participations"""
+    user_id = stats.user_id
+    stats.total_submissions = Solution.objects.filter(user_id=user_id).count()
+    solved = dict(
+        Solution.objects.filter(user_id=user_id, verdict='AC').values('problem__difficulty').annotate(
+            count=Count('problem', distinct=True)
+        ).order_by().values_list('problem__difficulty', 'count')
+    )
+    stats.problems_solved = sum(solved.values())
+    for difficulty in DIFFICULTIES:
+        setattr(stats, f'{difficulty}_solved', solved.get(difficulty, 0))
+    stats.contests_participated = ContestParticipant.objects.filter(user_id=user_id).count()
+    stats.contest_points, stats.top_3_finishes = _contest_totals([user_id]).get(user_id, (0, 0))
+
+
+def rebuild(user_id):
+    """Recompute a user's stats from scratch; returns the saved UserStats"""
+    with transaction.atomic():
+        stats, _ = UserStats.objects.select_for_update().get_or_create(user_id=user_id)
+        _compute(stats)
+        stats.save()
+    return stats
+
+
+def get_stats(user):
+    return UserStats.objects.filter(user=user).first() or rebuild(user.id)
+
+
+def _lock(user_id, create=True):
+    """
+    Lock the user's stats row. Returns None when it had to be created: it
+    is then built from the current data, which already includes the change
+    being recorded. Without create, a missing row is left for rebuild().
+    """
+    if not create:
+        return UserStats.objects.select_for_update().filter(user_id=user_id).first()
+    stats, created = UserStats.objects.select_for_update().get_or_create(user_id=user_id)
+    if created:
+        _compute(stats)
+        stats.save()
+        return None
+    return stats
+
+
+def _add(stats, **deltas):
+    UserStats.objects.filter(id=stats.id).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def _solved_deltas(solution, delta):
+    """Counter changes for the solution's problem becoming solved (1) or unsolved (-1), if no other AC counts it"""
+    if Solution.objects.filter(
+        user_id=solution.user_id, problem_id=solution.problem_id, verdict='AC'
+    ).exclude(id=solution.id).exists():
+        return {}
+    deltas = {'problems_solved': delta}
+    difficulty = solution.problem.difficulty
+    if difficulty in DIFFICULTIES:
+        deltas[f'{difficulty}_solved'] = delta
+    return deltas
+
+
+def record_submission(solution):
+    with transaction.atomic():
+        stats = _lock(solution.user_id)
+        if stats is not None:
+            _add(stats, total_submissions=1)
+
+
+def record_verdict(solution, previous_verdict):
+    """Count the solution's problem as (no longer) solved if its verdict flipped to or from AC"""
+    accepted = solution.verdict == 'AC'
+    if accepted == (previous_verdict == 'AC'):
+        return
+    with transaction.atomic():
+        stats = _lock(solution.user_id)
+        if stats is not None:
+            deltas = _solved_deltas(solution, 1 if accepted else -1)
+            if deltas:
+                _add(stats, **deltas)
+
+
+def forget_submission(solution):
+    """Take a deleted solution out of its user's counts"""
+    with transaction.atomic():
+        stats = _lock(solution.user_id, create=False)
+        if stats is None:
+            return
+        deltas = _solved_deltas(solution, -1) if solution.verdict == 'AC' else {}
+        _add(stats, total_submissions=-1, **deltas)
+
+
+def record_participation(participant):
+    with transaction.atomic():
+        stats = _lock(participant.user_id)
+        if stats is not None:
+            _add(stats, contests_participated=1)
+
+
+def forget_participation(participant):
+    """Take a deleted participation, and its final result, out of its user's counts"""
+    with transaction.atomic():
+        stats = _lock(participant.user_id, create=False)
+        if stats is None:
+            return
+        deltas = {'contests_participated': -1}
+        if participant.final_rank is not None:
+            deltas['contest_points'] = -participant.final_points
+            deltas['top_3_finishes'] = -int(participant.final_rank <= 3 and participant.final_points > 0)
+        _add(stats, **deltas)
+
+
+def finalize_contest(contest_id):
+    """
+    Store final ranks and points of an ended contest and update its
+    participants' contest totals. Returns False if the contest is not
+    ready yet (or already finalized).
+    """
+    with transaction.atomic():
+        contest = Contest.objects.select_for_update().filter(
+            id=contest_id, end_time__lt=timezone.now(), finalized_at__isnull=True
+        ).first()
+        if contest is None:
+            return False
+        if ContestSubmission.objects.filter(
+            contest=contest, solution__status__in=Solution.IN_PROGRESS_STATUSES
+        ).exists():
+            return False
+
+        final = {row['participant']['id']: row for row in scoreboard.standings(contest)}
+        participants = list(ContestParticipant.objects.filter(contest=contest))
+        for participant in participants:
+            participant.final_rank = final[participant.id]['rank']
+            participant.final_points = final[participant.id]['total_points']
+        ContestParticipant.objects.bulk_update(participants, ['final_rank', 'final_points'], batch_size=500)
+
+        user_ids = [participant.user_id for participant in participants]
+        totals = _contest_totals(user_ids)
+        existing = list(UserStats.objects.filter(user_id__in=user_ids))
+        for stats in existing:
+            stats.contest_points, stats.top_3_finishes = totals.get(stats.user_id, (0, 0))
+        UserStats.objects.bulk_update(existing, ['contest_points', 'top_3_finishes'], batch_size=500)
+        for user_id in set(user_ids) - {stats.user_id for stats in existing}:
+            rebuild(user_id)
+
+        contest.finalized_at = timezone.now()
+        contest.save(update_fields=['finalized_at'])
+    print(f"[DEBUG] Contest {contest.id} finalized for {len(participants)} participant(s)")
+    return True
+
+
+def finalize_ended_contests():
+    """Finalize every ended contest that is not yet; cheap to call often"""
+    global _next_finalize_check
+    if time.monotonic() < _next_finalize_check:
+        return 0
+    _next_finalize_check = time.monotonic() + FINALIZE_INTERVAL
+    finalized = 0
+    for contest_id in Contest.objects.filter(
+        end_time__lt=timezone.now(), finalized_at__isnull=True
+    ).values_list('id', flat=True):
+        finalized += finalize_contest(contest_id)
+    return finalized
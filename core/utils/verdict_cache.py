@@ -0,0 +1,120 @@
+"""
+Reuse of verdicts for identical resubmissions.
+
+A judged result is stored under the problem, its test data version, the
+language, a fingerprint of everything else the verdict depends on
+(toolchain versions and flags, resource limits, the problem's checker) and
+the SHA-256 of the normalized source. A submission that matches gets the
+stored verdict and score at once, marked with Solution.is_cached, instead
+of running the whole test set again.
+
+Only verdicts that are a property of the code are stored: TLE, MLE and RE
+can depend on machine load, and IE on the judge itself.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+
+from core.models import VerdictCache
+from . import languages, sandbox
+
+CACHEABLE_VERDICTS = ('AC', 'WA', 'CE', 'OLE')
+
+
+def enabled():
+    return settings.CODE_EXECUTION.get('VERDICT_CACHE', True)
+
+
+def normalize_source(code):
+    """
+    Source with line endings and trailing whitespace normalized. Leading
+    lines are kept: they shift the line numbers in compiler messages.
+    """
+    return code.replace('\r\n', '\n').replace('\r', '\n').rstrip()
+
+
+def source_hash(code):
+    return hashlib.sha256(normalize_source(code).encode('utf-8')).hexdigest()
+
+
+def fingerprint(problem, language):
+    """Hash of the judging setup for a language and problem besides the test data"""
+    toolchain = languages.get(language) or {}
+    setup = {
+        'versions': toolchain.get('versions'),
+        'compile': toolchain.get('compile'),
+        'run': toolchain.get('run'),
+        'flags': toolchain.get('flags'),
+        'limits': sandbox.get_limits(language),
+        'checker': [
+            problem.checker,
+            problem.float_tolerance,
+            problem.checker_language,
+            hashlib.sha256(problem.checker_source.encode('utf-8')).hexdigest(),
+        ],
+    }
+    return hashlib.sha256(json.dumps(setup, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def key(solution, mode):
+    problem = solution.problem
+    return {
+        'problem': problem,
+        'test_data_version': problem.test_data_version,
+        'language': solution.language,
+        'toolchain': fingerprint(problem, solution.language),
+        'source_hash': source_hash(solution.code),
+        'mode': mode,
+    }
+
+
+def lookup(solution, mode):
+    """The stored result for an identical submission as a result dict, or None"""
+    entry = VerdictCache.objects.filter(**key(solution, mode)).first()
+    if entry is None:
+        return None
+    VerdictCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1)
+    print(f"[DEBUG] Verdict cache hit for solution #{solution.id}: {entry.verdict} from #{entry.solution_id}")
+    return {
+        'verdict': entry.verdict,
+        'score': entry.score,
+        'output': entry.output,
+        'error': entry.error,
+        'failed_test': entry.failed_test,
+        'time': entry.execution_time,
+        'memory': entry.memory_used,
+    }
+
+
+def store(solution, mode, result, replace=False):
+    """
+    Remember a freshly judged result if its verdict is a property of the
+    code. With replace (rejudging) it overwrites whatever was stored before.
+    """
+    fields = key(solution, mode)
+    if result.get('verdict') not in CACHEABLE_VERDICTS:
+        if replace:
+            VerdictCache.objects.filter(**fields).delete()
+        return
+    save = VerdictCache.objects.update_or_create if replace else VerdictCache.objects.get_or_create
+    try:
+        save(**fields, defaults={
+            'verdict': result['verdict'],
+            'score': result.get('score', 0),
+            'output': result.get('output') or '',
+            'error': result.get('error') or '',
+            'failed_test': result.get('failed_test'),
+            'execution_time': result.get('time'),
+            'memory_used': result.get('memory'),
+            'solution': solution,
+        })
+    except IntegrityError:
+        # Another judge stored the same submission first
+        return
+    # Results judged against older test data can never match again
+    VerdictCache.objects.filter(problem=fields['problem']).exclude(
+        test_data_version=fields['test_data_version']
+    ).delete()
@@ -0,0 +1,199 @@
+"""
+Scratch directories that submissions are compiled and run in.
+
+Each judge process keeps a pool of workspaces under
+CODE_EXECUTION['WORKSPACE_ROOT'] (/dev/shm by default, which is RAM-backed),
+in a directory of its own named after its pid. A released workspace is wiped
+and handed to the next run instead of being deleted, so a Run click or a
+checked test case no longer creates and removes a directory on disk.
+
+A workspace only goes on the RAM-backed filesystem while that has room for
+WORKSPACE_SIZE more megabytes; otherwise, or if the root is missing or not
+writable, it is created under CODE_EXECUTION['TEMP_DIR']. A workspace that
+grew past WORKSPACE_SIZE is deleted on release rather than pooled, and at
+most WORKSPACE_POOL idle workspaces are kept (0 disables pooling).
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+POOL_PREFIX = 'oj-workspaces-'
+
+_idle = []
+_lock = threading.Lock()
+_pool_dir = None
+_stats = {
+    'acquired': 0,
+    'reused': 0,
+    'on_tmpfs': 0,
+    'discarded': 0,
+    'setup_seconds': 0.0,
+    'teardown_seconds': 0.0,
+}
+
+
+def _config():
+    options = settings.CODE_EXECUTION
+    return (
+        options.get('WORKSPACE_ROOT', '/dev/shm'),
+        options.get('WORKSPACE_POOL', 8),
+        options.get('WORKSPACE_SIZE', 64) * 1024 * 1024,
+    )
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _sweep_stale(root):
+    """Remove pools left behind by judge processes that died without cleaning up"""
+    for name in os.listdir(root):
+        if not name.startswith(POOL_PREFIX):
+            continue
+        try:
+            pid = int(name[len(POOL_PREFIX):])
+        except ValueError:
+            continue
+        if pid != os.getpid() and not _pid_alive(pid):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def _tmpfs_pool(root, size_cap):
+    """This process's pool directory on the RAM-backed root, or None if it has no room"""
+    global _pool_dir
+    if not root or not os.path.isdir(root) or not os.access(root, os.W_OK | os.X_OK):
+        return None
+    stat = os.statvfs(root)
+    if stat.f_bavail * stat.f_frsize < size_cap:
+        return None
+    if _pool_dir is None or not os.path.isdir(_pool_dir):
+        _sweep_stale(root)
+        _pool_dir = os.path.join(root, f'{POOL_PREFIX}{os.getpid()}')
+        # Same pid as a judge that is gone, e.g. after a container restart
+        shutil.rmtree(_pool_dir, ignore_errors=True)
+        os.makedirs(_pool_dir)
+    return _pool_dir
+
+
+def _usage(path):
+    """Bytes used by the files under path"""
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _wipe(path):
+    """Empty a workspace so the next run finds it as if newly created"""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+
+
+def acquire():
+    """An empty workspace directory; give it back with release()"""
+    root, _, size_cap = _config()
+    started = time.perf_counter()
+    with _lock:
+        path = _idle.pop() if _idle else None
+        reused = path is not None
+        if path is None:
+            pool = _tmpfs_pool(root, size_cap)
+            if pool is not None:
+                path = tempfile.mkdtemp(prefix='ws-', dir=pool)
+        on_tmpfs = path is not None
+        _stats['acquired'] += 1
+        _stats['reused'] += reused
+        _stats['on_tmpfs'] += on_tmpfs
+
+    if path is None:
+        temp_root = settings.CODE_EXECUTION['TEMP_DIR']
+        os.makedirs(temp_root, exist_ok=True)
+        path = tempfile.mkdtemp(prefix='ws-', dir=temp_root)
+
+    elapsed = time.perf_counter() - started
+    with _lock:
+        _stats['setup_seconds'] += elapsed
+    return path
+
+
+def release(path):
+    """Wipe a workspace and keep it for reuse, or delete it"""
+    _, pool_size, size_cap = _config()
+    started = time.perf_counter()
+
+    with _lock:
+        keep = _pool_dir is not None and os.path.dirname(path) == _pool_dir and len(_idle) < pool_size
+    # A run that filled its workspace should not pin that much RAM while idle
+    keep = keep and _usage(path) <= size_cap
+
+    if keep:
+        try:
+            _wipe(path)
+        except OSError as e:
+            print(f"[DEBUG] Could not wipe workspace {path}: {e}")
+            keep = False
+    if not keep:
+        shutil.rmtree(path, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    with _lock:
+        if keep:
+            _idle.append(path)
+        else:
+            _stats['discarded'] += 1
+        _stats['teardown_seconds'] += elapsed
+
+
+@contextmanager
+def workspace():
+    """Context manager form of acquire()/release()"""
+    path = acquire()
+    try:
+        yield path
+    finally:
+        release(path)
+
+
+def stats():
+    """Counters since the process started (or since reset_stats())"""
+    with _lock:
+        return dict(_stats, idle=len(_idle))
+
+
+def reset_stats():
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0.0 if key.endswith('_seconds') else 0
+
+
+def shutdown():
+    """Remove this process's pool"""
+    global _pool_dir
+    with _lock:
+        _idle.clear()
+        if _pool_dir is not None:
+            shutil.rmtree(_pool_dir, ignore_errors=True)
+            _pool_dir = None
+
+
+atexit.register(shutdown)
@@ -4,13 +4,15 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.http import Http404, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Prefetch, Q
 from django.core.paginator import Paginator
 from django.conf import settings
+from django.utils.http import parse_etags
 from functools import wraps
-from django.db import IntegrityError
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
 
 from .models import (
     UserProfile, Problem, Solution, Contest, ContestParticipant,
@@ -22,9 +24,10 @@ from .forms import (
     ContestRegistrationForm, AnnouncementForm
 )
 
+from .utils.checkers import load_checker
 from .utils.execution import execute_code
-
-import json
+from .utils.judge_queue import enqueue_submission
+from .utils import contest_list as contest_list_cache, events, scoreboard, testdata, user_stats
 
 
 def role_required(allowed_roles):
@@ -120,20 +123,13 @@ def logout_view(request):
 @role_required(['setter', 'admin'])
 def add_problem(request):
     if request.method == 'POST':
-        form = ProblemForm(request.POST)
+        form = ProblemForm(request.POST, request.FILES)
         if form.is_valid():
             problem = form.save(commit=False)
             problem.created_by = request.user
 
-            test_cases_text = form.cleaned_data.get('test_cases')
-            try:
-                json.loads(test_cases_text or "[]")
-                problem.test_cases_json = test_cases_text
-            except json.JSONDecodeError:
-                form.add_error('test_cases', 'Invalid JSON format.')
-                return render(request, 'core/add_problem.html', {'form': form})
-
             problem.save()
+            form.save_test_cases(problem)
             messages.success(request, 'Problem added successfully!')
             return redirect('problem_list')
     else:
@@ -163,23 +159,22 @@ def problem_list(request):
     page_number = request.GET.get('page')
     problems = paginator.get_page(page_number)
     
+    # Which problems on this page the user has solved, in one query
+    solved_ids = set()
+    if request.user.is_authenticated:
+        solved_ids = set(Solution.objects.filter(
+            user=request.user,
+            problem__in=[problem.id for problem in problems],
+            verdict='AC'
+        ).values_list('problem_id', flat=True).distinct())
+
     problem_data = []
     for problem in problems:
         tags = [tag.strip() for tag in problem.tags.split(",")] if problem.tags else []
-        
-        # Check if user has solved this problem
-        user_solved = False
-        if request.user.is_authenticated:
-            user_solved = Solution.objects.filter(
-                user=request.user,
-                problem=problem,
-                verdict='AC'
-            ).exists()
-        
         problem_data.append({
             'problem': problem,
             'tags': tags,
-            'solved': user_solved
+            'solved': problem.id in solved_ids
         })
     
     context = {
@@ -197,6 +192,8 @@ def problem_detail(request, problem_id):
     form = SubmitSolutionForm(initial={'problem_id': str(problem.uuid)})
     output, verdict, feedback_message, debug = "", "", "", ""
     ai_feedback = None
+    # A just submitted solution whose verdict the page waits for
+    pending_solution = None
 
     # Check if user has solved this problem
     user_solved = Solution.objects.filter(
@@ -239,21 +236,18 @@ def problem_detail(request, problem_id):
 
                 if not sample_input or not sample_output:
                     try:
-                        test_cases = json.loads(problem.test_cases_json or "[]")
-                        if test_cases:
-                            sample_input = test_cases[0].get("input", "")
-                            sample_output = test_cases[0].get("output", "")
-                    except json.JSONDecodeError:
-                        messages.error(request, "Invalid test cases format.")
+                        sample_input, sample_output = testdata.first_case(problem) or ("", "")
+                    except FileNotFoundError:
+                        messages.error(request, "Test data for this problem is missing.")
                         sample_input, sample_output = "", ""
 
                 if sample_input and sample_output:
                     try:
-                        result = execute_code(language, code, sample_input, sample_output)
+                        result = execute_code(language, code, sample_input, sample_output, load_checker(problem))
                         output = result.get('output', '') or result.get('error', '')
                         verdict = result.get('verdict', '')
                         feedback_message = get_feedback_message(verdict)
-                        debug = f"Input: '{sample_input}'\nExpected: '{sample_output}'\nActual: '{output}'\nVerdict: {verdict}"
+                        debug = f"Input: '{testdata.read_text(sample_input, 1000)}'\nExpected: '{testdata.read_text(sample_output, 1000)}'\nActual: '{output}'\nVerdict: {verdict}\nCPU time: {result.get('time', 0):.3f}s, Memory: {result.get('memory', 0)} KB"
                     except Exception as e:
                         output = f"Execution error: {str(e)}"
                         verdict = "IE"
@@ -265,57 +259,34 @@ def problem_detail(request, problem_id):
 
             elif action == "Submit":
                 try:
-                    test_cases = json.loads(problem.test_cases_json or "[]")
-                except json.JSONDecodeError:
-                    messages.error(request, "Invalid test case format in the database.")
+                    test_cases = testdata.test_cases(problem)
+                except FileNotFoundError:
+                    messages.error(request, "Test data for this problem is missing.")
                     return redirect('problem_detail', problem_id=problem.uuid)
 
                 if not test_cases:
                     messages.error(request, "No test cases available for this problem.")
                     return redirect('problem_detail', problem_id=problem.uuid)
 
-                all_passed = True
-                failed_test_case = None
-
-                for i, test_case in enumerate(test_cases):
-                    test_input = test_case.get("input", "").strip()
-                    expected_output = test_case.get("output", "").strip()
-
-                    try:
-                        result = execute_code(language, code, test_input, expected_output)
-                        current_verdict = result.get('verdict', '')
-                        current_output = result.get('output', '') or result.get('error', '')
-
-                        if current_verdict != 'AC':
-                            all_passed = False
-                            verdict = current_verdict
-                            output = current_output
-                            feedback_message = f"❌ Failed on test case {i+1}"
-                            debug = f"Failed on test case {i+1}:\nInput: '{test_input}'\nExpected: '{expected_output}'\nActual: '{current_output}'\nVerdict: {current_verdict}"
-                            break
-                    except Exception as e:
-                        all_passed = False
-                        verdict = "IE"
-                        output = f"Execution error: {str(e)}"
-                        feedback_message = f"❌ Error on test case {i+1}"
-                        debug = f"Error on test case {i+1}: {str(e)}"
-                        break
-
-                if all_passed:
-                    verdict = "AC"
-                    output = "✅ All test cases passed."
-                    feedback_message = "🎉 Code Accepted!"
-                    debug = f"All {len(test_cases)} test cases passed successfully!"
-
-                # Save the solution
-                Solution.objects.create(
+                # Persist immediately and let the judge workers evaluate it
+                solution = Solution.objects.create(
                     user=request.user,
                     problem=problem,
                     code=code,
                     language=language,
-                    verdict=verdict,
-                    output=output
+                    status=Solution.STATUS_PENDING,
                 )
+                enqueue_submission(solution, mode='first_failure')
+
+                verdict = solution.status
+                if solution.is_cached:
+                    output = solution.output
+                    feedback_message = "Identical to an earlier submission; its verdict was reused."
+                else:
+                    output = f"⏳ Submission #{solution.id} is queued for judging."
+                    feedback_message = "Your verdict will appear here once it is judged."
+                    pending_solution = solution
+                debug = f"Solution #{solution.id} queued against {len(test_cases)} test cases"
 
                 # Generate AI feedback for submitted solutions
                 try:
@@ -352,6 +323,7 @@ def problem_detail(request, problem_id):
         'ai_feedback': ai_feedback,
         'user_solved': user_solved,
         'user_submissions': user_submissions,
+        'pending_solution': pending_solution,
     })
 
 
@@ -361,13 +333,18 @@ def submit_solution(request, problem_id):
     if request.method == 'POST':
         form = SubmitSolutionForm(request.POST)
         if form.is_valid():
-            Solution.objects.create(
+            solution = Solution.objects.create(
                 problem=problem,
                 user=request.user,
                 code=form.cleaned_data['source_code'],
-                language=form.cleaned_data['language']
+                language=form.cleaned_data['language'],
+                status=Solution.STATUS_PENDING,
             )
-            messages.success(request, "Solution submitted successfully")
+            enqueue_submission(solution, mode='first_failure')
+            if solution.is_cached:
+                messages.success(request, f"Solution #{solution.id} submitted: {solution.verdict}")
+            else:
+                messages.success(request, f"Solution #{solution.id} submitted and queued for judging")
             return redirect('problem_detail', problem_id=problem.uuid)
     else:
         form = SubmitSolutionForm(initial={'problem_id': str(problem.uuid)})
@@ -399,73 +376,29 @@ def profile_view(request):
     else:
         form = UserProfileForm(instance=user_profile, user=request.user)
 
-    # Contest statistics
-    contest_participations = ContestParticipant.objects.filter(user=request.user).select_related('contest')
-    
-    contest_rankings = {}  
-    
+    # Maintained incrementally by core.utils.user_stats
+    stats = user_stats.get_stats(request.user)
     contest_stats = {
-        'contests_participated': contest_participations.count(),
-        'top_3_finishes': 0,
-        'total_points': 0,
+        'contests_participated': stats.contests_participated,
+        'top_3_finishes': stats.top_3_finishes,
+        'total_points': stats.contest_points,
     }
-
-    for participation in contest_participations:
-        contest = participation.contest
-        
-        if contest.id not in contest_rankings:
-            participant_scores = ContestSubmission.objects.filter(
-                contest=contest
-            ).values('participant__user').annotate(
-                total_points=Sum('points_awarded')
-            ).order_by('-total_points')
-            
-            rankings = {}
-            for rank, score_data in enumerate(participant_scores, 1):
-                user_id = score_data['participant__user']
-                rankings[user_id] = {
-                    'rank': rank,
-                    'points': score_data['total_points'] or 0
-                }
-            
-            contest_rankings[contest.id] = rankings
-        
-        user_data = contest_rankings[contest.id].get(request.user.id, {'rank': None, 'points': 0})
-        contest_stats['total_points'] += user_data['points']
-        
-        if user_data['rank'] and user_data['rank'] <= 3:
-            contest_stats['top_3_finishes'] += 1
-
-    recent_contests = []
-    for participation in contest_participations.order_by('-contest__start_time')[:5]:
-        contest = participation.contest
-        user_data = contest_rankings.get(contest.id, {}).get(request.user.id, {'rank': None, 'points': 0})
-        
-        recent_contests.append({
-            'contest': contest,
-            'rank': user_data['rank'],
-            'participation': participation
-        })
-
-    # Problem statistics
-    user_solutions = Solution.objects.filter(user=request.user).select_related('problem')
-    solved_problems_query = user_solutions.filter(verdict='AC').select_related('problem')
-    
-    easy_solved = solved_problems_query.filter(problem__difficulty='easy').values('problem').distinct().count()
-    medium_solved = solved_problems_query.filter(problem__difficulty='medium').values('problem').distinct().count()
-    hard_solved = solved_problems_query.filter(problem__difficulty='hard').values('problem').distinct().count()
-    
-    total_problems_solved = solved_problems_query.values('problem').distinct().count()
-    
     problem_stats = {
-        'problems_solved': total_problems_solved,
-        'total_submissions': user_solutions.count(),
-        'easy_solved': easy_solved,
-        'medium_solved': medium_solved,
-        'hard_solved': hard_solved,
+        'problems_solved': stats.problems_solved,
+        'total_submissions': stats.total_submissions,
+        'easy_solved': stats.easy_solved,
+        'medium_solved': stats.medium_solved,
+        'hard_solved': stats.hard_solved,
     }
 
-    recent_submissions = user_solutions.order_by('-submitted_at')[:10]
+    recent_contests = [
+        {'contest': participation.contest, 'rank': participation.final_rank, 'participation': participation}
+        for participation in ContestParticipant.objects.filter(
+            user=request.user
+        ).select_related('contest').order_by('-contest__start_time')[:5]
+    ]
+
+    recent_submissions = Solution.objects.filter(user=request.user).select_related('problem').order_by('-submitted_at')[:10]
 
     return render(request, 'core/profile.html', {
         'user_profile': user_profile,
@@ -547,18 +480,17 @@ def contest_list(request):
     if type_filter != 'all':
         contests = contests.filter(contest_type=type_filter)
     
-    # Pagination
-    paginator = Paginator(contests, 10)
-    page_number = request.GET.get('page')
-    contests = paginator.get_page(page_number)
+    # Pagination; which contests match the filters is cached briefly
+    filters = {'status': status_filter, 'search': search_query, 'type': type_filter}
+    contests = contest_list_cache.get_page(contests, filters, request.GET.get('page'))
     
-    # Add additional info for each contest
+    registered = set()
+    if request.user.is_authenticated:
+        registered = set(ContestParticipant.objects.filter(
+            user=request.user, contest_id__in=[contest.id for contest in contests]
+        ).values_list('contest_id', flat=True))
     for contest in contests:
-        contest.participant_count = contest.participants.count()
-        if request.user.is_authenticated:
-            contest.is_registered = contest.participants.filter(id=request.user.id).exists()
-        else:
-            contest.is_registered = False
+        contest.is_registered = contest.id in registered
     
     context = {
         'contests': contests,
@@ -574,7 +506,13 @@ def contest_list(request):
 
 @role_required(['participant', 'setter', 'admin'])
 def contest_detail(request, contest_uuid):
-    contest = get_object_or_404(Contest, uuid=contest_uuid)
+    contest = get_object_or_404(
+        Contest.objects.select_related('created_by').prefetch_related(
+            Prefetch('contest_problems', queryset=ContestProblem.objects.select_related('problem')),
+            Prefetch('announcements', queryset=ContestAnnouncement.objects.all()[:5], to_attr='recent_announcements'),
+        ),
+        uuid=contest_uuid,
+    )
     is_registered = contest.participants.filter(id=request.user.id).exists()
     can_register = not is_registered and contest.is_upcoming and contest.registration_required
     
@@ -585,7 +523,7 @@ def contest_detail(request, contest_uuid):
             
             if contest.password and contest.password != password:
                 messages.error(request, 'Incorrect contest password')
-            elif contest.max_participants and contest.participants.count() >= contest.max_participants:
+            elif contest.max_participants and contest.participant_count >= contest.max_participants:
                 messages.error(request, 'Contest is full')
             else:
                 ContestParticipant.objects.create(contest=contest, user=request.user)
@@ -594,29 +532,28 @@ def contest_detail(request, contest_uuid):
     else:
         form = ContestRegistrationForm()
     
-    contest_problems = ContestProblem.objects.filter(contest=contest).select_related('problem')
-    announcements = contest.announcements.all()[:5]
+    contest_problems = contest.contest_problems.all()
     
-    user_submissions = []
     problem_status = {}
     
     if is_registered and not contest.is_upcoming:
-        user_submissions = ContestSubmission.objects.filter(
+        # {problem id: accepted submissions} for every problem the user submitted to
+        accepted_counts = dict(ContestSubmission.objects.filter(
             contest=contest,
             participant__user=request.user
-        ).select_related('problem', 'solution')
+        ).values('problem_id').annotate(
+            accepted=Count('id', filter=Q(verdict='AC'))
+        ).order_by().values_list('problem_id', 'accepted'))
         
         for contest_problem in contest_problems:
-            problem_uuid = contest_problem.problem.uuid
-            problem_submissions = user_submissions.filter(problem=contest_problem.problem)
-            
-            if problem_submissions.exists():
-                if problem_submissions.filter(verdict='AC').exists():
-                    problem_status[problem_uuid] = 'Accepted'
-                else:
-                    problem_status[problem_uuid] = 'Attempted'
+            accepted = accepted_counts.get(contest_problem.problem_id)
+            if accepted is None:
+                status = 'Not Attempted'
+            elif accepted:
+                status = 'Accepted'
             else:
-                problem_status[problem_uuid] = 'Not Attempted'
+                status = 'Attempted'
+            problem_status[str(contest_problem.problem.uuid)] = status
     
     context = {
         'contest': contest,
@@ -624,8 +561,7 @@ def contest_detail(request, contest_uuid):
         'can_register': can_register,
         'form': form,
         'contest_problems': contest_problems,
-        'announcements': announcements,
-        'user_submissions': user_submissions,
+        'announcements': contest.recent_announcements,
         'problem_status': problem_status,
     }
     return render(request, 'core/contest_detail.html', context)
@@ -721,16 +657,13 @@ def contest_problem_detail(request, contest_uuid, problem_uuid):
                 
                 if not sample_input or not sample_output:
                     try:
-                        test_cases = json.loads(problem.test_cases_json or "[]")
-                        if test_cases:
-                            sample_input = test_cases[0].get("input", "")
-                            sample_output = test_cases[0].get("output", "")
-                    except json.JSONDecodeError:
+                        sample_input, sample_output = testdata.first_case(problem) or ("", "")
+                    except FileNotFoundError:
                         pass
                 
                 if sample_input and sample_output:
                     try:
-                        result = execute_code(language, code, sample_input, sample_output)
+                        result = execute_code(language, code, sample_input, sample_output, load_checker(problem))
                         context.update({
                             'output': result.get('output', '') or result.get('error', 'No output'),
                             'verdict': result.get('verdict', 'IE'),
@@ -751,37 +684,39 @@ def contest_problem_detail(request, contest_uuid, problem_uuid):
             
             elif action == "submit":
                 try:
-                    from .utils.execution import evaluate_submission
-                    result = evaluate_submission(language, code, problem)
-                    
-                    verdict = result.get('verdict', 'IE')
-                    score = result.get('score', 0)
-
                     solution = Solution.objects.create(
                         user=request.user,
                         problem=problem,
                         language=language,
                         code=code,
-                        verdict=verdict,
-                        status=verdict,
+                        status=Solution.STATUS_PENDING,
                     )
 
-                    submission = ContestSubmission.objects.create(
-                        contest=contest,
-                        participant=participant,
-                        problem=problem,
-                        solution=solution,
-                        verdict=verdict,
-                        score=score,
-                        points_awarded=score,
-                    )
+                    with transaction.atomic():
+                        submission = ContestSubmission.objects.create(
+                            contest=contest,
+                            participant=participant,
+                            problem=problem,
+                            solution=solution,
+                        )
+                        scoreboard.refresh_submission(submission)
 
-                    context.update({
-                        'verdict': submission.verdict,
-                        'feedback_message': get_feedback_message(submission.verdict),
-                    })
+                    # The judge worker fills in verdict and score on both records
+                    enqueue_submission(solution, mode='partial')
 
-                    messages.success(request, f'Solution submitted! Verdict: {get_feedback_message(verdict)}')
+                    if solution.is_cached:
+                        context.update({
+                            'verdict': solution.status,
+                            'output': solution.output,
+                            'feedback_message': 'Identical to an earlier submission; its verdict was reused.',
+                        })
+                        messages.success(request, f'Solution #{solution.id} submitted: {solution.verdict}.')
+                    else:
+                        context.update({
+                            'verdict': solution.status,
+                            'feedback_message': 'Submission queued for judging. Your verdict will appear below shortly.',
+                        })
+                        messages.success(request, f'Solution #{solution.id} submitted and queued for judging.')
 
                 except ImportError:
                     context.update({
@@ -812,69 +747,93 @@ def contest_problem_detail(request, contest_uuid, problem_uuid):
 @role_required(['participant', 'setter', 'admin'])  # All authenticated users can view standings
 def contest_standings(request, contest_uuid):
     contest = get_object_or_404(Contest, uuid=contest_uuid)
-    
-    participants = ContestParticipant.objects.filter(contest=contest).select_related('user')
-    standings = []
-    
-    for participant in participants:
-        user_points = 0
-        solved_problems = 0
-        submissions_count = 0
-        
-        problem_scores = {}
-        for contest_problem in contest.contest_problems.all():
-            best_submission = ContestSubmission.objects.filter(
-                contest=contest,
-                participant=participant,
-                problem=contest_problem.problem
-            ).order_by('-points_awarded', 'submitted_at').first()
-            
-            problem_key = str(contest_problem.problem.uuid)
-            
-            if best_submission:
-                problem_scores[problem_key] = {
-                    'points': best_submission.points_awarded,
-                    'submissions': ContestSubmission.objects.filter(
-                        contest=contest,
-                        participant=participant,
-                        problem=contest_problem.problem
-                    ).count()
-                }
-                user_points += best_submission.points_awarded
-                if best_submission.points_awarded > 0:
-                    solved_problems += 1
-            else:
-                problem_scores[problem_key] = {
-                    'points': 0, 
-                    'submissions': 0
-                }
-        
-        submissions_count = ContestSubmission.objects.filter(
-            contest=contest,
-            participant=participant
-        ).count()
-        
-        standings.append({
-            'participant': participant,
-            'total_points': user_points,
-            'solved_problems': solved_problems,
-            'submissions_count': submissions_count,
-            'problem_scores': problem_scores,
-        })
-    
-    standings.sort(key=lambda x: (-x['total_points'], x['submissions_count']))
-    
-    for i, standing in enumerate(standings):
-        standing['rank'] = i + 1
-    
+    if not contest.is_visible_to(request.user):
+        messages.error(request, 'You must be registered to view the standings of this contest')
+        return redirect('contest_detail', contest_uuid=contest.uuid)
+
+    # Served from a cached snapshot; staff see live standings while the public ones are frozen
+    snapshot = scoreboard.snapshot(contest, live=request.user.is_staff)
     context = {
         'contest': contest,
-        'standings': standings,
-        'contest_problems': contest.contest_problems.all(),
+        'snapshot': snapshot,
+        'standings': snapshot['rows'],
+        'contest_problems': snapshot['problems'],
+        'follows_contest': _follows_contest(contest, request.user),
     }
     return render(request, 'core/contest_standings.html', context)
 
 
+def _follows_contest(contest, user):
+    """Whether the user may open the contest's event stream: staff, its creator and participants"""
+    return user.is_staff or contest.created_by_id == user.id or contest.participants.filter(id=user.id).exists()
+
+
+@login_required
+async def contest_events(request, contest_uuid):
+    """
+    Server-sent event stream of a contest: the user's verdicts, announcements
+    and standings changes. Served by the ASGI application.
+    """
+    contest = await Contest.objects.filter(uuid=contest_uuid).afirst()
+    if contest is None:
+        raise Http404("No such contest")
+    user = await request.auser()
+    if not await sync_to_async(_follows_contest)(contest, user):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_event_id = None
+
+    response = StreamingHttpResponse(
+        events.stream(contest, user, last_event_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Keep proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+@role_required(['participant', 'setter', 'admin'])
+def contest_standings_api(request, contest_uuid):
+    """
+    Standings as JSON. Pass ?since=<version> to get only the rows that
+    changed since that version; answers 304 while the client's ETag is current.
+    """
+    contest = get_object_or_404(Contest, uuid=contest_uuid)
+    if not contest.is_visible_to(request.user):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    snapshot = scoreboard.snapshot(contest, live=request.user.is_staff)
+    etag = scoreboard.etag(snapshot)
+
+    # Weak comparison, as If-None-Match requires
+    client_etags = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+    if '*' in client_etags or etag.removeprefix('W/') in client_etags:
+        response = HttpResponseNotModified()
+    else:
+        data = {
+            'version': snapshot['version'],
+            'generated_at': snapshot['generated_at'],
+            'frozen': snapshot['frozen'],
+            'freeze_time': snapshot['freeze_time'],
+            'problems': snapshot['problems'],
+        }
+        since = request.GET.get('since')
+        changes = scoreboard.changes_since(snapshot, since) if since else None
+        if changes is None:
+            data.update(full=True, rows=snapshot['rows'], removed=[])
+        else:
+            data.update(full=False, rows=changes[0], removed=changes[1])
+        response = JsonResponse(data)
+
+    response['ETag'] = etag
+    # Staff and the public get different standings from the same URL
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @staff_member_required # Only admins can create contests
 def create_contest(request):
     if request.method == 'POST':
@@ -924,7 +883,9 @@ def edit_contest(request, contest_uuid):
     if request.method == 'POST':
         form = ContestForm(request.POST, instance=contest)
         if form.is_valid():
-            contest = form.save()
+            # Only the edited fields, so counters updated meanwhile are not overwritten
+            contest = form.save(commit=False)
+            contest.save(update_fields=[*ContestForm.Meta.fields, 'updated_at'])
             
             existing_problems = set(contest.contest_problems.values_list('problem', flat=True))
             new_problems = set(form.cleaned_data.get('problems', []).values_list('id', flat=True))
@@ -941,6 +902,7 @@ def edit_contest(request, contest_uuid):
                 if not created:
                     contest_problem.order = i + 1
                     contest_problem.save()
+            scoreboard.invalidate(contest)
             
             messages.success(request, 'Contest updated successfully!')
             return redirect('contest_detail', contest_uuid=contest.uuid)
@@ -965,6 +927,22 @@ def contest_announcements(request, contest_uuid):
     return render(request, 'core/contest_announcements.html', context)
 
 
+@login_required
+def submission_status_api(request, submission_id):
+    solution = get_object_or_404(Solution, pk=submission_id)
+    if request.user != solution.user and not request.user.is_staff:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+
+    return JsonResponse({
+        'id': solution.id,
+        'status': solution.status,
+        'verdict': solution.verdict,
+        'judged': solution.is_judged,
+        'cached': solution.is_cached,
+        'output': solution.output if solution.is_judged else '',
+    })
+
+
 @login_required
 def contest_timer_api(request, contest_uuid):
     contest = get_object_or_404(Contest, uuid=contest_uuid)
@@ -1093,4 +1071,5 @@ def contest_announcements(request, contest_uuid):
         'contest': contest,
         'announcements': announcements,
         'can_manage': can_manage,
+        'follows_contest': _follows_contest(contest, request.user),
     })
@@ -95,6 +95,19 @@ DATABASES = {
     }
 }
 
+# === CACHE ===
+# Shared by every web worker and the judge (they mount the same directory), so
+# contest list and standings invalidations reach all of them at once
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'tmp', 'cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,  # culled beyond this
+        },
+    }
+}
+
 # === PASSWORD VALIDATION ===
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -122,9 +135,39 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # === CODE EXECUTION CONFIG ===
 CODE_EXECUTION = {
-    'TIME_LIMIT': 5,
-    'MEMORY_LIMIT': 128,
+    'TIME_LIMIT': 5,  # CPU seconds per test case
+    'MEMORY_LIMIT': 128,  # MB of peak resident memory per test case
+    'OUTPUT_LIMIT': 64,  # MB written to stdout or files per test case
+    'PROCESS_LIMIT': 1,  # RLIMIT_NPROC for languages that do not need threads
     'TEMP_DIR': os.path.join(BASE_DIR, 'tmp'),
+    'ARTIFACT_CACHE_SIZE': 512,  # MB of compiled binaries kept under TEMP_DIR/artifacts
+    'PARALLEL_TESTS': min(4, os.cpu_count() or 1),  # test cases run at once per submission
+    'JAVA_WARM': True,  # warm javac service + shared CDS archive for Java submissions
+    'PYTHON_FORKSERVER': False,  # fork Python test cases from a pre-started interpreter
+    'WORKSPACE_ROOT': '/dev/shm',  # RAM-backed scratch space; falls back to TEMP_DIR
+    'WORKSPACE_POOL': 8,  # idle workspaces kept for reuse per process (0 disables pooling)
+    'WORKSPACE_SIZE': 64,  # MB a workspace may use and still be reused
+    'TESTDATA_CACHE_SIZE': 16,  # MB of loaded test data manifests cached per process
+    'TESTDATA_MAX_SIZE': 1024,  # MB of uncompressed test data accepted per problem
+    'ORDER_TESTS_BY_STATS': True,  # in first-failure mode run the tests that fail most often first
+    'VERDICT_CACHE': True,  # reuse the verdict of an identical earlier submission
+    'REJUDGE_BATCH_SIZE': 50,  # solutions of one problem judged per rejudge batch
+}
+
+# === CONTEST STANDINGS ===
+# Standings are served from snapshots kept in the default cache (core.utils.scoreboard)
+SCOREBOARD = {
+    'SNAPSHOT_INTERVAL': 5,  # seconds a snapshot is served before a changed scoreboard is regenerated
+    'SNAPSHOT_HISTORY': 10,  # earlier versions clients can ask for changes since
+}
+
+# === CONTEST EVENTS ===
+# Server-sent events pushed to contest pages (core.utils.events); needs the ASGI server
+CONTEST_EVENTS = {
+    'POLL_INTERVAL': 1,  # seconds between looks for new events, per server process
+    'HEARTBEAT': 15,  # seconds of silence after which a keep-alive comment is sent
+    'QUEUE_SIZE': 256,  # events buffered per connection before a slow client is dropped
+    'RETENTION': 3600,  # seconds events are kept for clients resuming with Last-Event-ID
 }
 
 # === AUTH & EMAIL ===
@@ -139,9 +182,20 @@ CSRF_COOKIE_SECURE = False     # True if using HTTPS
 SECURE_SSL_REDIRECT = False    # True if forcing HTTPS
 
 # === COMPILER PATHS ===
-# For containerized Linux, these paths should point to Linux executables
+# For containerized Linux, these paths should point to Linux executables.
+# Resolved once per judge process by core.utils.languages
 COMPILER_PATHS = {
     'CPP_COMPILER': 'g++',
+    'C_COMPILER': 'gcc',
     'JAVA_COMPILER': 'javac',
+    'JAVA_RUNTIME': 'java',
     'PYTHON_INTERPRETER': 'python3',
+    'NODE_INTERPRETER': 'node',
 }
+
+# === SUBMISSION LANGUAGES ===
+# Per-language overrides of core.utils.languages.DEFAULT_LANGUAGES, e.g.
+#   'cpp': {'flags': ['-O2', '-std=c++17']},
+#   'java': {'time_multiplier': 2.0},
+#   'javascript': None,  # disable
+JUDGE_LANGUAGES = {}